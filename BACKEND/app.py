@@ -1,22 +1,46 @@
 from dotenv import load_dotenv
 import os
-import base64  # 🔥 RESİM İŞLEMLERİ İÇİN BU GEREKLİ
-import bcrypt  # 🔥 ŞİFRE HASH'LEME İÇİN
 
 # 1. .env DOSYASINI YÜKLE
 load_dotenv()
 
 from sanic import Sanic
-from sanic.response import json, text
+from sanic.response import json, text, raw, empty, redirect
+from sanic.log import logger
 from sanic_cors import CORS
-import secrets, smtplib, asyncio
+import asyncio, gzip
 import jwt
-from datetime import datetime, timedelta, timezone
-from email.message import EmailMessage
-from functools import partial, wraps
+from datetime import date, datetime, timedelta, timezone
+from functools import wraps
 from tortoise import Tortoise, connections
+from tortoise.expressions import Q, RawSQL
 from models import (
-    User, UserProfile, Event, FavouriteEvent, Comment, Feedback, University
+    User, UserProfile, Event, FavouriteEvent, Comment, Feedback, University, TokenRevocation
+)
+from media_store import (
+    MediaStore, MEDIA_CACHE_CONTROL, decode_data_uri, event_image_url, event_image_version,
+    media_key_from_ref, media_url, parse_range, sniff_image_type, to_media_ref, variant_key
+)
+from cache import BoundedCache, EncodedEntry
+from shared_cache import SharedCache, create_backend
+from upload import UploadLimiter, UploadRejected, receive_upload
+from event_catalogue import CatalogueEntry, EventCatalogue
+from search_index import EventSearchIndex
+from user_search import UserCard, UserSearchIndex
+from revocation import TOKEN_LIFETIME, RevocationList
+from password_hasher import PasswordHasher, PasswordHasherBusy
+from write_behind import UserWriteBuffer, clear_expired_bans, flush_user_writes
+from email_outbox import EmailOutbox, SmtpConnection
+from reset_tokens import RESET_SWEEP_INTERVAL, ResetTokenStore
+from dashboard_stats import DashboardStats, load_dashboard_counts
+from rollups import BUCKETS, GAUGE_METRICS, METRICS, ROLLUP_INTERVAL, DailyRollups, bucketize
+from scheduler import Scheduler
+from istanbul_time import ISTANBUL_TZ, istanbul_days_to_utc_range, now_istanbul, to_istanbul_tz
+from pagination import PaginationError, decode_cursor, encode_cursor, parse_limit, wants_pagination
+from projection import Projection, ProjectionError, Field, isoformat_of, strftime_of
+from image_pipeline import (
+    ImagePipeline, InvalidImage, PipelineBusy,
+    AVATAR_THUMB, AVATAR_LARGE, COVER_WIDE, EVENT_CARD
 )
 import pytz
 
@@ -26,31 +50,6 @@ CORS(app)
 # --- GİZLİ ANAHTAR ---
 SECRET_KEY = os.getenv("SECRET_KEY", "bu_cok_gizli_ve_uzun_bir_sifredir_kimse_bilmemeli_12345")
 
-# 🔥 İSTANBUL TIMEZONE (UTC+3) 🔥
-ISTANBUL_TZ = pytz.timezone('Europe/Istanbul')
-
-# 🔥 HELPER FUNCTION: Datetime'ı İstanbul Saatine Çevir 🔥
-def to_istanbul_tz(dt):
-    """Datetime'ı Istanbul timezone'a çevir
-    
-        Tortoise ORM timezone='UTC' ve use_tz=True ile çalışıyor, 
-        bu yüzden datetime'lar UTC timezone-aware olarak dönüyor.
-    """
-    if dt is None:
-        return None
-    
-    # Tortoise ORM UTC aware datetime döndürüyor, Istanbul'a çevir
-    if dt.tzinfo is None:
-        # Naive datetime ise UTC olarak kabul et (güvenlik için)
-        dt = dt.replace(tzinfo=timezone.utc)
-    
-    return dt.astimezone(ISTANBUL_TZ)
-
-# 🔥 HELPER FUNCTION: İstanbul Saatinde Şu Anki Zaman 🔥
-def now_istanbul():
-    """İstanbul timezone'ında şu anki zamanı döndür (UTC+3)"""
-    return datetime.now(ISTANBUL_TZ)
-
 def to_istanbul_datetime(dt_str):
     """ISO string'i Istanbul timezone datetime'a çevir
     Frontend lokal (Istanbul) saati gönderiyor, biz bunu timezone-aware yapıyoruz
@@ -70,34 +69,156 @@ def to_istanbul_datetime(dt_str):
     
     return dt
 
-# 🔥 BASİT RAM ÖNBELLEĞİ (CACHE) 🔥
-# Kullanıcı profillerini burada tutacağız: {user_id: {profil_verisi}}
-PROFILE_CACHE = {}
+def istanbul_input_to_utc(dt_str):
+    """Formdan gelen (İstanbul saati) ISO string'i veritabanı için UTC'ye çevir"""
+    dt = to_istanbul_datetime(dt_str)
+    return dt.astimezone(pytz.UTC) if dt else None
+
+# 🔥 ÖNBELLEK (CACHE) 🔥
+# Worker içi sınırlı RAM önbelleği + tüm worker'ların paylaştığı katman (CACHE_BACKEND).
+# Kayıtlar yerinde değiştirilmez; güncellemede silinir ve silme tüm worker'lara duyurulur.
+CACHE_BACKEND = create_backend()
+# Profil yanıtları JSON'a çevrilmiş halde (byte + ETag) tutulur: isabette serileştirme yok
+PROFILE_CACHE = SharedCache(
+    "profile", CACHE_BACKEND, encode=lambda entry: entry.body, decode=EncodedEntry
+)                                                       # {user_id: EncodedEntry}
+EVENT_CACHE = SharedCache("event", CACHE_BACKEND)       # {event_id: etkinlik detayı}
+
+# 🔥 DASHBOARD: Sayaçlar tek sorguyla yüklenir, handler'lar farkla günceller (okuma DB'ye gitmez)
+DASHBOARD_STATS = DashboardStats(lambda: load_dashboard_counts(connections.get("default")), CACHE_BACKEND)
+
+# 🔥 MEDYA DEPOSU: Fotoğraflar diske, veritabanına sadece "media:<hash>" referansı
+MEDIA_STORE = MediaStore()
+
+# 🔥 RESİM İŞLEME HAVUZU: Dönüştürme işleri event loop dışında, ayrı process'lerde
+IMAGE_PIPELINE = ImagePipeline()
+
+
+def image_error_response(e):
+    """Resim işleme hatalarını kullanıcıya dönecek yanıta çevir"""
+    if isinstance(e, PipelineBusy):
+        return json({"basarili": False, "mesaj": "Sunucu şu an çok yoğun, lütfen biraz sonra tekrar deneyin."}, status=503)
+    if isinstance(e, asyncio.TimeoutError):
+        return json({"basarili": False, "mesaj": "Resim işlenirken zaman aşımı oluştu."}, status=504)
+    return json({"basarili": False, "mesaj": "Geçersiz veya desteklenmeyen resim dosyası."}, status=400)
+
+IMAGE_ERRORS = (InvalidImage, PipelineBusy, asyncio.TimeoutError)
+
+# 🔥 YÜKLEME SINIRI: Kullanıcı başına ve toplamda eş zamanlı fotoğraf yükleme
+UPLOAD_LIMITER = UploadLimiter()
+
+# 🔥 ŞİFRE HAVUZU: bcrypt event loop dışında, sınırlı thread havuzunda (kuyruk doluysa 503)
+PASSWORD_HASHER = PasswordHasher()
+
+def password_busy_response():
+    return json({"basarili": False, "mesaj": "Sunucu şu an çok yoğun, lütfen biraz sonra tekrar deneyin."}, status=503)
+
+# 🔥 E-POSTA OUTBOX: İstekler e-postayı tabloya yazıp hemen döner; arka plandaki
+# gönderici SMTP bağlantısını açık tutar, hata olursa bekleyip tekrar dener.
+MAIL_OUTBOX = EmailOutbox(
+    SmtpConnection(user=os.getenv("GMAIL_USER"), password=os.getenv("GMAIL_PASS")),
+    sender=os.getenv("MAIL_FROM") or os.getenv("GMAIL_USER"),
+)
+
+# 🔥 ŞİFRE SIFIRLAMA: Token'lar tabloda (her worker doğrulayabilir), süresi dolanlar arka planda silinir
+RESET_TOKENS = ResetTokenStore()
+
+# 🔥 TOPLU YAZMA: last_login birkaç saniyede bir tek UPDATE ile
+USER_WRITES = UserWriteBuffer(lambda logins: flush_user_writes(connections.get("default"), logins))
+
+# 🔥 ZAMANLANMIŞ İŞLER: Bakım yazmaları istek yolunda değil, arka planda toplu yapılır
+BAN_SWEEP_INTERVAL = float(os.getenv("BAN_SWEEP_INTERVAL", 60))
+SCHEDULER = Scheduler()
+SCHEDULER.every(
+    BAN_SWEEP_INTERVAL, "ban_expiry",
+    lambda: clear_expired_bans(connections.get("default"), now_istanbul()),
+    run_at_start=True,
+)
+SCHEDULER.every(RESET_SWEEP_INTERVAL, "reset_tokens", RESET_TOKENS.sweep)
+
+# 🔥 ANALİTİK: Günlük özet tablosu (daily_stats); zaman serisi ham tabloları taramaz
+ROLLUPS = DailyRollups(lambda: connections.get("default"))
+SCHEDULER.every(ROLLUP_INTERVAL, "rollups", ROLLUPS.run, run_at_start=True)
+
+# 🔥 TOKEN İPTAL LİSTESİ: Banlanan/silinen/şifresini sıfırlayan kullanıcının eski
+# token'ları. İstek yolunda sadece sözlük kontrolü; kalıcı kopya token_revocations'da.
+def _utc_from_epoch(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+async def load_token_revocations():
+    now = datetime.now(timezone.utc)
+    await TokenRevocation.filter(expires_at__lte=now).delete()
+    return [
+        (r.user_id, r.kind, r.revoked_before.timestamp(), r.expires_at.timestamp())
+        for r in await TokenRevocation.all()
+    ]
+
+async def save_token_revocation(user_id, kind, revoked_before, expires_at):
+    # Değerler RevocationList'te birleştirilmiş halde gelir (oturum iptalinde en geç sınır/bitiş)
+    await TokenRevocation.update_or_create(
+        user_id=user_id, kind=kind,
+        defaults={"revoked_before": _utc_from_epoch(revoked_before), "expires_at": _utc_from_epoch(expires_at)},
+    )
+
+async def delete_token_revocation(user_id, kind):
+    await TokenRevocation.filter(user_id=user_id, kind=kind).delete()
+
+TOKEN_REVOCATIONS = RevocationList(
+    CACHE_BACKEND, load_token_revocations, save_token_revocation, delete_token_revocation
+)
 
 # -------------------------------------------------
 # TOKEN KONTROL (Middleware)
 # -------------------------------------------------
+def decode_request_token(request):
+    """Authorization başlığındaki JWT'yi çöz: (payload, None) veya (None, hata_yanıtı)"""
+    token = None
+    if "Authorization" in request.headers:
+        try:
+            token = request.headers["Authorization"].split(" ")[1]
+        except IndexError:
+            return None, json({"basarili": False, "mesaj": "Token formatı hatalı."}, status=401)
+
+    if not token:
+        return None, json({"basarili": False, "mesaj": "Token bulunamadı. Giriş yapmalısınız."}, status=401)
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+    except jwt.ExpiredSignatureError:
+        return None, json({"basarili": False, "mesaj": "Oturum süresi doldu. Tekrar giriş yapın."}, status=401)
+    except jwt.InvalidTokenError:
+        return None, json({"basarili": False, "mesaj": "Geçersiz token."}, status=401)
+
+    # Ban / silme / şifre sıfırlama sonrası eski token'lar (DB sorgusu yok)
+    if TOKEN_REVOCATIONS.is_revoked(payload["user_id"], TOKEN_REVOCATIONS.issued_at(payload)):
+        return None, json({"basarili": False, "mesaj": "Oturumunuz sonlandırıldı. Tekrar giriş yapın."}, status=401)
+
+    request.ctx.user_id = payload["user_id"]
+    return payload, None
+
+
+def create_access_token(user):
+    issued_at = now_istanbul()
+    expiration_time = issued_at + timedelta(seconds=TOKEN_LIFETIME)
+    token_payload = {
+        "user_id": user.user_id,
+        "email": user.email,
+        "is_admin": user.is_admin,  # 🔥 Token'a admin bilgisi ekle
+        # 🔥 Mikrosaniye hassasiyetinde: iptal listesi bu an ve öncesindeki token'ları reddeder,
+        # iptalle aynı saniyede yeniden giriş yapan kullanıcının yeni token'ı geçerli kalır
+        "iat": round(issued_at.timestamp(), 6),
+        "exp": expiration_time
+    }
+    return jwt.encode(token_payload, SECRET_KEY, algorithm="HS256")
+
+
 def authorized():
     def decorator(f):
         @wraps(f)
         async def decorated_function(request, *args, **kwargs):
-            token = None
-            if "Authorization" in request.headers:
-                try:
-                    token = request.headers["Authorization"].split(" ")[1]
-                except IndexError:
-                    return json({"basarili": False, "mesaj": "Token formatı hatalı."}, status=401)
-            
-            if not token:
-                return json({"basarili": False, "mesaj": "Token bulunamadı. Giriş yapmalısınız."}, status=401)
-
-            try:
-                payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-                request.ctx.user_id = payload["user_id"]
-            except jwt.ExpiredSignatureError:
-                return json({"basarili": False, "mesaj": "Oturum süresi doldu. Tekrar giriş yapın."}, status=401)
-            except jwt.InvalidTokenError:
-                return json({"basarili": False, "mesaj": "Geçersiz token."}, status=401)
+            payload, error = decode_request_token(request)
+            if error:
+                return error
 
             return await f(request, *args, **kwargs)
         return decorated_function
@@ -107,53 +228,93 @@ def authorized():
 # -------------------------------------------------
 # ADMIN KONTROL (Middleware)
 # -------------------------------------------------
+# 🔥 YETKİ ÖNBELLEĞİ: {user_id: aktif admin mi}. Kısa ömürlü; ban/unban/silme anında
+# siler ve tüm worker'lara duyurur. Token'da is_admin yoksa DB'ye hiç gidilmez.
+ADMIN_AUTH_TTL = float(os.getenv("ADMIN_AUTH_CACHE_TTL", 30))
+ADMIN_AUTH_CACHE = SharedCache(
+    "admin", CACHE_BACKEND, ttl=ADMIN_AUTH_TTL,
+    local=BoundedCache(max_bytes=256 * 1024, max_entries=1024, ttl=ADMIN_AUTH_TTL),
+)
+# Aynı anda gelen istekler aynı DB sorgusunu bekler (panel açılışında paralel istekler)
+_ADMIN_LOOKUPS = {}
+
+
+def is_active_ban(is_banned, ban_until):
+    """Ban hâlâ geçerli mi? (süresi dolmuş ama henüz temizlenmemiş banlar sayılmaz)"""
+    if not is_banned:
+        return False
+    return ban_until is None or to_istanbul_tz(ban_until) > now_istanbul()
+
+
+async def _load_admin_status(user_id, stamp=None):
+    user = await User.get_or_none(user_id=user_id).only("user_id", "is_admin", "is_banned", "ban_until")
+    allowed = bool(user and user.is_admin and not is_active_ban(user.is_banned, user.ban_until))
+    # Okuma sırasında ban/yetki değiştiyse eski sonuç önbelleğe yazılmaz
+    await ADMIN_AUTH_CACHE.set(user_id, allowed, stamp=stamp)
+    return allowed
+
+
+async def is_active_admin(user_id):
+    allowed, stamp = await ADMIN_AUTH_CACHE.lookup(user_id)
+    if allowed is not None:
+        return allowed
+
+    lookup = _ADMIN_LOOKUPS.get(user_id)
+    if lookup is None:
+        lookup = _ADMIN_LOOKUPS[user_id] = asyncio.ensure_future(_load_admin_status(user_id, stamp))
+        lookup.add_done_callback(lambda _: _ADMIN_LOOKUPS.pop(user_id, None))
+    return await asyncio.shield(lookup)
+
+
 def admin_required():
     """Sadece admin kullanıcıların erişebileceği endpoint'ler için"""
     def decorator(f):
         @wraps(f)
         async def decorated_function(request, *args, **kwargs):
-            print(f"🔐 AUTH CHECK for {request.path}")
-            # Önce token kontrolü yap
-            token = None
-            if "Authorization" in request.headers:
-                try:
-                    token = request.headers["Authorization"].split(" ")[1]
-                except IndexError:
-                    print("🔐 Token format error")
-                    return json({"basarili": False, "mesaj": "Token formatı hatalı."}, status=401)
-            
-            if not token:
-                print("🔐 No token found")
-                return json({"basarili": False, "mesaj": "Token bulunamadı. Giriş yapmalısınız."}, status=401)
+            payload, error = decode_request_token(request)
+            if error:
+                return error
 
             try:
-                payload = jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
-                user_id = payload["user_id"]
-                request.ctx.user_id = user_id
-                print(f"🔐 Token decoded, user_id: {user_id}")
-                
-                # Kullanıcının admin olup olmadığını kontrol et
-                user = await User.get_or_none(user_id=user_id)
-                if not user or not user.is_admin:
-                    print(f"🔐 User {user_id} NOT ADMIN")
+                # Hızlı yol: token admin olmadığını söylüyorsa sorguya gerek yok.
+                # Admin diyorsa yetki geri alınmış olabilir, önbellek/DB ile doğrula.
+                if not payload.get("is_admin") or not await is_active_admin(payload["user_id"]):
                     return json({"basarili": False, "mesaj": "Bu işlem için yönetici yetkisi gerekiyor."}, status=403)
-                
-                print(f"🔐 User {user_id} authorized")
-                    
-            except jwt.ExpiredSignatureError:
-                print("🔐 Token expired")
-                return json({"basarili": False, "mesaj": "Oturum süresi doldu. Tekrar giriş yapın."}, status=401)
-            except jwt.InvalidTokenError:
-                print("🔐 Token invalid")
-                return json({"basarili": False, "mesaj": "Geçersiz token."}, status=401)
-            except Exception as e:
-                print(f"🔐 Auth error: {e}")
-                return json({"basarili": False, "mesaj": str(e)}, status=500)
+            except Exception:
+                # Ayrıntı sadece sunucu loguna; istemciye iç hata metni dönülmez
+                logger.exception("🔐 Admin yetki kontrolü başarısız")
+                return json({"basarili": False, "mesaj": "Yetki kontrolü sırasında hata oluştu."}, status=500)
 
             return await f(request, *args, **kwargs)
         return decorated_function
     return decorator
 
+# -------------------------------------------------
+# JSON YANIT SIKIŞTIRMA (gzip)
+# -------------------------------------------------
+GZIP_MIN_SIZE = 1024
+
+@app.on_response
+async def compress_json(request, response):
+    """Büyük JSON yanıtlarını (etkinlik listeleri vb.) istemci destekliyorsa gzip'le"""
+    body = response.body
+    if (
+        not body
+        or len(body) < GZIP_MIN_SIZE
+        or not (response.content_type or "").startswith("application/json")
+        or "Content-Encoding" in response.headers
+        or "gzip" not in request.headers.get("Accept-Encoding", "")
+    ):
+        return
+    response.body = gzip.compress(body, compresslevel=5)
+    response.headers["Content-Encoding"] = "gzip"
+    response.headers["Vary"] = "Accept-Encoding"
+    # Sıkıştırılmış gövde byte olarak farklı: güçlü ETag zayıf olarak işaretlenir
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        response.headers["ETag"] = "W/" + etag
+
+
 # -------------------------------------------------
 # ORM BAĞLANTISI (.env DOSYASINDAN OKUR)
 # -------------------------------------------------
@@ -175,52 +336,39 @@ async def init_orm(app, loop):
         timezone="UTC",
         use_tz=True,
     )
-    try:
-        await Tortoise.generate_schemas()
-    except:
-        pass
+    # 🔥 Şema burada oluşturulmaz; deploy sırasında "python migrate.py" çalıştırılır
     print("✅ Tortoise ORM hazır")
 
-@app.listener("after_server_stop")
-async def close_orm(app, loop):
-    await Tortoise.close_connections()
-    print("🔻 ORM bağlantıları kapandı")
+    # 🔥 bcrypt maliyetini bu makinede gecikme bütçesine göre ayarla
+    rounds = await PASSWORD_HASHER.calibrate_async()
+    print(f"✅ Şifre hash maliyeti: {rounds} round")
 
+    USER_WRITES.start()
+    SCHEDULER.start()
+    if MAIL_OUTBOX.configured:
+        MAIL_OUTBOX.start()
 
-# -------------------------------------------------
-# Mail helper
-# -------------------------------------------------
-def send_email_sync(email, reset_link):
-    import sys
     try:
-        print(f"📧 Gmail User: {os.getenv('GMAIL_USER')}", flush=True, file=sys.stderr)
-        print(f"📧 Email To: {email}", flush=True, file=sys.stderr)
-        
-        msg = EmailMessage()
-        msg["Subject"] = "CampusHub Ankara - Şifre Sıfırlama"
-        msg["From"] = os.getenv("GMAIL_USER")
-        msg["To"] = email
-        msg.set_content(
-            f"Merhaba,\n\nŞifreni sıfırlamak için: {reset_link}\n\nCampusHub Ekibi"
-        )
-        print("📧 Email message created", flush=True, file=sys.stderr)
-
-        print("📧 Connecting to SMTP...", flush=True, file=sys.stderr)
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            print("📧 Connected to SMTP", flush=True, file=sys.stderr)
-            print(f"📧 Logging in with user: {os.getenv('GMAIL_USER')}", flush=True, file=sys.stderr)
-            smtp.login(os.getenv("GMAIL_USER"), os.getenv("GMAIL_PASS"))
-            print("📧 Login successful", flush=True, file=sys.stderr)
-            smtp.send_message(msg)
-            print("📧 Message sent", flush=True, file=sys.stderr)
-        
-        print("✅ Email gönderildi!", flush=True, file=sys.stderr)
-        return True
+        count = await TOKEN_REVOCATIONS.load()
+        print(f"✅ Token iptal listesi yüklendi ({count} kullanıcı)")
     except Exception as e:
-        import traceback
-        print(f"❌ Email Gönderme Hatası: {e}", flush=True, file=sys.stderr)
-        print(f"❌ Full Error: {traceback.format_exc()}", flush=True, file=sys.stderr)
-        return False
+        print(f"⚠️ Token iptal listesi yüklenemedi (migration çalıştırıldı mı?): {e}")
+
+@app.listener("after_server_stop")
+async def close_orm(app, loop):
+    # Bekleyen toplu yazmalar bağlantılar kapanmadan yazılır
+    await USER_WRITES.stop()
+    await MAIL_OUTBOX.stop()
+    await SCHEDULER.stop()
+    try:
+        await ROLLUPS.flush_logins()  # Bu worker'ın henüz yazılmamış giriş sayıları
+    except Exception as e:
+        print(f"⚠️ Giriş sayıları yazılamadı: {e!r}")
+    IMAGE_PIPELINE.shutdown()
+    PASSWORD_HASHER.shutdown()
+    await CACHE_BACKEND.close()
+    await Tortoise.close_connections()
+    print("🔻 ORM bağlantıları kapandı")
 
 
 # -------------------------------------------------
@@ -268,8 +416,11 @@ async def kayit_ol(request):
     if existing:
         return json({"basarili": False, "mesaj": "Bu e-posta zaten kayıtlı."}, status=409)
 
-    # 🔥 Şifreyi hash'le
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    # 🔥 Şifreyi hash'le (event loop dışında)
+    try:
+        hashed_password = await PASSWORD_HASHER.hash(password)
+    except PasswordHasherBusy:
+        return password_busy_response()
     
     user = await User.create(email=email, password=hashed_password)
     await UserProfile.create(
@@ -282,6 +433,8 @@ async def kayit_ol(request):
         profile_photo="",
         cover_photo=""
     )
+    await USER_SEARCH.changed(user.user_id)
+    await DASHBOARD_STATS.adjust(total_users=1, new_users_week=1)
 
     return json({"basarili": True, "mesaj": "Hesabınız başarıyla oluşturuldu!"}, status=201)
 
@@ -306,18 +459,24 @@ async def giris(request):
     password_valid = False
     
     try:
-        # Önce hash'lenmiş şifre olarak kontrol et
-        if bcrypt.checkpw(password.encode('utf-8'), user.password.encode('utf-8')):
-            password_valid = True
-    except (ValueError, AttributeError):
-        # Hash'lenmiş değilse (eski kullanıcı), plain text olarak kontrol et
-        if user.password == password:
-            password_valid = True
-            # 🔥 Otomatik migrate: Plain text şifreyi hash'le
-            hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            user.password = hashed_password
-            await user.save(update_fields=["password"])
-            print(f"✅ Kullanıcı {email} şifresi otomatik olarak hash'lendi")
+        try:
+            # Önce hash'lenmiş şifre olarak kontrol et
+            if await PASSWORD_HASHER.verify(password, user.password):
+                password_valid = True
+                # 🔥 Hash eski (düşük) maliyetle üretilmişse güncel maliyetle yenile
+                if PASSWORD_HASHER.needs_rehash(user.password):
+                    user.password = await PASSWORD_HASHER.hash(password)
+                    await user.save(update_fields=["password"])
+        except (ValueError, AttributeError):
+            # Hash'lenmiş değilse (eski kullanıcı), plain text olarak kontrol et
+            if user.password == password:
+                password_valid = True
+                # 🔥 Otomatik migrate: Plain text şifreyi hash'le
+                user.password = await PASSWORD_HASHER.hash(password)
+                await user.save(update_fields=["password"])
+                print(f"✅ Kullanıcı {email} şifresi otomatik olarak hash'lendi")
+    except PasswordHasherBusy:
+        return password_busy_response()
     
     if not password_valid:
         return json({"basarili": False, "mesaj": "Şifre yanlış."}, status=401)
@@ -326,18 +485,11 @@ async def giris(request):
     if user.is_banned:
         # Ban süresi kontrolü
         if user.ban_until:
-            # Ban süresi geçmiş mi?
+            # Ban süresi dolmuşsa girişe izin verilir (kaydı zamanlanmış iş temizler)
             now = now_istanbul()
             ban_until_ist = to_istanbul_tz(user.ban_until)
             
-            if now >= ban_until_ist:
-                # Ban süresi dolmuş, otomatik kaldır
-                user.is_banned = False
-                user.ban_reason = None
-                user.ban_until = None
-                await user.save(update_fields=["is_banned", "ban_reason", "ban_until"])
-                print(f"✅ Kullanıcı {email} banı otomatik olarak kaldırıldı (süre doldu)")
-            else:
+            if now < ban_until_ist:
                 # Hala banlı
                 kalan_sure = ban_until_ist - now
                 kalan_gun = kalan_sure.days
@@ -356,18 +508,12 @@ async def giris(request):
 
 
     # Token oluşturma
-    expiration_time = now_istanbul() + timedelta(hours=24)
-    token_payload = {
-        "user_id": user.user_id,
-        "email": user.email,
-        "is_admin": user.is_admin,  # 🔥 Token'a admin bilgisi ekle
-        "exp": expiration_time
-    }
-    
-    token = jwt.encode(token_payload, SECRET_KEY, algorithm="HS256")
+    token = create_access_token(user)
 
+    # 🔥 Yanıtı bekletmeden: birkaç saniye içinde toplu UPDATE ile yazılır
     user.last_login = now_istanbul()
-    await user.save(update_fields=["last_login"])
+    USER_WRITES.touch_login(user.user_id, user.last_login)
+    ROLLUPS.record_login(user.last_login)
 
     return json({
         "basarili": True, 
@@ -380,8 +526,6 @@ async def giris(request):
 # -------------------------------------------------
 # Şifremi Unuttum
 # -------------------------------------------------
-RESET_TOKENS = {}
-
 @app.post("/api/sifremi-unuttum")
 async def sifremi_unuttum(request):
     data = request.json or {}
@@ -394,16 +538,24 @@ async def sifremi_unuttum(request):
     if not user:
         return json({"basarili": False, "mesaj": "Bu e-posta sistemde kayıtlı değil."}, status=404)
 
-    token = secrets.token_urlsafe(32)
-    expires_at = now_istanbul() + timedelta(hours=1)
-    RESET_TOKENS[token] = {"email": email, "expires_at": expires_at}
+    # 🔥 Gönderici tanımlı değilse outbox hiç başlamaz; bağlantı gönderildi denmez
+    if not MAIL_OUTBOX.configured:
+        return json({"basarili": False, "mesaj": "Sunucu email ayarları eksik (.env)."}, status=500)
+
+    token = await RESET_TOKENS.issue(email)
+    if token is None:
+        return json({"basarili": False, "mesaj": "Çok fazla sıfırlama isteği. Lütfen daha sonra tekrar deneyin."}, status=429)
 
     frontend_url = os.getenv("FRONTEND_URL", "http://localhost:5173")
     reset_link = f"{frontend_url}/sifre-sifirla?token={token}"
 
     try:
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, partial(send_email_sync, email, reset_link))
+        # 🔥 Sadece sıraya yazılır; gönderimi arka plandaki outbox yapar
+        await MAIL_OUTBOX.enqueue(
+            email,
+            "CampusHub Ankara - Şifre Sıfırlama",
+            f"Merhaba,\n\nŞifreni sıfırlamak için: {reset_link}\n\nCampusHub Ekibi",
+        )
         return json({"basarili": True, "mesaj": "Şifre sıfırlama bağlantısı gönderildi."})
     except Exception as e:
         print("Mail gönderim hatası:", e)
@@ -419,26 +571,30 @@ async def sifre_sifirla(request):
     token = data.get("token", "")
     new_password = data.get("password", "")
 
-    entry = RESET_TOKENS.get(token)
-    now_ist = now_istanbul()
-
-    if not entry or entry["expires_at"] < now_ist:
+    email = await RESET_TOKENS.lookup(token)
+    if not email:
         return json({"basarili": False, "mesaj": "Bağlantı geçersiz veya süresi dolmuş."}, status=400)
 
     if len(new_password) < 6:
         return json({"basarili": False, "mesaj": "Şifre en az 6 karakter olmalıdır."}, status=400)
 
-    email = entry["email"]
     user = await User.get_or_none(email=email)
     if not user:
         return json({"basarili": False, "mesaj": "Kullanıcı bulunamadı."}, status=404)
 
-    # 🔥 Yeni şifreyi hash'le
-    hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-    user.password = hashed_password
-    await user.save(update_fields=["password"])
+    # 🔥 Yeni şifreyi hash'le (event loop dışında)
+    try:
+        hashed = await PASSWORD_HASHER.hash(new_password)
+    except PasswordHasherBusy:
+        return password_busy_response()
+
+    # Tek kullanımlık: aynı bağlantıyla gelen ikinci istek burada reddedilir
+    if not await RESET_TOKENS.consume(token):
+        return json({"basarili": False, "mesaj": "Bağlantı geçersiz veya süresi dolmuş."}, status=400)
 
-    del RESET_TOKENS[token]
+    user.password = hashed
+    await user.save(update_fields=["password"])
+    await TOKEN_REVOCATIONS.revoke(user.user_id)  # Eski oturumlar kapanır
 
     return json({"basarili": True, "mesaj": "Şifreniz başarıyla sıfırlandı."}, status=200)
 
@@ -446,70 +602,252 @@ async def sifre_sifirla(request):
 # -------------------------------------------------
 # Etkinlikler
 # -------------------------------------------------
-@app.get("/api/etkinlikler")
-@authorized()
-async def etkinlikler(request):
-    university_name = request.args.get("university")
-    date_str = request.args.get("date")
-    status = request.args.get("status")
+# 🔥 Seçilebilir alanlar: ?fields=id,title,date,university  veya  ?lean=1
+EVENT_CARD_FIELDS = Projection(
+    Field("id", {"id": "e.event_id"}),
+    Field("title", {"title": "e.title"}),
+    Field("university", {"university": "uni.name"}),
+    Field("location", {"location": "e.location"}),
+    Field("description", {"description": "e.description"}),
+    Field("date", {"start_datetime": "e.start_datetime"}, strftime_of("start_datetime", "%Y-%m-%d", to_istanbul_tz)),
+    Field("time", {"start_datetime": "e.start_datetime"}, strftime_of("start_datetime", "%H:%M", to_istanbul_tz)),
+    Field("end_datetime", {"end_datetime": "e.end_datetime"}, isoformat_of("end_datetime")),  # 🔥 Bitiş zamanı
+    lean=("id", "title", "university", "date", "time"),
+    always=("id",),
+)
 
-    query = """
-        SELECT 
-            e.event_id AS id,
-            e.title,
-            e.description,
-            e.location,
-            uni.name AS university,
-            e.start_datetime AS start_datetime,
-            e.end_datetime AS end_datetime
+# 🔥 Sayfalama imleci için her zaman çekilen sıralama kolonları
+EVENT_CURSOR_COLUMNS = {"cursor_start": "e.start_datetime", "cursor_id": "e.event_id"}
+
+# 🔥 ETKİNLİK KATALOĞU: Aktif etkinlikler worker belleğinde, kart alanları hazır biçimlendirilmiş.
+# Liste istekleri MySQL'e gitmez; admin etkinlik değiştirince katalog tüm worker'larda yenilenir.
+# EVENT_CATALOGUE=0 ile kapatılırsa her istek doğrudan SQL ile çalışır.
+EVENT_CATALOGUE_ENABLED = os.getenv("EVENT_CATALOGUE", "1") != "0"
+
+async def load_event_catalogue():
+    all_fields = EVENT_CARD_FIELDS.parse({})
+    columns = {**EVENT_CURSOR_COLUMNS, "cursor_end": "e.end_datetime"}
+    query = f"""
+        SELECT
+            {EVENT_CARD_FIELDS.sql_select(all_fields, columns)}
+        FROM events e
+        LEFT JOIN universities uni ON e.university_id = uni.university_id
+        WHERE e.is_active = TRUE
+    """
+    rows = await connections.get("default").execute_query_dict(query)
+    return [
+        CatalogueEntry(r["cursor_id"], r["cursor_start"], r["cursor_end"], r["university"],
+                       Projection.render(r, all_fields))
+        for r in rows
+    ]
+
+EVENT_CATALOGUE = EventCatalogue(load_event_catalogue, CACHE_BACKEND)
+
+# 🔥 ARAMA INDEX'İ: Başlık, açıklama, kulüp, kategori ve üniversite adı (Türkçe katlamalı)
+EVENT_SEARCH_QUERY = """
+    SELECT e.event_id, e.title, e.description, e.club, e.category, uni.name AS university
+    FROM events e
+    LEFT JOIN universities uni ON e.university_id = uni.university_id
+    WHERE e.is_active = TRUE
+"""
+
+def _search_fields(row):
+    return {name: row[name] for name in ("title", "description", "club", "category", "university")}
+
+async def load_search_documents():
+    rows = await connections.get("default").execute_query_dict(EVENT_SEARCH_QUERY)
+    return [(r["event_id"], _search_fields(r)) for r in rows]
+
+async def load_search_document(event_id):
+    rows = await connections.get("default").execute_query_dict(
+        EVENT_SEARCH_QUERY + " AND e.event_id = %s", [event_id]
+    )
+    return _search_fields(rows[0]) if rows else None
+
+EVENT_SEARCH = EventSearchIndex(load_search_documents, load_search_document, CACHE_BACKEND)
+
+def build_event_list_query(selected, university=None, start_range=(None, None),
+                           current_only=False, paginate=False, after=None, limit=None):
+    """Etkinlik listesi SQL'i ve parametreleri. Tarihler naive UTC olmalı."""
+    query = f"""
+        SELECT
+            {EVENT_CARD_FIELDS.sql_select(selected, EVENT_CURSOR_COLUMNS if paginate else None)}
         FROM events e
         LEFT JOIN universities uni ON e.university_id = uni.university_id
         WHERE e.is_active = TRUE
     """
     params = []
 
-    if university_name:
+    if university:
         query += " AND uni.name = %s"
-        params.append(university_name)
+        params.append(university)
+
+    # 🔥 Yarı açık aralık [başlangıç, bitiş): (is_active, start_datetime) index'i ile aranır
+    range_start, range_end = start_range
+    if range_start:
+        query += " AND e.start_datetime >= %s"
+        params.append(range_start)
+    if range_end:
+        query += " AND e.start_datetime < %s"
+        params.append(range_end)
+
+    if current_only:
+        # Veritabanındaki tarihler UTC
+        query += " AND e.end_datetime >= %s"
+        params.append(datetime.now(timezone.utc).replace(tzinfo=None))
+
+    if paginate and after:
+        # 🔥 Keyset: son görülen (start_datetime, event_id)'den sonrası. OFFSET yok,
+        # derin sayfalar da index üzerinden doğrudan başlar. Tarihsiz etkinlikler en sonda.
+        last_start, last_id = after
+        if last_start is None:
+            query += " AND e.start_datetime IS NULL AND e.event_id < %s"
+            params.append(last_id)
+        else:
+            # İlk koşul index'te aralık araması (NULL'lar + <= son tarih), ikincisi
+            # aynı tarihteki satırları event_id ile ayırır
+            query += """ AND (e.start_datetime <= %s OR e.start_datetime IS NULL)
+                         AND (e.start_datetime < %s OR e.event_id < %s OR e.start_datetime IS NULL)"""
+            params.extend([last_start, last_start, last_id])
+
+    query += " ORDER BY e.start_datetime DESC, e.event_id DESC"
+    if paginate:
+        # Bir fazlasını çek: sonraki sayfa var mı anlamak için
+        query += " LIMIT %s"
+        params.append(limit + 1)
+    return query, params
+
+
+def build_event_cards_query(selected, event_ids):
+    """Arama sonuçlarının kartları (katalog kapalıyken). event_ids boş olmamalı."""
+    query = f"""
+        SELECT
+            {EVENT_CARD_FIELDS.sql_select(selected, {"cursor_id": "e.event_id"})}
+        FROM events e
+        LEFT JOIN universities uni ON e.university_id = uni.university_id
+        WHERE e.is_active = TRUE AND e.event_id IN ({", ".join(["%s"] * len(event_ids))})
+    """
+    return query, list(event_ids)
 
-    if date_str:
-        query += " AND DATE(e.start_datetime) = %s"
-        params.append(date_str)
 
-    if status == "guncel":
-        # Şu anki zamanı al (UTC veya veritabanı ile uyumlu olmalı)
-        now = datetime.utcnow()
-        query += " AND e.end_datetime >= %s"
-        params.append(now)
+@app.get("/api/etkinlikler")
+@authorized()
+async def etkinlikler(request):
+    """Aktif etkinlikler
 
-    query += " ORDER BY e.start_datetime DESC"
+    ?date=YYYY-MM-DD            : İstanbul saatine göre o günün etkinlikleri
+    ?from=YYYY-MM-DD&to=...     : İstanbul saatine göre gün aralığı (iki uç dahil)
+    ?limit=20&cursor=...        : sayfalı (imleç yanıttaki `next`)
+    """
+    date_str = request.args.get("date")
+    after = limit = None
 
     try:
-        conn = connections.get("default")
-        rows = await conn.execute_query_dict(query, params)
-        
-        etkinlikler_list = []
-        for r in rows:
-            sd = r["start_datetime"]
-            ed = r["end_datetime"]
-            etkinlikler_list.append({
-                "id": r["id"],
-                "title": r["title"],
-                "university": r["university"],
-                "location": r["location"],
-                "description": r["description"],
-                "date": sd.strftime("%Y-%m-%d") if sd else None,
-                "time": sd.strftime("%H:%M") if sd else None,
-                "end_datetime": ed.isoformat() if ed else None,  # 🔥 Bitiş zamanı eklendi
-            })
+        selected = EVENT_CARD_FIELDS.parse(request.args)
+        paginate = wants_pagination(request.args)
+        if paginate:
+            limit = parse_limit(request.args)
+            cursor = request.args.get("cursor")
+            after = decode_cursor(cursor, (datetime, int)) if cursor else None
+    except (ProjectionError, PaginationError) as e:
+        return json({"basarili": False, "mesaj": str(e)}, status=400)
 
-        return json({"basarili": True, "adet": len(etkinlikler_list), "etkinlikler": etkinlikler_list})
+    try:
+        if date_str:
+            day_start, day_end = istanbul_days_to_utc_range(date_str, date_str)
+        else:
+            day_start = day_end = None
+        range_start, range_end = istanbul_days_to_utc_range(request.args.get("from"), request.args.get("to"))
+    except ValueError:
+        return json({"basarili": False, "mesaj": "Tarih YYYY-AA-GG formatında olmalı ve aralık geçerli olmalı."}, status=400)
+
+    # Hem date hem from/to verilirse kesişim alınır
+    starts = [d for d in (day_start, range_start) if d]
+    ends = [d for d in (day_end, range_end) if d]
+    filters = {
+        "university": request.args.get("university"),
+        "start_range": (max(starts) if starts else None, min(ends) if ends else None),
+        "current_only": request.args.get("status") == "guncel",
+    }
+
+    try:
+        next_cursor = None
+        if EVENT_CATALOGUE_ENABLED:
+            # 🔥 Katalogdan oku: JOIN ve biçimlendirme yok, filtreler ikili arama ile
+            snapshot = await EVENT_CATALOGUE.snapshot()
+            entries = snapshot.query(
+                **filters, after=after, limit=limit + 1 if paginate else None,
+                now=datetime.now(timezone.utc).replace(tzinfo=None),
+            )
+            if paginate and len(entries) > limit:
+                entries = entries[:limit]
+                next_cursor = encode_cursor(entries[-1].start, entries[-1].event_id)
+            etkinlikler_list = [{field.name: e.card[field.name] for field in selected} for e in entries]
+        else:
+            query, params = build_event_list_query(selected, **filters, paginate=paginate, after=after, limit=limit)
+            conn = connections.get("default")
+            rows = await conn.execute_query_dict(query, params)
+
+            if paginate and len(rows) > limit:
+                rows = rows[:limit]
+                last = rows[-1]
+                next_cursor = encode_cursor(last["cursor_start"], last["cursor_id"])
+            etkinlikler_list = [Projection.render(r, selected) for r in rows]
+
+        response = {"basarili": True, "adet": len(etkinlikler_list), "etkinlikler": etkinlikler_list}
+        if paginate:
+            response["next"] = next_cursor
+        return json(response)
         
     except Exception as e:
         print(f"❌ HATA OLUŞTU: {str(e)}")
         return json({"basarili": False, "hata": str(e)}, status=500)
 
 
+# -------------------------------------------------
+# 🔍 ETKİNLİK ARAMA (Başlık, açıklama, kulüp, kategori)
+# -------------------------------------------------
+@app.get("/api/etkinlikler/ara")
+@authorized()
+async def etkinlik_ara(request):
+    """?q=konf  -> en alakalı etkinlikler (Türkçe karakter duyarsız, önek eşleşmeli)"""
+    q = (request.args.get("q") or "").strip()
+    if len(q) < 2:
+        return json({"basarili": False, "mesaj": "Arama en az 2 karakter olmalı."}, status=400)
+
+    try:
+        selected = EVENT_CARD_FIELDS.parse(request.args)
+        limit = parse_limit(request.args, default=20, maximum=50)
+    except (ProjectionError, PaginationError) as e:
+        return json({"basarili": False, "mesaj": str(e)}, status=400)
+
+    try:
+        hits = await EVENT_SEARCH.search(q, limit)
+        if EVENT_CATALOGUE_ENABLED:
+            snapshot = await EVENT_CATALOGUE.snapshot()
+            cards = {event_id: entry.card for event_id, entry in snapshot.by_id.items()}
+        elif hits:
+            # 🔥 Katalog kapalı: sadece bulunan etkinliklerin kartları SQL ile çekilir
+            query, params = build_event_cards_query(selected, [event_id for event_id, _ in hits])
+            rows = await connections.get("default").execute_query_dict(query, params)
+            cards = {r["cursor_id"]: Projection.render(r, selected) for r in rows}
+        else:
+            cards = {}
+
+        sonuclar = []
+        for event_id, score in hits:
+            entry = cards.get(event_id)
+            if entry is None:  # Bu arada pasif yapılmış / silinmiş
+                continue
+            card = {field.name: entry[field.name] for field in selected}
+            card["score"] = score
+            sonuclar.append(card)
+
+        return json({"basarili": True, "adet": len(sonuclar), "etkinlikler": sonuclar})
+    except Exception as e:
+        print(f"Etkinlik arama hatası: {e}")
+        return json({"basarili": False, "mesaj": str(e)}, status=500)
+
 
 # -------------------------------------------------
 # Takvime Ekle (ÇOKLU SİLME)
@@ -550,25 +888,41 @@ async def takvime_ekle(request):
 # -------------------------------------------------
 # Kullanıcının takvimi
 # -------------------------------------------------
+CALENDAR_FIELDS = Projection(
+    Field("id", {"id": "e.event_id"}),
+    Field("title", {"title": "e.title"}),
+    Field("university", {"university": "uni.name"}),
+    Field("location", {"location": "e.location"}),
+    Field("description", {"description": "e.description"}),
+    # Taşınmamış base64 görseller veritabanından hiç çekilmez, sadece işaret döner
+    Field(
+        "image_url",
+        {"id": "e.event_id", "image_url": "CASE WHEN e.image_url LIKE 'data:%%' THEN 'data:' ELSE e.image_url END"},
+        lambda row: event_image_url(row["id"], row["image_url"]),  # 🔥 Etkinlik görselinin adresi
+    ),
+    Field("date", {"start_datetime": "e.start_datetime"}, strftime_of("start_datetime", "%Y-%m-%d", to_istanbul_tz)),
+    Field("time", {"start_datetime": "e.start_datetime"}, strftime_of("start_datetime", "%H:%M", to_istanbul_tz)),
+    lean=("id", "title", "university", "date", "time"),
+    always=("id",),
+)
+
 @app.get("/api/takvim")
 @authorized()
 async def takvim(request):
     user_id = request.ctx.user_id 
     
+    try:
+        selected = CALENDAR_FIELDS.parse(request.args)
+    except ProjectionError as e:
+        return json({"basarili": False, "mesaj": str(e)}, status=400)
+
     user = await User.get_or_none(user_id=user_id)
     if not user:
         return json({"basarili": False, "mesaj": "Kullanıcı bulunamadı."}, status=404)
 
-    query = """
+    query = f"""
         SELECT
-            e.event_id AS id,
-            e.title,
-            e.description,
-            e.location,
-            e.image_url,
-            uni.name AS university,
-            e.start_datetime AS start_datetime,
-            e.end_datetime AS end_datetime
+            {CALENDAR_FIELDS.sql_select(selected)}
         FROM favourite_events f
         JOIN events e ON f.event_id = e.event_id
         LEFT JOIN universities uni ON e.university_id = uni.university_id
@@ -579,19 +933,7 @@ async def takvim(request):
     conn = connections.get("default")
     rows = await conn.execute_query_dict(query, [user.user_id])
 
-    user_events = []
-    for r in rows:
-        sd = r["start_datetime"]
-        user_events.append({
-            "id": r["id"],
-            "title": r["title"],
-            "university": r["university"],
-            "location": r["location"],
-            "description": r["description"],
-            "image_url": r["image_url"],  # 🔥 Etkinlik fotoğrafı
-            "date": sd.strftime("%Y-%m-%d") if sd else None,
-            "time": sd.strftime("%H:%M") if sd else None,
-        })
+    user_events = [Projection.render(r, selected) for r in rows]
 
     return json({"basarili": True, "adet": len(user_events), "takvim": user_events})
 
@@ -642,6 +984,7 @@ async def create_feedback(request):
             message=message,
             status="pending"
         )
+        await DASHBOARD_STATS.adjust(total_feedbacks=1, pending_feedbacks=1)
 
         return json({"basarili": True, "mesaj": "Geri bildiriminiz alındı. Teşekkür ederiz.", "feedback_id": fb.feedback_id}, status=201)
     
@@ -682,10 +1025,107 @@ async def get_universities(request):
         }, status=500)
 
 
+# -------------------------------------------------
+# 🖼️ MEDYA DOSYALARI (İçerik adresli, değişmez)
+# -------------------------------------------------
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [c.strip().removeprefix("W/") for c in if_none_match.split(",")]
+    return etag in candidates
+
+
+@app.get("/media/<key:str>")
+async def serve_media(request, key):
+    """Medya dosyasını ham byte olarak gönder (ETag + Range + uzun süreli cache)"""
+    return await media_response(request, key)
+
+
+@app.get("/media/etkinlik/<event_id:int>")
+async def serve_event_image(request, event_id):
+    """Etkinliğin sabit görsel adresi: /media/etkinlik/<id>?v=<sürüm>
+
+    Sürüm (v) görselin hash'inden türetilir; görsel değişince listelerdeki
+    adres de değişir. Eski sürümle gelen istek güncel adrese yönlendirilir.
+    """
+    rows = await Event.filter(event_id=event_id).values_list("image_url", flat=True)
+    value = rows[0] if rows else None
+
+    key = media_key_from_ref(value)
+    if key:
+        if request.args.get("v") != event_image_version(key):
+            return redirect(event_image_url(event_id, value), headers={"Cache-Control": "no-cache"})
+        return await media_response(request, variant_key(key, EVENT_CARD))
+
+    if value and value.startswith(("http://", "https://")):
+        return redirect(value)
+
+    # Henüz taşınmamış base64 görsel (migrate_media.py çalıştırılana kadar)
+    data = decode_data_uri(value)
+    if data:
+        return raw(data, content_type=sniff_image_type(data[:16]) or "application/octet-stream",
+                   headers={"Cache-Control": "no-cache"})
+
+    return json({"basarili": False, "mesaj": "Görsel bulunamadı."}, status=404)
+
+
+async def media_response(request, key):
+    # Varyantı üretilmemiş eski yüklemelerde orijinal dosyaya düşülür
+    key = MEDIA_STORE.resolve(key)
+    if not key:
+        return json({"basarili": False, "mesaj": "Dosya bulunamadı."}, status=404)
+
+    # İçerik hash ile adreslendiği için ETag doğrudan anahtarın kendisi (strong)
+    etag = f'"{key}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": MEDIA_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    if _etag_matches(request.headers.get("If-None-Match"), etag):
+        return empty(status=304, headers=headers)
+
+    loop = asyncio.get_running_loop()
+    size = await loop.run_in_executor(None, MEDIA_STORE.size, key)
+    head = await loop.run_in_executor(None, MEDIA_STORE.read, key, 0, 15)
+    content_type = sniff_image_type(head) or "application/octet-stream"
+
+    # If-Range farklı bir sürümü gösteriyorsa aralığı yok say, tüm dosyayı gönder
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if if_range and if_range != etag:
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        headers["Content-Range"] = f"bytes */{size}"
+        return empty(status=416, headers=headers)
+
+    if byte_range is None:
+        body = await loop.run_in_executor(None, MEDIA_STORE.read, key)
+        return raw(body, content_type=content_type, headers=headers)
+
+    start, end = byte_range
+    body = await loop.run_in_executor(None, MEDIA_STORE.read, key, start, end)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return raw(body, status=206, content_type=content_type, headers=headers)
+
+
 # -------------------------------------------------
 # 👤 PROFİL İŞLEMLERİ (CACHE EKLENDİ)
 # -------------------------------------------------
 
+def encoded_json_response(request, entry):
+    """Önceden serileştirilmiş gövdeyi gönder; istemcideki kopya aynıysa 304 dön"""
+    headers = {"ETag": entry.etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("If-None-Match"), entry.etag):
+        return empty(status=304, headers=headers)
+    return raw(entry.body, content_type="application/json", headers=headers)
+
+
 # 1. Profil Bilgilerini Getir (CACHE KULLANIYOR)
 @app.get("/api/profile")
 @authorized()
@@ -693,10 +1133,11 @@ async def get_profile(request):
     try:
         user_id = request.ctx.user_id
         
-        # 🔥 ÖNCE RAM'DEKİ CACHE'E BAK
-        if user_id in PROFILE_CACHE:
+        # 🔥 ÖNCE CACHE'E BAK (gövde hazır byte olarak tutulur, ETag ile 304 dönebilir)
+        cached, stamp = await PROFILE_CACHE.lookup(user_id)
+        if cached is not None:
             print(f"⚡ Cache'den getirildi: {user_id}")
-            return json(PROFILE_CACHE[user_id])
+            return encoded_json_response(request, cached)
 
         # Kullanıcıyı ve profilini çek
         user = await User.get_or_none(user_id=user_id).prefetch_related("profile")
@@ -714,8 +1155,8 @@ async def get_profile(request):
                 "email": user.email,
                 "full_name": user.profile.full_name or "",
                 "bio": user.profile.bio or "",
-                "profile_photo": user.profile.profile_photo or "",
-                "cover_photo": user.profile.cover_photo or "",
+                "profile_photo": media_url(user.profile.profile_photo, AVATAR_LARGE) or "",
+                "cover_photo": media_url(user.profile.cover_photo, COVER_WIDE) or "",
                 "role": user.role,
                 "department": user.profile.department or "", 
                 "grade": user.profile.grade or "",
@@ -723,11 +1164,12 @@ async def get_profile(request):
             }
         }
         
-        # 🔥 VERİTABANINDAN ALDIKTAN SONRA CACHE'E KAYDET
-        PROFILE_CACHE[user_id] = response_data
+        # 🔥 VERİTABANINDAN ALDIKTAN SONRA CACHE'E KAYDET (bir kez serileştirilir)
+        entry = EncodedEntry.from_value(response_data)
+        await PROFILE_CACHE.set(user_id, entry, stamp=stamp)
         print(f"💾 Cache'e kaydedildi: {user_id}")
         
-        return json(response_data)
+        return encoded_json_response(request, entry)
         
     except Exception as e:
         print(f"Profil Getirme Hatası: {e}")
@@ -754,6 +1196,15 @@ async def update_profile(request):
         new_photo = data.get("profile_photo")
         new_cover = data.get("cover_photo")
 
+        # 🔥 Fotoğraflar: medya adresi -> referans, base64 -> işle ve depoya yaz
+        try:
+            if new_photo:
+                new_photo = await IMAGE_PIPELINE.store_value(MEDIA_STORE, new_photo, "avatar")
+            if new_cover:
+                new_cover = await IMAGE_PIPELINE.store_value(MEDIA_STORE, new_cover, "cover")
+        except IMAGE_ERRORS as e:
+            return image_error_response(e)
+
         if user.profile:
             if new_name is not None: user.profile.full_name = new_name
             if new_bio is not None: user.profile.bio = new_bio
@@ -778,9 +1229,9 @@ async def update_profile(request):
 
         # 🔥 PROFİL GÜNCELLENDİĞİ İÇİN CACHE'İ SİL
         # Böylece bir sonraki istekte veritabanından taze veri çekilecek
-        if user_id in PROFILE_CACHE:
-            del PROFILE_CACHE[user_id]
+        if await PROFILE_CACHE.invalidate(user_id):
             print(f"🗑️ Cache temizlendi: {user_id}")
+        await USER_SEARCH.changed(user_id)
 
         return json({"basarili": True, "mesaj": "Profil başarıyla güncellendi."})
 
@@ -789,73 +1240,99 @@ async def update_profile(request):
         return json({"basarili": False, "mesaj": str(e)}, status=500)
 
 # 🔥 3. FOTOĞRAF GÜNCELLEME (HEM KAPAK HEM PROFİL) 🔥
-@app.post("/api/profil/foto-guncelle")
+# Gövde stream=True ile parça parça okunur; dosya belleğe toplanmaz
+@app.post("/api/profil/foto-guncelle", stream=True)
 @authorized()
 async def foto_guncelle(request):
-    try:
-        user_id = request.ctx.user_id
-        print(f"\n🔥 === foto_guncelle başladı === 🔥")
-        print(f"🔑 User ID: {user_id}")
-        print(f"� request.files: {list(request.files.keys()) if request.files else 'EMPTY'}")
-        
-        # Dosya kontrolü
-        if not request.files or "file" not in request.files:
-            print("❌ Dosya bulunamadı!")
-            return json({"basarili": False, "mesaj": "Dosya seçilmedi."}, status=400)
+    user_id = request.ctx.user_id
 
-        file = request.files["file"][0]
-        print(f"✅ Dosya alındı: name={file.name}, size={len(file.body)} bytes")
-        
+    # 🔥 Kullanıcı başına eş zamanlı yükleme sınırı (worker belleğini korur)
+    if not UPLOAD_LIMITER.try_acquire(user_id):
+        return json({"basarili": False, "mesaj": "Devam eden bir yüklemeniz var, lütfen bitmesini bekleyin."}, status=429)
+
+    upload = None
+    try:
         # 🔥 TÜR KONTROLÜ - Query parameter'dan oku
         foto_type = request.args.get("type", "avatar")
-        print(f"📸 Foto Tipi (URL param): {foto_type}")
 
-        # Dosyayı Base64'e çeviriyoruz
-        base64_img = "data:image/jpeg;base64," + base64.b64encode(file.body).decode('utf-8')
-        print(f"✅ Base64 conversion: {len(base64_img)} bytes")
+        # 🔥 Dosyayı akışla geçici dosyaya al: boyut sınırı ve resim türü
+        # kontrolü gövdenin tamamı gelmeden yapılır, SHA-256 yazarken hesaplanır
+        try:
+            upload = await receive_upload(request, "file")
+        except UploadRejected as e:
+            logger.debug("Yükleme reddedildi: user=%s %s", user_id, e.mesaj)
+            return json({"basarili": False, "mesaj": e.mesaj}, status=e.status)
+
+        # 🔥 Resmi işleme havuzuna gönder: metadata atılır, boyutlandırılmış WebP varyantları depoya yazılır
+        # (aynı dosya daha önce yüklendiyse tekrar işlenmez)
+        kind, variant = ("cover", COVER_WIDE) if foto_type == "cover" else ("avatar", AVATAR_LARGE)
+        try:
+            media_key = await IMAGE_PIPELINE.process_file(MEDIA_STORE, upload.path, upload.sha256, kind)
+        except IMAGE_ERRORS as e:
+            logger.debug("Resim işlenemedi: user=%s %r", user_id, e)
+            return image_error_response(e)
+        photo_ref = to_media_ref(media_key)
+        photo_url = media_url(photo_ref, variant)
 
         # Kullanıcı ve profil kontrolü
         user = await User.get_or_none(user_id=user_id).prefetch_related("profile")
         if not user:
-            print(f"❌ User bulunamadı: {user_id}")
             return json({"basarili": False, "mesaj": "Kullanıcı bulunamadı."}, status=404)
         if not user.profile:
-            print(f"❌ Profile bulunamadı: user={user.id}")
             return json({"basarili": False, "mesaj": "Profil bulunamadı."}, status=404)
 
         # Fotoğrafı güncelle
         if foto_type == "cover":
-            user.profile.cover_photo = base64_img
+            user.profile.cover_photo = photo_ref
             mesaj = "Kapak fotoğrafı güncellendi."
-            print("✅ Kapak fotoğrafı ayarlandı")
         else:
-            user.profile.profile_photo = base64_img
+            user.profile.profile_photo = photo_ref
             mesaj = "Profil fotoğrafı güncellendi."
-            print("✅ Profil fotoğrafı ayarlandı")
-            
+
         # Veritabanına kaydet
         await user.profile.save()
-        print(f"✅ Veritabanına kaydedildi!")
-
-        # Cache'i güncelle (veya temizle)
-        if user_id in PROFILE_CACHE:
-            # Cache var ise direkt update et - daha hızlı
-            PROFILE_CACHE[user_id]["profile"]["profile_photo"] = base64_img if foto_type == "avatar" else PROFILE_CACHE[user_id]["profile"].get("profile_photo")
-            PROFILE_CACHE[user_id]["profile"]["cover_photo"] = base64_img if foto_type == "cover" else PROFILE_CACHE[user_id]["profile"].get("cover_photo")
-            print("✅ Cache güncellendi")
-        else:
-            print("ℹ️ Cache'de veri yok (ilk upload)")
 
-        print(f"✅ === foto_guncelle başarıyla tamamlandı === ✅\n")
-        return json({"basarili": True, "mesaj": mesaj, "foto": base64_img, "type": foto_type})
+        # Cache'i temizle (kayıt yerinde değiştirilmez, sonraki istekte yeniden oluşur)
+        await PROFILE_CACHE.invalidate(user_id)
+        if foto_type != "cover":
+            await USER_SEARCH.changed(user_id)  # Arama sonucundaki küçük resim
+
+        return json({"basarili": True, "mesaj": mesaj, "foto": photo_url, "type": foto_type})
 
     except Exception as e:
-        print(f"Foto Upload Hatası: {e}")
+        logger.exception("Foto yükleme hatası: user=%s", user_id)
         return json({"basarili": False, "mesaj": str(e)}, status=500)
+    finally:
+        UPLOAD_LIMITER.release(user_id)
+        if upload:
+            upload.cleanup()
 
 # -------------------------------------------------
-# 🔍 KULLANICI ARAMA (GÜNCELLENDİ: Hayalet Kayıtları Gizler)
+# 🔍 KULLANICI ARAMA (Trigram index, hayalet kayıtlar index'e hiç girmez)
 # -------------------------------------------------
+# Sadece users tablosunda karşılığı olan profiller (JOIN) index'lenir
+USER_SEARCH_QUERY = """
+    SELECT u.user_id, p.full_name, p.department, p.grade, p.profile_photo
+    FROM user_profiles p
+    JOIN users u ON p.user_id = u.user_id
+"""
+
+def _user_card(row):
+    return UserCard(row["user_id"], row["full_name"] or "", row["department"], row["grade"], row["profile_photo"])
+
+async def load_user_cards():
+    rows = await connections.get("default").execute_query_dict(USER_SEARCH_QUERY)
+    return [(r["user_id"], _user_card(r)) for r in rows]
+
+async def load_user_card(user_id):
+    rows = await connections.get("default").execute_query_dict(
+        USER_SEARCH_QUERY + " WHERE u.user_id = %s", [user_id]
+    )
+    return _user_card(rows[0]) if rows else None
+
+USER_SEARCH = UserSearchIndex(load_user_cards, load_user_card, CACHE_BACKEND)
+
+
 @app.get("/api/kullanici-ara")
 @authorized()
 async def kullanici_ara(request):
@@ -865,21 +1342,15 @@ async def kullanici_ara(request):
         if not q or len(q) < 2:
             return json({"basarili": True, "sonuclar": []})
         
-        # 🔥 ÖNEMLİ: prefetch_related("user") ekledik.
-        # Bu sayede profille birlikte kullanıcı kaydını da çekiyoruz.
-        profiles = await UserProfile.filter(full_name__icontains=q).prefetch_related("user").limit(5).all()
-        
         results = []
-        for p in profiles:
-            # 🔥 KONTROL: Eğer kullanıcısı (users tablosundaki karşılığı) silinmişse listeye ekleme!
-            if p.user:
-                results.append({
-                    "user_id": p.user.user_id, # ID'yi user tablosundan alıyoruz, garanti olsun
-                    "full_name": p.full_name,
-                    "profile_photo": p.profile_photo,
-                    "department": p.department,
-                    "grade": p.grade
-                })
+        for card, _ in await USER_SEARCH.search(q, limit=5):
+            results.append({
+                "user_id": card.user_id,
+                "full_name": card.full_name,
+                "profile_photo": media_url(card.photo, AVATAR_THUMB),  # 🔥 Sadece küçük resim adresi
+                "department": card.department,
+                "grade": card.grade
+            })
         
         return json({"basarili": True, "sonuclar": results})
         
@@ -890,6 +1361,46 @@ async def kullanici_ara(request):
 # -------------------------------------------------
 # 🌍 HERKESE AÇIK PROFİL GÖRÜNTÜLEME (Public Profile)
 # -------------------------------------------------
+# ?fields=... favori etkinlikler, ?comment_fields=... yorumlar için
+PUBLIC_PROFILE_EVENT_FIELDS = Projection(
+    Field("id", {"id": "e.event_id"}),
+    Field("title", {"title": "e.title"}),
+    Field("university", {"university": "uni.name"}, lambda row: row["university"] or "Genel"),
+    # Taşınmamış base64 görseller veritabanından hiç çekilmez, sadece işaret döner
+    Field(
+        "image_url",
+        {"id": "e.event_id", "image_url": "CASE WHEN e.image_url LIKE 'data:%%' THEN 'data:' ELSE e.image_url END"},
+        lambda row: event_image_url(row["id"], row["image_url"]),  # 🔥 Etkinlik görselinin adresi
+    ),
+    Field("date", {"start_datetime": "e.start_datetime"}, strftime_of("start_datetime", "%Y-%m-%d", to_istanbul_tz)),
+    lean=("id", "title", "university", "date"),
+    always=("id",),
+)
+
+def build_public_profile_events_query(selected):
+    """Kullanıcının favori etkinlikleri (herkese açık profil). Parametre: user_id"""
+    return f"""
+        SELECT
+            {PUBLIC_PROFILE_EVENT_FIELDS.sql_select(selected)}
+        FROM favourite_events f
+        JOIN events e ON f.event_id = e.event_id
+        LEFT JOIN universities uni ON e.university_id = uni.university_id
+        WHERE f.user_id = %s
+    """
+
+PUBLIC_PROFILE_COMMENT_FIELDS = Projection(
+    Field("id", {"id": "comment_id"}),
+    Field("event_id", {"event_id": "event__event_id"}),  # 🔥 Etkinlik ID
+    Field("event_title", {"event_title": "event__title"}, lambda row: row["event_title"] or "Bilinmeyen Etkinlik"),
+    Field("event_date", {"event_start": "event__start_datetime"}, strftime_of("event_start", "%d.%m.%Y", to_istanbul_tz)),  # 🔥 Etkinlik tarihi
+    Field("event_university", {"event_university": "event__university__name"}, lambda row: row["event_university"] or "Genel"),  # 🔥 Üniversite
+    Field("message"),
+    Field("rating"),
+    Field("date", {"created_at": "created_at"}, strftime_of("created_at", "%d.%m.%Y")),
+    lean=("id", "event_id", "event_title", "rating", "date"),
+    always=("id",),
+)
+
 @app.get("/api/public-profile/<target_id:int>")
 @authorized()
 async def get_public_profile(request, target_id):
@@ -903,34 +1414,23 @@ async def get_public_profile(request, target_id):
             # Profil yoksa bile hata vermesin, boş göstersin
             return json({"basarili": False, "mesaj": "Bu kullanıcının profili henüz oluşturulmamış."}, status=404)
 
-        # 2. Katıldığı Etkinlikleri Çek
-        fav_rows = await FavouriteEvent.filter(user_id=target_id).prefetch_related("event", "event__university").all()
-        katildigi_etkinlikler = []
-        for fav in fav_rows:
-            e = fav.event
-            if e:
-                katildigi_etkinlikler.append({
-                    "id": e.event_id,
-                    "title": e.title,
-                    "university": e.university.name if e.university else "Genel",
-                    "image_url": e.image_url,  # 🔥 Etkinlik fotoğrafı
-                    "date": e.start_datetime.strftime("%Y-%m-%d") if e.start_datetime else None,
-                })
+        try:
+            event_fields = PUBLIC_PROFILE_EVENT_FIELDS.parse(request.args)
+            comment_fields = PUBLIC_PROFILE_COMMENT_FIELDS.parse(request.args, param="comment_fields")
+        except ProjectionError as e:
+            return json({"basarili": False, "mesaj": str(e)}, status=400)
+
+        # 2. Katıldığı Etkinlikleri Çek (sadece istenen kolonlar)
+        fav_rows = await connections.get("default").execute_query_dict(
+            build_public_profile_events_query(event_fields), [target_id]
+        )
+        katildigi_etkinlikler = [Projection.render(r, event_fields) for r in fav_rows]
 
         # 3. Yaptığı Yorumları Çek
-        comments = await Comment.filter(user_id=target_id).prefetch_related("event", "event__university").order_by("-created_at").all()
-        yorumlar = []
-        for c in comments:
-            yorumlar.append({
-                "id": c.comment_id,
-                "event_id": c.event.event_id if c.event else None,  # 🔥 Etkinlik ID
-                "event_title": c.event.title if c.event else "Bilinmeyen Etkinlik",
-                "event_date": c.event.start_datetime.strftime("%d.%m.%Y") if (c.event and c.event.start_datetime) else None,  # 🔥 Etkinlik tarihi
-                "event_university": c.event.university.name if (c.event and c.event.university) else "Genel",  # 🔥 Üniversite
-                "message": c.message,
-                "rating": c.rating,
-                "date": c.created_at.strftime("%d.%m.%Y")
-            })
+        comment_rows = await Comment.filter(user_id=target_id).order_by("-created_at").values(
+            **Projection.columns(comment_fields)
+        )
+        yorumlar = [Projection.render(r, comment_fields) for r in comment_rows]
 
         return json({
             "basarili": True,
@@ -939,8 +1439,8 @@ async def get_public_profile(request, target_id):
                 "bio": user.profile.bio,
                 "department": user.profile.department,
                 "grade": user.profile.grade,
-                "profile_photo": user.profile.profile_photo,
-                "cover_photo": user.profile.cover_photo,
+                "profile_photo": media_url(user.profile.profile_photo, AVATAR_LARGE),
+                "cover_photo": media_url(user.profile.cover_photo, COVER_WIDE),
                 "email": user.email 
             },
             "events": katildigi_etkinlikler,
@@ -953,50 +1453,114 @@ async def get_public_profile(request, target_id):
     # -------------------------------------------------
 # 🎫 TEK ETKİNLİK DETAYI ve YORUMLARI
 # -------------------------------------------------
+# Detay sayfası yorumların sadece ilk sayfasını taşır; devamı /yorumlar'dan
+COMMENT_PAGE_SIZE = 20
+
+def build_comment_page_query(event_id, after=None, limit=COMMENT_PAGE_SIZE):
+    """Bir etkinliğin yorumları, en yeniden eskiye (keyset sayfalı).
+
+    Sadece kartta gösterilen kolonlar çekilir. Henüz medya deposuna taşınmamış
+    base64 profil fotoğrafları (data URI) yanıta kopyalanmaz, NULL gelir.
+    (event_id, created_at) index'i sıralamayı da karşılar.
+    `after`: son görülen yorumun (created_at, comment_id) değeri.
+    """
+    query = """
+        SELECT c.comment_id, c.user_id, c.message, c.rating, c.created_at,
+               u.email, p.full_name,
+               CASE WHEN p.profile_photo LIKE %s THEN NULL ELSE p.profile_photo END AS photo
+        FROM comments c
+        JOIN users u ON u.user_id = c.user_id
+        LEFT JOIN user_profiles p ON p.user_id = c.user_id
+        WHERE c.event_id = %s
+    """
+    params = ["data:%", event_id]
+    if after:
+        last_created, last_id = after
+        query += " AND (c.created_at < %s OR (c.created_at = %s AND c.comment_id < %s))"
+        params.extend([last_created, last_created, last_id])
+    # Bir fazlasını çek: sonraki sayfa var mı anlamak için
+    query += " ORDER BY c.created_at DESC, c.comment_id DESC LIMIT %s"
+    params.append(limit + 1)
+    return query, params
+
+
+async def fetch_comment_page(event_id, after=None, limit=COMMENT_PAGE_SIZE):
+    """(yorumlar, sonraki imleç)"""
+    query, params = build_comment_page_query(event_id, after, limit)
+    rows = await connections.get("default").execute_query_dict(query, params)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["comment_id"])
+    comments = [{
+        "id": r["comment_id"],
+        "user_id": r["user_id"],
+        "user_name": r["full_name"] or r["email"],
+        "user_photo": media_url(r["photo"], AVATAR_THUMB),
+        "message": r["message"],
+        "rating": r["rating"],
+        "date": to_istanbul_tz(r["created_at"]).strftime("%d.%m.%Y %H:%M"),
+    } for r in rows]
+    return comments, next_cursor
+
+
+@app.get("/api/etkinlik/<event_id:int>/yorumlar")
+@authorized()
+async def event_comments(request, event_id):
+    """Etkinlik yorumları, en yeniden eskiye
+
+    ?limit=20&cursor=...    : sayfalı (imleç yanıttaki `next`)
+    """
+    try:
+        limit = parse_limit(request.args, default=COMMENT_PAGE_SIZE)
+        cursor = request.args.get("cursor")
+        after = decode_cursor(cursor, (datetime, int)) if cursor else None
+    except PaginationError as e:
+        return json({"basarili": False, "mesaj": str(e)}, status=400)
+
+    try:
+        comments, next_cursor = await fetch_comment_page(event_id, after, limit)
+        return json({"basarili": True, "yorumlar": comments, "next": next_cursor})
+    except Exception as e:
+        print(f"Yorum Listeleme Hatası: {e}")
+        return json({"basarili": False, "mesaj": str(e)}, status=500)
+
+
 @app.get("/api/etkinlik/<event_id:int>")
 @authorized()
 async def get_event_detail(request, event_id):
     try:
-        # 1. Etkinliği Bul
-        event = await Event.get_or_none(event_id=event_id).prefetch_related("university")
-        if not event:
-            return json({"basarili": False, "mesaj": "Etkinlik bulunamadı."}, status=404)
-
-        # 2. Bu Etkinliğe Yapılan Yorumları Bul
-        # Comment tablosundan bu event_id'ye ait olanları çekiyoruz
-        comments = await Comment.filter(event_id=event_id).prefetch_related("user", "user__profile").order_by("-created_at").all()
-        
-        comment_list = []
-        for c in comments:
-            # Yorum yapanın profil bilgilerini al (Avatar ve İsim için)
-            user_profile = c.user.profile if c.user and c.user.profile else None
-            
-            comment_list.append({
-                "id": c.comment_id,
-                "user_id": c.user.user_id,
-                "user_name": user_profile.full_name if user_profile else c.user.email,
-                "user_photo": user_profile.profile_photo if user_profile else None,
-                "message": c.message,
-                "date": to_istanbul_tz(c.created_at).strftime("%d.%m.%Y %H:%M")
-            })
+        # 1. Etkinliği Bul (önce önbellek; yorumlar her istekte taze çekilir)
+        event_data, stamp = await EVENT_CACHE.lookup(event_id)
+        if event_data is None:
+            event = await Event.get_or_none(event_id=event_id).prefetch_related("university")
+            if not event:
+                return json({"basarili": False, "mesaj": "Etkinlik bulunamadı."}, status=404)
 
-        # 3. Veriyi Gönder
-        return json({
-            "basarili": True,
-            "etkinlik": {
+            event_data = {
                 "id": event.event_id,
                 "title": event.title,
                 "description": event.description,
                 "location": event.location,
-                "date": event.start_datetime.strftime("%Y-%m-%d"),
-                "time": event.start_datetime.strftime("%H:%M"),
+                "date": to_istanbul_tz(event.start_datetime).strftime("%Y-%m-%d"),
+                "time": to_istanbul_tz(event.start_datetime).strftime("%H:%M"),
                 "university": event.university.name if event.university else "Genel",
                 "university_logo": event.university.logo_url if event.university else None,
-                "image_url": event.image_url,  # 🔥 Etkinlik fotoğrafı
+                "image_url": event_image_url(event.event_id, event.image_url),  # 🔥 Etkinlik görselinin adresi
                 "category": event.category,  # 🔥 Kategori
                 "club": event.club  # 🔥 Kulüp
-            },
-            "yorumlar": comment_list
+            }
+            await EVENT_CACHE.set(event_id, event_data, stamp=stamp)
+
+        # 2. Yorumların ilk sayfası (devamı /api/etkinlik/<id>/yorumlar?cursor=...)
+        comment_list, next_cursor = await fetch_comment_page(event_id)
+
+        # 3. Veriyi Gönder
+        return json({
+            "basarili": True,
+            "etkinlik": event_data,
+            "yorumlar": comment_list,
+            "yorumlar_next": next_cursor
         })
 
     except Exception as e:
@@ -1052,7 +1616,7 @@ async def add_comment(request, event_id):
                 "id": comment.comment_id,
                 "user_id": user.user_id,
                 "user_name": user_profile.full_name if user_profile else user.email,
-                "user_photo": user_profile.profile_photo if user_profile else None,
+                "user_photo": media_url(user_profile.profile_photo, AVATAR_THUMB) if user_profile else None,
                 "message": comment.message,
                 "rating": comment.rating,
                 "date": to_istanbul_tz(comment.created_at).strftime("%d.%m.%Y %H:%M"),
@@ -1073,39 +1637,20 @@ async def add_comment(request, event_id):
 async def admin_dashboard(request):
     """Admin paneli için genel istatistikler"""
     try:
-        # Toplam kullanıcı sayısı
-        total_users = await User.all().count()
-        
-        # Toplam etkinlik sayısı
-        total_events = await Event.all().count()
-        
-        # Aktif etkinlik sayısı
-        active_events = await Event.filter(is_active=True).count()
-        
-        # Toplam mesaj sayısı
-        total_messages = await ContactMessages.all().count()
-        
-        # Toplam feedback sayısı
-        total_feedbacks = await Feedback.all().count()
-        
-        # Pending feedback sayısı
-        pending_feedbacks = await Feedback.filter(status="pending").count()
-        
-        # Son 7 günde eklenen kullanıcılar
-        from datetime import timedelta
-        seven_days_ago = now_istanbul() - timedelta(days=7)
-        new_users_week = await User.filter(created_at__gte=seven_days_ago).count()
+        # 🔥 Bellekteki sayaçlar (süresi dolunca tek toplu sorguyla yenilenir)
+        counts = await DASHBOARD_STATS.get()
         
         return json({
             "basarili": True,
             "stats": {
-                "total_users": total_users,
-                "total_events": total_events,
-                "active_events": active_events,
-                "total_messages": total_messages,
-                "total_feedbacks": total_feedbacks,
-                "pending_feedbacks": pending_feedbacks,
-                "new_users_week": new_users_week
+                "total_users": counts["total_users"],
+                "total_events": counts["total_events"],
+                "active_events": counts["active_events"],
+                # İletişim mesajları için şemada tablo yok (ContactMessages modeli tanımlı değil)
+                "total_messages": 0,
+                "total_feedbacks": counts["total_feedbacks"],
+                "pending_feedbacks": counts["pending_feedbacks"],
+                "new_users_week": counts["new_users_week"]
             }
         })
     except Exception as e:
@@ -1113,71 +1658,181 @@ async def admin_dashboard(request):
         return json({"basarili": False, "mesaj": str(e)}, status=500)
 
 
+# 🔥 Zaman serisi: günlük özet tablosundan okunur
+TIMESERIES_DEFAULT_DAYS = 30
+TIMESERIES_MAX_DAYS = 3 * 366
+
+@app.get("/api/admin/stats/timeseries")
+@admin_required()
+async def admin_stats_timeseries(request):
+    """?metric=signups&from=YYYY-MM-DD&to=YYYY-MM-DD&bucket=day|week|month
+
+    Varsayılan: son 30 gün, günlük. Günler İstanbul takvimine göredir.
+    """
+    metric = request.args.get("metric")
+    bucket = request.args.get("bucket") or "day"
+    if metric not in METRICS:
+        return json({"basarili": False, "mesaj": f"metric şunlardan biri olmalı: {', '.join(METRICS)}"}, status=400)
+    if bucket not in BUCKETS:
+        return json({"basarili": False, "mesaj": f"bucket şunlardan biri olmalı: {', '.join(BUCKETS)}"}, status=400)
+
+    try:
+        to_str, from_str = request.args.get("to"), request.args.get("from")
+        last_day = date.fromisoformat(to_str) if to_str else now_istanbul().date()
+        first_day = date.fromisoformat(from_str) if from_str else last_day - timedelta(days=TIMESERIES_DEFAULT_DAYS - 1)
+    except ValueError:
+        return json({"basarili": False, "mesaj": "Tarih YYYY-AA-GG formatında olmalı."}, status=400)
+    if first_day > last_day:
+        return json({"basarili": False, "mesaj": "Başlangıç tarihi bitiş tarihinden sonra olamaz."}, status=400)
+    if (last_day - first_day).days >= TIMESERIES_MAX_DAYS:
+        return json({"basarili": False, "mesaj": f"En fazla {TIMESERIES_MAX_DAYS} günlük aralık istenebilir."}, status=400)
+
+    try:
+        values = await ROLLUPS.read(metric, first_day, last_day)
+        series = bucketize(values, first_day, last_day, bucket, gauge=metric in GAUGE_METRICS)
+        return json({
+            "basarili": True,
+            "metric": metric,
+            "bucket": bucket,
+            "from": first_day.isoformat(),
+            "to": last_day.isoformat(),
+            "series": series,
+        })
+    except Exception as e:
+        print(f"Zaman serisi hatası: {e}")
+        return json({"basarili": False, "mesaj": str(e)}, status=500)
+
+
+# 🔥 Önbellek istatistikleri (bu worker için): isabet/ıskalama/atılan kayıt sayıları
+@app.get("/api/admin/cache")
+@admin_required()
+async def admin_cache_stats(request):
+    return json({
+        "basarili": True,
+        "profile_cache": PROFILE_CACHE.stats(),
+        "event_cache": EVENT_CACHE.stats(),
+        "event_catalogue": EVENT_CATALOGUE.stats(),
+        "event_search": EVENT_SEARCH.stats(),
+        "user_search": USER_SEARCH.stats(),
+        "admin_auth_cache": ADMIN_AUTH_CACHE.stats(),
+        "token_revocations": TOKEN_REVOCATIONS.stats(),
+        "password_hasher": PASSWORD_HASHER.stats(),
+        "user_writes": USER_WRITES.stats(),
+        "mail_outbox": MAIL_OUTBOX.stats(),
+        "reset_tokens": RESET_TOKENS.stats(),
+        "scheduler": SCHEDULER.stats(),
+        "dashboard_stats": DASHBOARD_STATS.stats(),
+        "rollups": ROLLUPS.stats(),
+    })
+
+
 # -------------------------------------------------
 # 🔥 ADMIN PANELİ - KULLANICI YÖNETİMİ
 # -------------------------------------------------
 
 # Tüm kullanıcıları listele
+ADMIN_USER_FIELDS = Projection(
+    Field("user_id"),
+    Field("email"),
+    Field("full_name", {"full_name": "profile__full_name"}, lambda row: row["full_name"] or ""),
+    Field("role"),
+    Field("is_admin"),
+    Field("is_active"),
+    Field("is_banned"),  # 🔥 Güncellenmiş ban durumu
+    Field("ban_reason"),  # 🔥 Ban nedeni
+    Field("ban_until", render=isoformat_of("ban_until", to_istanbul_tz)),  # 🔥 Istanbul timezone
+    Field("created_at", render=isoformat_of("created_at", to_istanbul_tz)),  # 🔥 Istanbul timezone
+    Field("last_login", render=isoformat_of("last_login", to_istanbul_tz)),  # 🔥 Istanbul timezone
+    lean=("user_id", "email", "full_name", "is_admin", "is_banned"),
+    always=("user_id",),
+)
+
+# Sıralama ve ban kontrolü için, seçilmese de her zaman çekilen kolonlar
+ADMIN_USER_INTERNAL_COLUMNS = {
+    "user_id": "user_id", "is_admin": "is_admin", "created_at": "created_at",
+    "is_banned": "is_banned", "ban_until": "ban_until", "ban_reason": "ban_reason",
+}
+
+def build_admin_user_query(search=None, banned_only=False, admins_only=False, after=None, now=None):
+    """Admin kullanıcı listesi sorgusu: önce adminler, sonra en yeni kayıtlar.
+
+    Sıralama (is_admin DESC, created_at DESC, user_id DESC) SQL'de yapılır ve
+    (is_admin, created_at) index'ini kullanır. `after`: son görülen satırın
+    (is_admin, created_at, user_id) değeri (keyset sayfalama).
+    """
+    query = User.all()
+    if search:
+        query = query.filter(Q(email__icontains=search) | Q(profile__full_name__icontains=search))
+    if banned_only:
+        # Süresi dolmuş ama henüz temizlenmemiş banlar hariç
+        now = now or now_istanbul()
+        query = query.filter(Q(is_banned=True), Q(ban_until__isnull=True) | Q(ban_until__gt=now))
+    if admins_only:
+        query = query.filter(is_admin=True)
+    if after:
+        last_admin, last_created, last_id = bool(after[0]), after[1], after[2]
+        keyset = (
+            Q(is_admin=last_admin, created_at__lt=last_created)
+            | Q(is_admin=last_admin, created_at=last_created, user_id__lt=last_id)
+        )
+        if last_admin:
+            keyset |= Q(is_admin=False)
+        query = query.filter(keyset)
+    return query.order_by("-is_admin", "-created_at", "-user_id")
+
+
+def _flag(args, name):
+    return args.get(name) in ("1", "true")
+
+
 @app.get("/api/admin/users")
 @admin_required()
 async def admin_list_users(request):
-    """Tüm kullanıcıları listele"""
+    """Kullanıcıları listele (önce adminler, sonra en yeni kayıtlar)
+
+    ?q=ali                  : e-posta veya isimde geçenler
+    ?banned=1 / ?admin=1    : sadece banlı / sadece admin kullanıcılar
+    ?limit=50&cursor=...    : sayfalı (imleç yanıttaki `next`)
+    """
+    after = limit = None
     try:
-        users = await User.all().prefetch_related("profile").order_by("-created_at")
-        
-        # 🔥 Süresi geçmiş banları otomatik temizle
-        now = now_istanbul()
-        cleared_count = 0
-        
-        users_list = []
-        for user in users:
-            # Ban süresi kontrolü
-            if user.is_banned and user.ban_until:
-                ban_until_ist = to_istanbul_tz(user.ban_until)
-                
-                if now >= ban_until_ist:
-                    # Ban süresi dolmuş, otomatik kaldır
-                    user.is_banned = False
-                    user.ban_reason = None
-                    user.ban_until = None
-                    await user.save(update_fields=["is_banned", "ban_reason", "ban_until"])
-                    cleared_count += 1
-                    print(f"✅ Admin panel: {user.email} banı otomatik kaldırıldı")
-            
-            users_list.append({
-                "user_id": user.user_id,
-                "email": user.email,
-                "full_name": user.profile.full_name if user.profile else "",
-                "role": user.role,
-                "is_admin": user.is_admin,
-                "is_active": user.is_active,
-                "is_banned": user.is_banned,  # 🔥 Güncellenmiş ban durumu
-                "ban_reason": user.ban_reason,  # 🔥 Ban nedeni
-                "ban_until": to_istanbul_tz(user.ban_until).isoformat() if user.ban_until else None,  # 🔥 Istanbul timezone
-                "created_at": to_istanbul_tz(user.created_at).isoformat() if user.created_at else None,  # 🔥 Istanbul timezone
-                "last_login": to_istanbul_tz(user.last_login).isoformat() if user.last_login else None,  # 🔥 Istanbul timezone
-            })
-        
-        if cleared_count > 0:
-            print(f"📊 Admin panel: {cleared_count} kullanıcının süresi geçmiş banı temizlendi")
-        
-        # 🔥 Admin ve normal kullanıcıları ayır, sonra birleştir
-        admin_users = [u for u in users_list if u["is_admin"]]
-        regular_users = [u for u in users_list if not u["is_admin"]]
-        
-        # Her grubu kendi içinde kayıt tarihine göre sırala (en yeni üstte)
-        admin_users.sort(key=lambda x: x["created_at"] or "", reverse=True)
-        regular_users.sort(key=lambda x: x["created_at"] or "", reverse=True)
-        
-        # Önce admin kullanıcılar, sonra normal kullanıcılar
-        users_list = admin_users + regular_users
-        
-        # 🔥 DEBUG: İlk 3 kullanıcıyı logla
-        print("📋 İlk 3 kullanıcı sıralaması:")
-        for i, u in enumerate(users_list[:3], 1):
-            print(f"  {i}. {u['email']} - Admin: {u['is_admin']}")
-        
-        return json({"basarili": True, "count": len(users_list), "users": users_list})
+        selected = ADMIN_USER_FIELDS.parse(request.args)
+        paginate = wants_pagination(request.args)
+        if paginate:
+            limit = parse_limit(request.args)
+            cursor = request.args.get("cursor")
+            after = decode_cursor(cursor, (int, datetime, int)) if cursor else None
+    except (ProjectionError, PaginationError) as e:
+        return json({"basarili": False, "mesaj": str(e)}, status=400)
+
+    try:
+        query = build_admin_user_query(
+            search=(request.args.get("q") or "").strip() or None,
+            banned_only=_flag(request.args, "banned"),
+            admins_only=_flag(request.args, "admin"),
+            after=after,
+        )
+        if paginate:
+            # Bir fazlasını çek: sonraki sayfa var mı anlamak için
+            query = query.limit(limit + 1)
+        rows = await query.values(**Projection.columns(selected, ADMIN_USER_INTERNAL_COLUMNS))
+
+        next_cursor = None
+        if paginate and len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(int(last["is_admin"]), last["created_at"], last["user_id"])
+
+        # 🔥 Süresi geçmiş banlar kaldırılmış gösterilir (DB'yi zamanlanmış iş temizler, GET yazmaz)
+        for row in rows:
+            if row["is_banned"] and not is_active_ban(row["is_banned"], row["ban_until"]):
+                row.update(is_banned=False, ban_reason=None, ban_until=None)
+
+        users_list = [Projection.render(r, selected) for r in rows]
+        response = {"basarili": True, "count": len(users_list), "users": users_list}
+        if paginate:
+            response["next"] = next_cursor
+        return json(response)
     except Exception as e:
         print(f"Kullanıcı listeleme hatası: {e}")
         return json({"basarili": False, "mesaj": str(e)}, status=500)
@@ -1199,6 +1854,11 @@ async def admin_delete_user(request, user_id):
             return json({"basarili": False, "mesaj": "Kendi hesabınızı silemezsiniz."}, status=400)
         
         await user.delete()
+        await PROFILE_CACHE.invalidate(user_id)
+        await ADMIN_AUTH_CACHE.invalidate(user_id)
+        await TOKEN_REVOCATIONS.revoke(user_id)
+        await USER_SEARCH.changed(user_id)
+        await DASHBOARD_STATS.invalidate()  # Geri bildirimleri de silindi: sayaçlar yeniden yüklenir
         
         return json({"basarili": True, "mesaj": "Kullanıcı başarıyla silindi."})
     except Exception as e:
@@ -1211,30 +1871,50 @@ async def admin_delete_user(request, user_id):
 # -------------------------------------------------
 
 # Tüm etkinlikleri listele (admin için)
+ADMIN_EVENT_FIELDS = Projection(
+    Field("event_id"),
+    Field("title"),
+    Field("description"),
+    Field("category"),  # 🔥 Kategori
+    Field("club"),  # 🔥 Kulüp
+    Field("location"),
+    Field("university", {"university": "university__name"}),
+    Field("start_datetime", render=isoformat_of("start_datetime")),
+    Field("end_datetime", render=isoformat_of("end_datetime")),
+    Field("is_active"),
+    Field(
+        "image_url",
+        {"event_id": "event_id", "image_ref": "image_ref"},
+        lambda row: event_image_url(row["event_id"], row["image_ref"]),
+    ),
+    Field("max_participants"),
+    Field("created_at", render=isoformat_of("created_at")),
+    lean=("event_id", "title", "university", "start_datetime", "is_active"),
+    always=("event_id",),
+)
+
+# 🔥 Henüz taşınmamış base64 görseller MySQL'den çekilmez: adres için 'data:' işareti yeter
+ADMIN_EVENT_IMAGE_REF = RawSQL("CASE WHEN image_url LIKE 'data:%%' THEN 'data:' ELSE image_url END")
+
+def admin_events_query(selected):
+    columns = Projection.columns(selected)
+    query = Event.all().order_by("-created_at")
+    if "image_ref" in columns:
+        query = query.annotate(image_ref=ADMIN_EVENT_IMAGE_REF)
+    return query.values(**columns)
+
 @app.get("/api/admin/events")
 @admin_required()
 async def admin_list_events(request):
     """Tüm etkinlikleri listele (aktif + pasif)"""
     try:
-        events = await Event.all().prefetch_related("university").order_by("-created_at")
-        
-        events_list = []
-        for event in events:
-            events_list.append({
-                "event_id": event.event_id,
-                "title": event.title,
-                "description": event.description,
-                "category": event.category,  # 🔥 Kategori
-                "club": event.club,  # 🔥 Kulüp
-                "location": event.location,
-                "university": event.university.name if event.university else None,
-                "start_datetime": event.start_datetime.isoformat() if event.start_datetime else None,
-                "end_datetime": event.end_datetime.isoformat() if event.end_datetime else None,
-                "is_active": event.is_active,
-                "image_url": event.image_url,
-                "max_participants": event.max_participants,
-                "created_at": event.created_at.isoformat() if event.created_at else None,
-            })
+        try:
+            selected = ADMIN_EVENT_FIELDS.parse(request.args)
+        except ProjectionError as e:
+            return json({"basarili": False, "mesaj": str(e)}, status=400)
+
+        rows = await admin_events_query(selected)
+        events_list = [Projection.render(r, selected) for r in rows]
         
         return json({"basarili": True, "count": len(events_list), "events": events_list})
     except Exception as e:
@@ -1264,9 +1944,16 @@ async def admin_create_event(request):
         if not title:
             return json({"basarili": False, "mesaj": "Başlık gerekli."}, status=400)
         
+        # 🔥 Fotoğraf: base64 gelirse işleme havuzundan geçir, depoya yaz
+        try:
+            image_url = await IMAGE_PIPELINE.store_value(MEDIA_STORE, image_url, "event")
+        except IMAGE_ERRORS as e:
+            return image_error_response(e)
+        
         # Datetime dönüşümü
-        start_dt = datetime.fromisoformat(start_datetime) if start_datetime else None
-        end_dt = datetime.fromisoformat(end_datetime) if end_datetime else None
+        # Formdaki saatler İstanbul saati; veritabanına UTC yazılır
+        start_dt = istanbul_input_to_utc(start_datetime)
+        end_dt = istanbul_input_to_utc(end_datetime)
         
         event = await Event.create(
             title=title,
@@ -1282,6 +1969,10 @@ async def admin_create_event(request):
             is_active=True
         )
         
+        await EVENT_CATALOGUE.invalidate()
+        await EVENT_SEARCH.event_changed(event.event_id)
+        await DASHBOARD_STATS.adjust(total_events=1, active_events=1)
+
         return json({
             "basarili": True,
             "mesaj": "Etkinlik başarıyla oluşturuldu.",
@@ -1303,6 +1994,7 @@ async def admin_update_event(request, event_id):
             return json({"basarili": False, "mesaj": "Etkinlik bulunamadı."}, status=404)
         
         data = request.json or {}
+        was_active = bool(event.is_active)
         
         if "title" in data:
             event.title = data["title"]
@@ -1319,10 +2011,13 @@ async def admin_update_event(request, event_id):
         if "is_active" in data:
             event.is_active = data["is_active"]
         if "image_url" in data:  # 🔥 Fotoğraf güncelleme
-            event.image_url = data["image_url"]
+            try:
+                event.image_url = await IMAGE_PIPELINE.store_value(MEDIA_STORE, data["image_url"], "event")
+            except IMAGE_ERRORS as e:
+                return image_error_response(e)
             # Sadece fotoğraf gerçekten yüklendiğinde log yaz
             if data["image_url"]:
-                print(f"✅ Etkinlik {event_id} için fotoğraf güncellendi (size: {len(data['image_url'])} chars)")
+                print(f"✅ Etkinlik {event_id} için fotoğraf güncellendi ({event.image_url[:80]})")
         
         if "max_participants" in data:
             val = data["max_participants"]
@@ -1338,12 +2033,16 @@ async def admin_update_event(request, event_id):
             event.club = data["club"]
         
         if "start_datetime" in data and data["start_datetime"]:
-            event.start_datetime = datetime.fromisoformat(data["start_datetime"])
+            event.start_datetime = istanbul_input_to_utc(data["start_datetime"])
         
         if "end_datetime" in data and data["end_datetime"]:
-            event.end_datetime = datetime.fromisoformat(data["end_datetime"])
+            event.end_datetime = istanbul_input_to_utc(data["end_datetime"])
         
         await event.save()
+        await EVENT_CACHE.invalidate(event_id)  # 🔥 Tüm worker'larda eski detayı at
+        await EVENT_CATALOGUE.invalidate()
+        await EVENT_SEARCH.event_changed(event_id)
+        await DASHBOARD_STATS.adjust(active_events=int(bool(event.is_active)) - int(was_active))
         
         return json({"basarili": True, "mesaj": "Etkinlik başarıyla güncellendi."})
     except Exception as e:
@@ -1363,6 +2062,10 @@ async def admin_delete_event(request, event_id):
             return json({"basarili": False, "mesaj": "Etkinlik bulunamadı."}, status=404)
         
         await event.delete()
+        await EVENT_CACHE.invalidate(event_id)
+        await EVENT_CATALOGUE.invalidate()
+        await EVENT_SEARCH.event_changed(event_id)
+        await DASHBOARD_STATS.invalidate()  # Etkinliğin geri bildirimleri de silindi
         
         return json({"basarili": True, "mesaj": "Etkinlik başarıyla silindi."})
     except Exception as e:
@@ -1603,19 +2306,12 @@ async def admin_reply_feedback(request, feedback_id):
         if not user_email:
              return json({"basarili": False, "mesaj": "Kullanıcı emaili bulunamadı (Anonim?)."}, status=400)
 
-        # 🔥 EMAIL GÖNDERME (GERÇEK)
-        try:
-            gmail_user = os.getenv("GMAIL_USER")
-            gmail_pass = os.getenv("GMAIL_PASS")
-            
-            if gmail_user and gmail_pass:
-                msg = EmailMessage()
-                msg["Subject"] = f"Geri Bildirim Yanıtı: {feedback.title or 'Konusuz'}"
-                msg["From"] = gmail_user
-                msg["To"] = user_email
-                
-                body = f"""
-                Merhaba {feedback.user.profile.full_name if feedback.user and hasattr(feedback.user, 'profile') else 'Kullanıcı'},
+        if not MAIL_OUTBOX.configured:
+            return json({"basarili": False, "mesaj": "Sunucu email ayarları eksik (.env)."}, status=500)
+
+        full_name = feedback.user.profile.full_name if feedback.user and hasattr(feedback.user, 'profile') else 'Kullanıcı'
+        body = f"""
+                Merhaba {full_name},
                 
                 Geri bildiriminiz için teşekkür ederiz.
                 
@@ -1630,25 +2326,15 @@ async def admin_reply_feedback(request, feedback_id):
                 İyi günler dileriz,
                 CampusHub Yönetimi
                 """
-                msg.set_content(body)
-                
-                # SMTP Bağlantısı (TLS 587)
-                with smtplib.SMTP("smtp.gmail.com", 587) as smtp:
-                    smtp.starttls()
-                    smtp.login(gmail_user, gmail_pass)
-                    smtp.send_message(msg)
-                
-                print(f"✅ Email sent to {user_email}")
-            else:
-                return json({"basarili": False, "mesaj": "Sunucu email ayarları eksik (.env)."}, status=500)
-
-        except Exception as e:
-            print(f"❌ Email sending failed: {e}")
-            return json({"basarili": False, "mesaj": f"Email gönderilemedi: {str(e)}"}, status=500)
+        # 🔥 EMAIL: Sıraya yazılır, yanıt beklemeden döner (gönderim arka planda)
+        await MAIL_OUTBOX.enqueue(user_email, f"Geri Bildirim Yanıtı: {feedback.title or 'Konusuz'}", body)
         
         # Durumu güncelle
+        was_pending = feedback.status == "pending"
         feedback.status = "resolved"
         await feedback.save()
+        if was_pending:
+            await DASHBOARD_STATS.adjust(pending_feedbacks=-1)
         
         return json({"basarili": True, "mesaj": "Yanıt gönderildi ve durum güncellendi."})
     except Exception as e:
@@ -1692,6 +2378,9 @@ async def ban_user(request, user_id):
 
         
         await user.save()
+        await ADMIN_AUTH_CACHE.invalidate(user_id)  # Banlanan admin yetkisini hemen kaybeder
+        # Açık oturumlar hemen kapanır; kayıt ban bitince (veya token ömrü dolunca) düşer
+        await TOKEN_REVOCATIONS.revoke(user_id, until=user.ban_until.timestamp() if user.ban_until else None, ban=True)
         
         return json({"basarili": True, "mesaj": "Kullanıcı başarıyla banlandı."})
     except Exception as e:
@@ -1713,6 +2402,8 @@ async def unban_user(request, user_id):
         user.ban_reason = None
         user.ban_until = None
         await user.save()
+        await ADMIN_AUTH_CACHE.invalidate(user_id)
+        await TOKEN_REVOCATIONS.restore(user_id)  # Sadece ban iptali; şifre sıfırlama iptali kalır
         
         return json({"basarili": True, "mesaj": "Ban kaldırıldı."})
     except Exception as e:
@@ -1741,7 +2432,7 @@ async def get_event_for_edit(request, event_id):
                 "title": event.title,
                 "description": event.description,
                 "location": event.location,
-                "image_url": event.image_url,
+                "image_url": media_url(event.image_url, EVENT_CARD),
                 "university_id": event.university_id,
                 "university_name": event.university.name if event.university else None,
                 "start_datetime": event.start_datetime.isoformat() if event.start_datetime else None,
@@ -1758,4 +2449,4 @@ async def get_event_for_edit(request, event_id):
 
 
 if __name__ == "__main__":
-    app.run(host="127.0.0.1", port=8000)
+    app.run(host="127.0.0.1", port=8000, workers=int(os.getenv("SANIC_WORKERS", 1)))
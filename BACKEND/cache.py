@@ -0,0 +1,139 @@
+"""
+Sınırlı RAM önbelleği (LRU + TTL + byte bütçesi).
+
+Her worker kendi önbelleğini tutar. Toplam boyut `max_bytes` değerini veya
+kayıt sayısı `max_entries` değerini aşarsa en uzun süredir kullanılmayan
+kayıtlar atılır. Süresi (`ttl`) dolan kayıtlar okunurken yok sayılır.
+
+Önbellekteki değerler paylaşılır, yerinde değiştirilmemelidir: değişiklik
+gerektiğinde kayıt silinir (invalidate) ve bir sonraki istekte yeniden
+oluşturulur.
+"""
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+PROFILE_CACHE_MAX_BYTES = int(os.getenv("PROFILE_CACHE_MAX_BYTES", 8 * 1024 * 1024))
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", 10_000))
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", 300))
+
+
+def estimate_size(value):
+    """Değerin bellekteki yaklaşık boyutu (byte)"""
+    if isinstance(value, (bytes, bytearray, memoryview, EncodedEntry)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def encode_json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class EncodedEntry:
+    """Önceden JSON'a çevrilmiş yanıt gövdesi ve içerik özeti (ETag)
+
+    İsabetlerde tekrar serileştirme yapılmaz; gövde olduğu gibi gönderilir.
+    """
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body):
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    @classmethod
+    def from_value(cls, value):
+        return cls(encode_json(value))
+
+    def __len__(self):
+        return len(self.body)
+
+
+class BoundedCache:
+    """LRU + TTL önbellek; kayıt başına boyut tutulur ve bütçe aşılınca eskiler atılır"""
+
+    def __init__(self, max_bytes=PROFILE_CACHE_MAX_BYTES, max_entries=PROFILE_CACHE_MAX_ENTRIES,
+                 ttl=PROFILE_CACHE_TTL, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        # key -> (değer, boyut, son_geçerlilik)
+        self._entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        entry = self._entries.get(key)
+        return entry is not None and entry[2] > self.clock()
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry[2] <= self.clock():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key, value, size=None):
+        """Kaydı ekle. Tek başına bütçeyi aşan değerler önbelleğe alınmaz."""
+        size = estimate_size(value) if size is None else size
+        self._remove(key)
+        if size > self.max_bytes:
+            self.rejected += 1
+            return False
+
+        self._entries[key] = (value, size, self.clock() + self.ttl)
+        self.bytes += size
+        while self.bytes > self.max_bytes or len(self._entries) > self.max_entries:
+            old_key = next(iter(self._entries))
+            self._remove(old_key)
+            self.evictions += 1
+        return True
+
+    def invalidate(self, key):
+        return self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.bytes -= entry[1]
+        return True
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejected": self.rejected,
+        }
@@ -1,6 +1,12 @@
+from datetime import datetime, timedelta
+
 import pytest
 from app import app
 from sanic_testing import TestManager
+from tortoise import Tortoise
+from tortoise.backends.base.executor import EXECUTOR_CACHE
+
+from migrations import migrate
 # Doğrudan Client sınıfını import ediyoruz
 from sanic_testing.testing import SanicASGITestClient
 
@@ -15,4 +21,39 @@ async def test_client():
     """
     # app.asgi_client yerine doğrudan sınıfı kullanıyoruz
     async with SanicASGITestClient(app) as client:
-        yield client
\ No newline at end of file
+        yield client
+
+
+@pytest.fixture
+async def empty_db():
+    """Boş SQLite veritabanı (migration'lar uygulanmamış)"""
+    EXECUTOR_CACHE.clear()  # Başka bir testin MySQL ayarıyla hazırlanmış sorgular kalmasın
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": ["models"]}, use_tz=True)
+    yield Tortoise.get_connection("default")
+    await Tortoise.close_connections()
+    EXECUTOR_CACHE.clear()
+
+
+@pytest.fixture
+async def db(empty_db):
+    """Tüm migration'ları uygulanmış SQLite veritabanı"""
+    await migrate(empty_db, log=lambda *_: None)
+    return empty_db
+
+
+class Clock:
+    """Elle ilerletilen saat: sayı (epoch / monotonic) veya datetime tutar"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds) if isinstance(self.now, datetime) else seconds
+
+
+@pytest.fixture
+def clock():
+    return Clock()
@@ -12,6 +12,7 @@ load_dotenv()
 
 from tortoise import Tortoise
 from models import User, UserProfile
+from migrations import migrate
 
 
 async def create_admin():
@@ -33,10 +34,8 @@ async def create_admin():
         use_tz=True,
     )
     
-    try:
-        await Tortoise.generate_schemas()
-    except:
-        pass
+    # Şema migration'larla güncellenir (eksik olan varsa uygulanır)
+    await migrate(Tortoise.get_connection("default"))
     
     # Admin bilgileri
     admin_email = "campushub06@gmail.com"
@@ -0,0 +1,155 @@
+"""
+Admin paneli sayaçları.
+
+Dashboard her açılışta tablolar üzerinde yedi ayrı COUNT(*) çalıştırıyordu.
+Burada sayaçlar tek bir toplu sorguyla (her tablo bir kez taranır) yüklenir ve
+worker belleğinde tutulur; oluşturma / durum değişikliği yapan handler'lar
+sayaçları farkla (delta) günceller, yani dashboard okuması DB'ye gitmez.
+
+  * Farklar paylaşılan önbellek kanalıyla diğer worker'lara duyurulur
+    (duyuran worker kendi mesajını tekrar uygulamaz).
+  * Toplu silmeye yol açan işlemler (ör. kullanıcı silinince geri bildirimleri
+    de silinir) fark yerine sayaçları eskimiş işaretler; sonraki okuma yeniden
+    yükler.
+  * Kaçırılan duyurular ve "son 7 gün" gibi kayan pencereler için sayaçlar
+    DASHBOARD_STATS_TTL saniyede bir veritabanından yeniden hesaplanır.
+"""
+import asyncio
+import os
+import secrets
+import time
+from datetime import datetime, timedelta, timezone
+
+from migrations import placeholder
+
+DASHBOARD_STATS_TTL = float(os.getenv("DASHBOARD_STATS_TTL", 300))
+DASHBOARD_CHANNEL_PREFIX = "dashboard:"
+NEW_USER_DAYS = 7
+
+COUNTERS = (
+    "total_users", "new_users_week", "total_events", "active_events", "total_feedbacks", "pending_feedbacks",
+)
+
+
+async def load_dashboard_counts(conn, now=None):
+    """Tüm sayaçlar tek sorguda: {sayaç: değer}"""
+    now = now or datetime.now(timezone.utc)
+    since = (now - timedelta(days=NEW_USER_DAYS)).astimezone(timezone.utc).replace(tzinfo=None)
+    p = placeholder(conn)
+    rows = await conn.execute_query_dict(
+        f"""
+        SELECT u.total_users, u.new_users_week, e.total_events, e.active_events,
+               f.total_feedbacks, f.pending_feedbacks
+        FROM (SELECT COUNT(*) AS total_users,
+                     COALESCE(SUM(CASE WHEN created_at >= {p} THEN 1 ELSE 0 END), 0) AS new_users_week
+              FROM users) u
+        CROSS JOIN (SELECT COUNT(*) AS total_events,
+                           COALESCE(SUM(CASE WHEN is_active THEN 1 ELSE 0 END), 0) AS active_events
+                    FROM events) e
+        CROSS JOIN (SELECT COUNT(*) AS total_feedbacks,
+                           COALESCE(SUM(CASE WHEN status = {p} THEN 1 ELSE 0 END), 0) AS pending_feedbacks
+                    FROM feedbacks) f
+        """,
+        [since, "pending"],
+    )
+    # MySQL SUM() Decimal döndürür
+    return {name: int(rows[0][name]) for name in COUNTERS}
+
+
+class DashboardStats:
+    """load() -> awaitable {sayaç: değer}"""
+
+    def __init__(self, load, backend=None, ttl=DASHBOARD_STATS_TTL, clock=time.monotonic):
+        self.load = load
+        self.backend = backend
+        self.ttl = ttl
+        self.clock = clock
+        self.counts = None
+        self.reloads = 0
+        self.adjustments = 0
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._loading = None
+        # Kendi duyurularımızı ayırt etmek için (kanal yayını yapana da döner)
+        self._origin = secrets.token_hex(4)
+        if backend is not None:
+            backend.add_listener(self._on_message)
+
+    async def get(self):
+        if self.backend is not None:
+            self.backend.poll()
+        if self.counts is None or self.clock() - self._loaded_at > self.ttl:
+            await self._reload()
+        return dict(self.counts)
+
+    async def _reload(self):
+        # Aynı anda gelen istekler tek sorguyu bekler
+        if self._loading is None or self._loading.done():
+            self._loading = asyncio.ensure_future(self._load())
+        await self._loading
+
+    async def _load(self):
+        started, generation = self.clock(), self._generation
+        counts = await self.load()
+        self.counts = counts
+        # Yükleme sürerken eskimiş işaretlendiyse sonraki okuma tekrar yükler
+        self._loaded_at = started if generation == self._generation else float("-inf")
+        self.reloads += 1
+
+    async def adjust(self, **deltas):
+        """Sayaçları farkla güncelle, ör. adjust(total_events=1, active_events=1)"""
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        self._apply(deltas)
+        self.adjustments += 1
+        await self._publish(",".join(f"{name}={delta}" for name, delta in deltas.items()))
+
+    async def invalidate(self):
+        """Sayaçları eskimiş say; sonraki okuma veritabanından yükler"""
+        self._stale()
+        await self._publish("*")
+
+    def _apply(self, deltas):
+        if self.counts is None:
+            return  # Henüz yüklenmedi: ilk okumada zaten güncel gelir
+        for name, delta in deltas.items():
+            self.counts[name] = max(0, self.counts[name] + delta)
+
+    def _stale(self):
+        self._generation += 1
+        self._loaded_at = float("-inf")
+
+    async def _publish(self, payload):
+        if self.backend is None:
+            return
+        try:
+            await self.backend.publish(f"{DASHBOARD_CHANNEL_PREFIX}{self._origin}:{payload}")
+        except Exception as e:
+            print(f"⚠️ Dashboard sayacı duyurulamadı: {e!r}")
+
+    def _on_message(self, key):
+        if key is None:
+            self._stale()  # Duyurular kaçırılmış olabilir
+            return
+        if not key.startswith(DASHBOARD_CHANNEL_PREFIX):
+            return
+        origin, _, payload = key[len(DASHBOARD_CHANNEL_PREFIX):].partition(":")
+        if origin == self._origin:
+            return
+        if payload == "*":
+            self._stale()
+            return
+        deltas = {}
+        for part in payload.split(","):
+            name, _, delta = part.partition("=")
+            if name in COUNTERS:
+                deltas[name] = int(delta)
+        self._apply(deltas)
+
+    def stats(self):
+        return {
+            "loaded": self.counts is not None,
+            "reloads": self.reloads,
+            "adjustments": self.adjustments,
+        }
@@ -0,0 +1,306 @@
+"""
+E-posta outbox'ı: istekler e-postayı tabloya yazar ve hemen döner, gönderimi
+arka plandaki gönderici yapar.
+
+  * SMTP bağlantısı açık tutulur ve sonraki e-postalarda yeniden kullanılır
+    (her e-postada yeni TLS el sıkışması yok); bağlantı boşta kalınca kapanır.
+  * Gönderim tek bir thread'de yapılır, event loop bloklanmaz.
+  * Geçici hatalarda (bağlantı, 4xx) üstel bekleme ile yeniden denenir;
+    kalıcı hatalarda (5xx, alıcı reddi) veya deneme hakkı bitince "failed".
+  * Sağlayıcı kotasını aşmamak için dakikada en fazla MAIL_RATE_PER_MINUTE.
+  * Birden fazla worker aynı tabloyu işleyebilir: e-posta, `next_attempt_at`
+    ileri alınarak koşullu UPDATE ile sahiplenilir (kilit süresi dolan
+    "sending" kayıtları yeniden denenir).
+"""
+import asyncio
+import os
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+
+from tortoise.expressions import Q
+
+from models import OutboxEmail
+
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", 465))
+# ssl (465), starttls (587) veya none (yerel test sunucusu)
+SMTP_SECURITY = os.getenv("SMTP_SECURITY", "ssl")
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", 20))
+# Bu kadar saniye boşta kalan bağlantı kapatılır
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", 60))
+
+MAIL_RATE_PER_MINUTE = float(os.getenv("MAIL_RATE_PER_MINUTE", 20))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", 6))
+MAIL_POLL_INTERVAL = float(os.getenv("MAIL_POLL_INTERVAL", 10))
+MAIL_BATCH_SIZE = 20
+# Yeniden deneme beklemesi: 30 sn, 1 dk, 2 dk ... en fazla 1 saat
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+# Gönderilirken worker ölürse e-posta bu süre sonra tekrar sıraya girer
+CLAIM_SECONDS = 300
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
+def retry_delay(attempts):
+    return min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+
+def is_permanent(error):
+    """Tekrar denemenin anlamı olmayan SMTP hataları"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        # 452 (kota / posta kutusu dolu) gibi 4xx yanıtlar geçicidir
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 500 <= error.smtp_code < 600
+    return False
+
+
+class SmtpConnection:
+    """Tekrar kullanılan SMTP bağlantısı. Sadece gönderici thread'inden çağrılır."""
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, security=SMTP_SECURITY,
+                 user=None, password=None, timeout=SMTP_TIMEOUT, idle_timeout=SMTP_IDLE_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.security = security
+        self.user = user
+        self.password = password
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.connects = 0
+        self._smtp = None
+        self._last_used = 0.0
+
+    def _connect(self):
+        if self.security == "ssl":
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.security == "starttls":
+                smtp.starttls()
+        if self.user:
+            smtp.login(self.user, self.password)
+        self.connects += 1
+        return smtp
+
+    def send(self, msg):
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            self._resend(msg)
+        except smtplib.SMTPException:
+            # Oturumu temiz durumda bırak (yarım kalmış MAIL/RCPT)
+            try:
+                self._smtp.rset()
+            except (smtplib.SMTPException, OSError):
+                self.close()
+            raise
+        except OSError:
+            self._resend(msg)
+        finally:
+            self._last_used = time.monotonic()
+
+    def _resend(self, msg):
+        # Sunucu bağlantıyı kapatmış (boşta kalma vb.): bir kez yeniden bağlanıp dene
+        self.close()
+        self._smtp = self._connect()
+        self._smtp.send_message(msg)
+
+    def close_if_idle(self):
+        if self._smtp is not None and time.monotonic() - self._last_used > self.idle_timeout:
+            self.close()
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._smtp = None
+
+
+class RateLimiter:
+    """Token bucket: dakikada `per_minute` gönderim (kısa patlamalara izin verir)"""
+
+    def __init__(self, per_minute, burst=None, clock=time.monotonic):
+        self.rate = per_minute / 60
+        self.capacity = burst or max(1.0, per_minute / 6)
+        self.tokens = self.capacity
+        self.clock = clock
+        self._updated = clock()
+
+    def delay(self):
+        """Bir sonraki gönderim için beklenmesi gereken süre (0: hemen)"""
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class EmailOutbox:
+    def __init__(self, connection, sender=None, rate_per_minute=MAIL_RATE_PER_MINUTE,
+                 max_attempts=MAIL_MAX_ATTEMPTS, poll_interval=MAIL_POLL_INTERVAL):
+        self.connection = connection
+        self.sender = sender
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.limiter = RateLimiter(rate_per_minute)
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self._wakeup = None
+        self._task = None
+        self._stopping = False
+        self._sending = False
+        self._executor = None
+
+    @property
+    def configured(self):
+        return bool(self.sender)
+
+    async def enqueue(self, to_address, subject, body):
+        """E-postayı sıraya yaz; gönderim arka planda yapılır"""
+        email = await OutboxEmail.create(
+            to_address=to_address, subject=subject[:255], body=body, next_attempt_at=utcnow()
+        )
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return email
+
+    def build_message(self, email):
+        msg = EmailMessage()
+        msg["Subject"] = email.subject
+        msg["From"] = self.sender
+        msg["To"] = email.to_address
+        msg.set_content(email.body)
+        return msg
+
+    async def _claim(self, email, now):
+        """Başka bir worker almadıysa e-postayı sahiplen"""
+        claimed = await OutboxEmail.filter(
+            Q(status="pending") | Q(status="sending"), id=email.id, next_attempt_at__lte=now
+        ).update(status="sending", next_attempt_at=now + timedelta(seconds=CLAIM_SECONDS))
+        return claimed == 1
+
+    async def _send(self, email):
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+        await loop.run_in_executor(self._executor, self.connection.send, self.build_message(email))
+
+    async def process_due(self):
+        """Zamanı gelmiş e-postaları gönder; gönderilen/denenen sayısını döndür"""
+        now = utcnow()
+        due = await OutboxEmail.filter(
+            Q(status="pending") | Q(status="sending"), next_attempt_at__lte=now
+        ).order_by("next_attempt_at", "id").limit(MAIL_BATCH_SIZE)
+
+        handled = 0
+        for email in due:
+            if self._stopping:
+                break
+            delay = self.limiter.delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                self.limiter.delay()
+            if not await self._claim(email, utcnow()):
+                continue
+            self.limiter.take()
+            handled += 1
+            # Gönderim ve sonucun yazılması kapanışta yarıda kesilmez (çift gönderim olmasın)
+            self._sending = True
+            try:
+                await self._send(email)
+            except Exception as e:
+                await self._failed(email, e)
+            else:
+                await OutboxEmail.filter(id=email.id).update(
+                    status="sent", sent_at=utcnow(), attempts=email.attempts + 1, last_error=None
+                )
+                self.sent += 1
+            finally:
+                self._sending = False
+        return handled
+
+    async def _failed(self, email, error):
+        attempts = email.attempts + 1
+        if is_permanent(error) or attempts >= self.max_attempts:
+            status, next_attempt_at = "failed", utcnow()
+            self.failed += 1
+            print(f"❌ E-posta gönderilemedi ({email.to_address}): {error}")
+        else:
+            status, next_attempt_at = "pending", utcnow() + timedelta(seconds=retry_delay(attempts))
+            self.retried += 1
+            print(f"⚠️ E-posta {attempts}. denemede gönderilemedi, tekrar denenecek: {error}")
+        await OutboxEmail.filter(id=email.id).update(
+            status=status, attempts=attempts, next_attempt_at=next_attempt_at, last_error=str(error)[:500]
+        )
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                handled = await self.process_due()
+            except Exception as e:
+                print(f"⚠️ E-posta outbox hatası: {e!r}")
+                handled = 0
+            if handled:
+                continue  # Sırada daha fazlası olabilir
+            if self._executor is not None:
+                self._executor.submit(self.connection.close_if_idle)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._stopping = False
+            # Event, sunucunun event loop'unda oluşturulur
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Elindeki e-postayı bitir, bağlantıyı kapat (sıradakiler tabloda kalır)"""
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._task is not None:
+            if not self._sending:
+                # Bekleme veya sorgu sırasında: sahiplenilmiş e-posta CLAIM_SECONDS sonra tekrar denenir
+                self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor is not None:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.connection.close)
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self):
+        return {
+            "configured": self.configured,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "smtp_connects": self.connection.connects,
+        }
@@ -0,0 +1,183 @@
+"""
+Etkinlik kataloğu: aktif etkinliklerin worker içi, değişmez anlık görüntüsü.
+
+/api/etkinlikler her istekte aynı JOIN'i çalıştırıp aynı satırları yeniden
+biçimlendirmek yerine bu görüntüden okunur. Görüntü, kart alanları önceden
+biçimlendirilmiş olarak `start_datetime DESC, event_id DESC` sırasında tutulur
+(SQL ile aynı sıra, tarihsizler en sonda); tarih aralığı, üniversite ve imleç
+filtreleri ikili arama ile çözülür.
+
+Admin bir etkinliği eklediğinde/güncellediğinde/sildiğinde katalog sürümü
+artırılır ve tüm worker'lara duyurulur; sürümü eski kalan görüntü bir sonraki
+okumada (tek bir yeniden oluşturma işiyle) yenilenir. Kaçırılan duyurulara
+karşı görüntü `max_age` saniyeden eskiyse arka planda yenilenir.
+"""
+import asyncio
+import os
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+EVENT_CATALOGUE_MAX_AGE = float(os.getenv("EVENT_CATALOGUE_MAX_AGE", 60))
+CATALOGUE_CHANNEL_KEY = "catalogue:events"
+
+_EPOCH = datetime(1970, 1, 1)
+_AFTER_ALL = float("inf")
+
+
+def sort_key(start, event_id):
+    """SQL sırasını (start DESC, id DESC, NULL'lar en sonda) artan bir anahtara çevir"""
+    if start is None:
+        return (1, 0.0, -event_id)
+    return (0, -(start - _EPOCH).total_seconds(), -event_id)
+
+
+def university_key(name):
+    # MySQL'deki büyük/küçük harf duyarsız karşılaştırmaya yakın davranış
+    return name.casefold() if name else None
+
+
+class CatalogueEntry:
+    __slots__ = ("event_id", "start", "end", "university", "card")
+
+    def __init__(self, event_id, start, end, university, card):
+        self.event_id = event_id
+        self.start = start
+        self.end = end
+        self.university = university
+        self.card = card
+
+
+class _SortedEvents:
+    """Sıralı etkinlikler ve ikili arama için paralel anahtar listesi"""
+
+    __slots__ = ("entries", "keys")
+
+    def __init__(self, entries):
+        self.entries = tuple(entries)
+        self.keys = tuple(sort_key(e.start, e.event_id) for e in self.entries)
+
+
+class CatalogueSnapshot:
+    """Değişmez katalog görüntüsü. Kart sözlükleri paylaşılır, değiştirilmemelidir."""
+
+    def __init__(self, entries, version, built_at):
+        entries = sorted(entries, key=lambda e: sort_key(e.start, e.event_id))
+        self.version = version
+        self.built_at = built_at
+        self.all = _SortedEvents(entries)
+        self.by_id = {entry.event_id: entry for entry in entries}
+        groups = {}
+        for entry in entries:
+            groups.setdefault(university_key(entry.university), []).append(entry)
+        self.by_university = {name: _SortedEvents(group) for name, group in groups.items()}
+
+    def __len__(self):
+        return len(self.all.entries)
+
+    def query(self, university=None, start_range=(None, None), current_only=False,
+              after=None, limit=None, now=None):
+        """SQL sorgusuyla aynı sonucu döndür: [CatalogueEntry, ...]
+
+        start_range: [başlangıç, bitiş) naive UTC; after: (son_start, son_id) imleci.
+        """
+        if university:
+            events = self.by_university.get(university_key(university))
+            if events is None:
+                return []
+        else:
+            events = self.all
+
+        keys = events.keys
+        lo, hi = 0, len(keys)
+        range_start, range_end = start_range
+        if range_start or range_end:
+            # Aralık verildiyse tarihsiz etkinlikler dahil edilmez (SQL'de NULL karşılaştırması)
+            hi = bisect_left(keys, (1,))
+        if range_end:
+            lo = bisect_right(keys, (0, -(range_end - _EPOCH).total_seconds(), _AFTER_ALL))
+        if range_start:
+            hi = min(hi, bisect_right(keys, (0, -(range_start - _EPOCH).total_seconds(), _AFTER_ALL)))
+        if after is not None:
+            lo = max(lo, bisect_right(keys, sort_key(*after)))
+
+        result = []
+        for entry in events.entries[lo:hi]:
+            if current_only and (entry.end is None or entry.end < now):
+                continue
+            result.append(entry)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+
+class EventCatalogue:
+    """Sürümlü katalog. `loader` aktif etkinlikleri CatalogueEntry listesi olarak döndürür."""
+
+    def __init__(self, loader, backend=None, max_age=EVENT_CATALOGUE_MAX_AGE, clock=time.monotonic):
+        self.loader = loader
+        self.backend = backend
+        self.max_age = max_age
+        self.clock = clock
+        self.version = 0
+        self.rebuilds = 0
+        self._snapshot = None
+        self._building = None
+        if backend is not None:
+            backend.add_listener(self._on_message)
+
+    def _on_message(self, key):
+        if key is None or key == CATALOGUE_CHANNEL_KEY:
+            self.version += 1
+
+    async def invalidate(self):
+        """Katalog değişti: sürümü artır, yeniden oluşturmayı başlat ve diğer worker'lara duyur"""
+        self.version += 1
+        self._start_build()
+        if self.backend is not None:
+            try:
+                await self.backend.publish(CATALOGUE_CHANNEL_KEY)
+            except Exception as e:
+                print(f"⚠️ Katalog güncellemesi duyurulamadı: {e!r}")
+
+    def _start_build(self):
+        if self._building is None or self._building.done():
+            self._building = asyncio.ensure_future(self._build())
+        return self._building
+
+    async def _build(self):
+        version = self.version
+        entries = await self.loader()
+        snapshot = CatalogueSnapshot(entries, version, self.clock())
+        if self._snapshot is None or snapshot.version >= self._snapshot.version:
+            self._snapshot = snapshot
+            self.rebuilds += 1
+        return snapshot
+
+    async def snapshot(self):
+        """Güncel görüntüyü döndür; sürüm eskiyse yeniden oluşturulmasını bekle"""
+        if self.backend is not None:
+            self.backend.poll()
+
+        while self._snapshot is None or self._snapshot.version < self.version:
+            task = self._start_build()
+            try:
+                await asyncio.shield(task)
+            finally:
+                if task.done() and self._building is task:
+                    self._building = None
+
+        if self.clock() - self._snapshot.built_at > self.max_age:
+            # Kaçırılmış duyurulara karşı: eski görüntüyü sun, arka planda yenile
+            self._start_build()
+        return self._snapshot
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "version": self.version,
+            "snapshot_version": snapshot.version if snapshot else None,
+            "events": len(snapshot) if snapshot else 0,
+            "age_seconds": round(self.clock() - snapshot.built_at, 1) if snapshot else None,
+            "rebuilds": self.rebuilds,
+        }
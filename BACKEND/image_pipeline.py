@@ -0,0 +1,167 @@
+"""
+Resim işleme hattı (image pipeline).
+
+Yüklenen resimler event loop'u bloklamamak için ayrı bir process havuzunda
+çözülür, EXIF/metadata bilgileri atılır ve sabit boyutlu WebP varyantları
+üretilir. Varyantlar medya deposuna "<orijinal hash>-<boyut>" adıyla yazılır.
+"""
+import asyncio
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from media_store import decode_data_uri, media_key_from_url, to_media_ref, variant_key
+
+# Varyant adları (piksel). İstemciye kullanım yerine uygun olanın adresi verilir.
+AVATAR_THUMB = "64"     # yorumlar, kullanıcı arama
+AVATAR_LARGE = "256"    # profil sayfaları
+COVER_WIDE = "1200"     # kapak fotoğrafı
+EVENT_CARD = "600"      # etkinlik kartı / detay
+
+# Her resim türü için üretilecek varyantlar: boyut -> kare kırpma mı?
+VARIANT_PRESETS = {
+    "avatar": {AVATAR_THUMB: True, AVATAR_LARGE: True},
+    "cover": {COVER_WIDE: False},
+    "event": {EVENT_CARD: False},
+}
+
+WEBP_QUALITY = 80
+# Çok büyük (decompression bomb) resimleri reddet: ~40 megapiksel
+MAX_IMAGE_PIXELS = 40_000_000
+
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", 2))
+IMAGE_MAX_PENDING = int(os.getenv("IMAGE_MAX_PENDING", 8))
+IMAGE_JOB_TIMEOUT = float(os.getenv("IMAGE_JOB_TIMEOUT", 15))
+
+
+class InvalidImage(ValueError):
+    """Dosya çözülemeyen / desteklenmeyen bir resim"""
+
+
+class PipelineBusy(Exception):
+    """Kuyruk dolu, iş kabul edilmedi"""
+
+
+def transcode(data, kind):
+    """Resmi çöz, metadata'yı at ve varyantları üret: {boyut: webp_bytes}
+
+    Process havuzunda çalışır, bu yüzden modül seviyesinde olmalı.
+    """
+    from PIL import Image, ImageOps
+
+    Image.MAX_IMAGE_PIXELS = MAX_IMAGE_PIXELS
+    try:
+        img = Image.open(io.BytesIO(data))
+        img.load()
+    except Exception as e:
+        raise InvalidImage(f"Resim çözülemedi: {e}") from None
+
+    # Telefon fotoğraflarındaki yön bilgisini uygula, sonra EXIF tamamen atılır
+    img = ImageOps.exif_transpose(img)
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    img = img.convert("RGBA" if has_alpha else "RGB")
+
+    variants = {}
+    for size, square in VARIANT_PRESETS[kind].items():
+        target = int(size)
+        if square:
+            out = ImageOps.fit(img, (target, target), Image.LANCZOS)
+        elif img.width > target:
+            out = img.resize((target, max(1, round(img.height * target / img.width))), Image.LANCZOS)
+        else:
+            out = img
+
+        buf = io.BytesIO()
+        # exif/icc parametresi verilmediği için metadata yazılmaz
+        out.save(buf, format="WEBP", quality=WEBP_QUALITY, method=4)
+        variants[size] = buf.getvalue()
+    return variants
+
+
+def transcode_file(path, kind):
+    """Diskteki (akışla yüklenmiş) dosyayı dönüştür; dosya ana process'te belleğe alınmaz"""
+    with open(path, "rb") as f:
+        return transcode(f.read(), kind)
+
+
+class ImagePipeline:
+    """Sınırlı kuyruklu, zaman aşımlı resim işleme havuzu
+
+    Aynı anda en fazla `max_pending` iş kabul edilir (çalışan + bekleyen);
+    fazlası PipelineBusy ile hemen reddedilir. Zaman aşımına uğrayan iş
+    process içinde bitene kadar kuyruk hakkını tutmaya devam eder.
+    """
+
+    def __init__(self, workers=IMAGE_WORKERS, max_pending=IMAGE_MAX_PENDING, timeout=IMAGE_JOB_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _job_done(self):
+        self.pending -= 1
+
+    async def run(self, func, source, kind):
+        if kind not in VARIANT_PRESETS:
+            raise ValueError(f"Bilinmeyen resim türü: {kind}")
+        if self.pending >= self.max_pending:
+            raise PipelineBusy("Resim işleme kuyruğu dolu")
+
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(func, source, kind)
+        self.pending += 1
+        # Tamamlanma callback'i havuzun thread'inde çalışır: sayaç event loop'ta azaltılır
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._job_done))
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+
+    async def process(self, store, data, kind):
+        """Resmi işle, varyantları depoya yaz ve orijinal hash anahtarını döndür"""
+        key = hashlib.sha256(data).hexdigest()
+        return await self._process(store, key, kind, transcode, data)
+
+    async def process_file(self, store, path, key, kind):
+        """Geçici dosyadaki resmi işle. `key` dosya yazılırken hesaplanan SHA-256 özetidir."""
+        return await self._process(store, key, kind, transcode_file, path)
+
+    async def _process(self, store, key, kind, func, source):
+        loop = asyncio.get_running_loop()
+
+        # Aynı dosya daha önce işlendiyse tekrar dönüştürme (dedup)
+        sizes = VARIANT_PRESETS[kind]
+        already = await loop.run_in_executor(
+            None, lambda: all(store.exists(variant_key(key, size)) for size in sizes)
+        )
+        if already:
+            return key
+
+        variants = await self.run(func, source, kind)
+        for size, body in variants.items():
+            await loop.run_in_executor(None, store.put_variant, key, size, body)
+        return key
+
+    async def store_value(self, store, value, kind):
+        """İstemciden gelen resim değerini veritabanına yazılacak hale getir.
+
+        - Bizim medya adresimiz -> 'media:<hash>' (form kaydedilirken geri gelir)
+        - base64 data URI      -> işlenir, varyantlar depoya yazılır, 'media:<hash>'
+        - Diğer değerler (boş string, dış URL) olduğu gibi bırakılır.
+        """
+        key = media_key_from_url(value)
+        if key:
+            return to_media_ref(key)
+        data = decode_data_uri(value)
+        if data is not None:
+            return to_media_ref(await self.process(store, data, kind))
+        return value
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,54 @@
+"""
+İstanbul saati yardımcıları. Veritabanındaki zamanlar UTC'dir; kullanıcıya
+gösterilen saatler ve takvim günleri İstanbul'a (Europe/Istanbul) göredir.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytz
+
+# 🔥 İSTANBUL TIMEZONE (UTC+3) 🔥
+ISTANBUL_TZ = pytz.timezone('Europe/Istanbul')
+
+# 🔥 HELPER FUNCTION: Datetime'ı İstanbul Saatine Çevir 🔥
+def to_istanbul_tz(dt):
+    """Datetime'ı Istanbul timezone'a çevir
+    
+        Tortoise ORM timezone='UTC' ve use_tz=True ile çalışıyor, 
+        bu yüzden datetime'lar UTC timezone-aware olarak dönüyor.
+    """
+    if dt is None:
+        return None
+    
+    # Tortoise ORM UTC aware datetime döndürüyor, Istanbul'a çevir
+    if dt.tzinfo is None:
+        # Naive datetime ise UTC olarak kabul et (güvenlik için)
+        dt = dt.replace(tzinfo=timezone.utc)
+    
+    return dt.astimezone(ISTANBUL_TZ)
+
+# 🔥 HELPER FUNCTION: İstanbul Saatinde Şu Anki Zaman 🔥
+def now_istanbul():
+    """İstanbul timezone'ında şu anki zamanı döndür (UTC+3)"""
+    return datetime.now(ISTANBUL_TZ)
+
+def istanbul_day(dt):
+    """Zaman damgasının İstanbul takvimindeki günü (naive datetime UTC kabul edilir)"""
+    return to_istanbul_tz(dt).date()
+
+def istanbul_midnight_utc(day):
+    """İstanbul gününün başlangıcı, naive UTC (ham SQL parametresi)"""
+    local = ISTANBUL_TZ.localize(datetime.combine(day, time.min))
+    return local.astimezone(pytz.UTC).replace(tzinfo=None)
+
+def istanbul_days_to_utc_range(first_day=None, last_day=None):
+    """İstanbul takvim günlerini [başlangıç, bitiş) UTC aralığına çevir.
+
+    "YYYY-MM-DD" string'leri alır, iki uç da dahil edilen günlerdir; verilmeyen uç
+    için None döner. Sonuç naive UTC'dir (ham SQL parametresi olarak kullanılır).
+    Kolon fonksiyona sokulmadığı için (DATE(...) yerine) index kullanılabilir.
+    """
+    start = istanbul_midnight_utc(date.fromisoformat(first_day)) if first_day else None
+    end = istanbul_midnight_utc(date.fromisoformat(last_day) + timedelta(days=1)) if last_day else None
+    if start and end and start >= end:
+        raise ValueError("Başlangıç tarihi bitiş tarihinden sonra olamaz.")
+    return start, end
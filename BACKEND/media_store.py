@@ -0,0 +1,239 @@
+"""
+İçerik adresli (content-addressed) medya deposu.
+
+Yüklenen dosyalar veritabanına base64 olarak yazılmak yerine diske,
+içeriklerinin SHA-256 özeti (hash) ile adlandırılarak kaydedilir.
+Aynı dosya iki kez yüklenirse diske ikinci kez yazılmaz (dedup).
+Veritabanında sadece kısa bir referans ("media:<hash>") tutulur.
+
+Resimlerin küçültülmüş sürümleri (varyant) aynı klasörde "<hash>-<boyut>"
+adıyla durur. Varyantlar orijinal dosyadan her zaman aynı şekilde üretildiği
+için bu adlar da değişmez.
+"""
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+
+# Dosyaların saklanacağı klasör ve dışarıya verilecek adres
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "media"))
+MEDIA_BASE_URL = os.getenv("MEDIA_BASE_URL", "http://127.0.0.1:8000").rstrip("/")
+
+# Veritabanındaki referans öneki: "media:<sha256>"
+MEDIA_REF_PREFIX = "media:"
+MEDIA_KEY_RE = re.compile(r"^[0-9a-f]{64}(-[0-9]{2,4})?$")
+
+# Tarayıcı önbelleği: içerik hash ile adreslendiği için dosya asla değişmez
+MEDIA_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Dosya imzaları (magic bytes) -> Content-Type
+_IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def sniff_image_type(head):
+    """Dosyanın ilk byte'larına bakarak resim türünü bul (bilinmiyorsa None)"""
+    if not head:
+        return None
+    for signature, content_type in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def is_media_key(key):
+    return bool(key) and bool(MEDIA_KEY_RE.match(key))
+
+
+def variant_key(key, variant):
+    return f"{key}-{variant}" if variant else key
+
+
+def base_key(key):
+    """'<hash>-<boyut>' -> '<hash>'"""
+    return key.split("-", 1)[0]
+
+
+class MediaStore:
+    """Dosyaları <root>/<ilk 2 karakter>/<hash> yolunda saklayan depo"""
+
+    def __init__(self, root=MEDIA_ROOT):
+        self.root = root
+
+    def path_for(self, key):
+        if not is_media_key(key):
+            raise ValueError(f"Geçersiz medya anahtarı: {key}")
+        return os.path.join(self.root, key[:2], key)
+
+    def exists(self, key):
+        return is_media_key(key) and os.path.isfile(self.path_for(key))
+
+    def resolve(self, key):
+        """İstenen dosya yoksa varyantı olmayan eski yüklemeler için orijinale düş"""
+        if self.exists(key):
+            return key
+        original = base_key(key) if is_media_key(key) else None
+        if original and original != key and self.exists(original):
+            return original
+        return None
+
+    def put(self, data):
+        """Veriyi kaydet ve hash anahtarını döndür. Dosya zaten varsa tekrar yazılmaz."""
+        key = hashlib.sha256(data).hexdigest()
+        self._write(key, data)
+        return key
+
+    def put_variant(self, key, variant, data):
+        """Orijinal dosyanın hash'i altında bir varyant kaydet"""
+        self._write(variant_key(key, variant), data)
+
+    def _write(self, key, data):
+        path = self.path_for(key)
+        if os.path.isfile(path):
+            return
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Önce geçici dosyaya yaz, sonra atomik olarak yerine taşı.
+        # Böylece yarım yazılmış bir dosya asla servis edilmez.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def size(self, key):
+        return os.path.getsize(self.path_for(key))
+
+    def read(self, key, start=0, end=None):
+        """[start, end] (dahil) aralığını oku. end None ise dosya sonuna kadar."""
+        with open(self.path_for(key), "rb") as f:
+            f.seek(start)
+            if end is None:
+                return f.read()
+            return f.read(end - start + 1)
+
+
+# -------------------------------------------------
+# Referans <-> URL dönüşümleri
+# -------------------------------------------------
+def to_media_ref(key):
+    return f"{MEDIA_REF_PREFIX}{key}"
+
+
+def media_key_from_ref(value):
+    """'media:<hash>' referansından anahtarı çıkar (referans değilse None)"""
+    if value and value.startswith(MEDIA_REF_PREFIX):
+        key = value[len(MEDIA_REF_PREFIX):]
+        if is_media_key(key):
+            return key
+    return None
+
+
+def media_url(value, variant=None):
+    """Veritabanındaki değeri istemcinin kullanacağı adrese çevir.
+
+    'media:<hash>' -> '<MEDIA_BASE_URL>/media/<hash>-<variant>'
+    Henüz taşınmamış eski değerler (data URI, dış URL) olduğu gibi döner.
+    """
+    key = media_key_from_ref(value)
+    if key:
+        return f"{MEDIA_BASE_URL}/media/{variant_key(key, variant)}"
+    return value
+
+
+def event_image_version(key):
+    """Görsel hash'inin kısa hali; adreste cache kırıcı (cache busting) olarak kullanılır"""
+    return key[:12]
+
+
+def event_image_url(event_id, value):
+    """Etkinlik görseli için sabit adres: '<MEDIA_BASE_URL>/media/etkinlik/<id>?v=<sürüm>'
+
+    Listeler görselin kendisini değil bu adresi taşır. Henüz taşınmamış base64
+    değerlerde sürüm eklenmez (kısa süreli cache); dış URL'ler olduğu gibi döner.
+    """
+    if not value:
+        return None
+    key = media_key_from_ref(value)
+    if key:
+        return f"{MEDIA_BASE_URL}/media/etkinlik/{event_id}?v={event_image_version(key)}"
+    if value.startswith("data:"):
+        return f"{MEDIA_BASE_URL}/media/etkinlik/{event_id}"
+    return value
+
+
+def media_key_from_url(value):
+    """Bizim ürettiğimiz medya adresinden (varyant dahil) orijinal anahtarı geri çıkar"""
+    prefix = f"{MEDIA_BASE_URL}/media/"
+    if value and value.startswith(prefix):
+        key = value[len(prefix):].split("?", 1)[0]
+        if is_media_key(key):
+            return base_key(key)
+    return None
+
+
+def decode_data_uri(value):
+    """'data:image/...;base64,....' değerini byte'a çevir (değilse None)"""
+    if not value or not value.startswith("data:"):
+        return None
+    header, sep, payload = value.partition(",")
+    if not sep or ";base64" not in header:
+        return None
+    try:
+        return base64.b64decode(payload, validate=False)
+    except (binascii.Error, ValueError):
+        return None
+
+
+# -------------------------------------------------
+# HTTP Range başlığı
+# -------------------------------------------------
+def parse_range(header, size):
+    """'bytes=a-b' başlığını (start, end) çiftine çevir.
+
+    Başlık yoksa, anlaşılamıyorsa veya ters aralıksa ("bytes=5-3") None döner
+    (RFC 9110: geçersiz aralık yok sayılır, tüm dosya gönderilir).
+    Geçerli aralık dosyanın sonundan sonra başlıyorsa ValueError fırlatır (416 yanıtı için).
+    Sadece tek aralık desteklenir; birden fazla aralık istenirse tüm dosya gönderilir.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+
+    first, _, last = spec.partition("-")
+    first, last = first.strip(), last.strip()
+    if (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+
+    if first == "":
+        # Son N byte: "bytes=-500"
+        if not last:
+            return None
+        suffix = int(last)
+        if suffix == 0:
+            raise ValueError("Geçersiz aralık")
+        start = max(size - suffix, 0)
+        end = size - 1
+    else:
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        end = min(int(last), size - 1) if last else size - 1
+
+    if start >= size:
+        raise ValueError("İstenen aralık dosya boyutunun dışında")
+    return start, end
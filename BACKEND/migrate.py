@@ -0,0 +1,59 @@
+"""
+Veritabanı şemasını sürümlü migration'larla güncelle (deploy sırasında çalışır).
+Kullanım:
+    python migrate.py            # eksik migration'ları uygula (up)
+    python migrate.py up [0003]  # belirtilen sürüme kadar uygula
+    python migrate.py status     # hangi migration uygulanmış göster
+"""
+import asyncio
+import os
+import sys
+from dotenv import load_dotenv
+from tortoise import Tortoise
+
+load_dotenv()
+
+from migrations import MigrationError, migrate, status
+
+
+async def main(command, target=None):
+    print("🌍 Connecting to MySQL...")
+
+    db_url = (
+        f"mysql://{os.getenv('DB_USER','root')}:"
+        f"{os.getenv('DB_PASS','')}"
+        f"@{os.getenv('DB_HOST','127.0.0.1')}:"
+        f"{int(os.getenv('DB_PORT',3306))}/"
+        f"{os.getenv('DB_NAME','event_management_system')}"
+    )
+
+    await Tortoise.init(
+        db_url=db_url,
+        modules={"models": ["models"]},
+        timezone="UTC",
+        use_tz=True,
+    )
+    conn = Tortoise.get_connection("default")
+
+    try:
+        if command == "status":
+            for migration, applied_at in await status(conn):
+                mark = f"✅ {applied_at}" if applied_at else "⏳ bekliyor"
+                print(f"{migration.version}_{migration.name}: {mark}")
+        else:
+            done = await migrate(conn, target=target)
+            print(f"📦 {len(done)} migration uygulandı." if done else "✅ Şema güncel.")
+        return 0
+    except MigrationError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:] or ["up"]
+    if args[0] not in ("up", "status"):
+        print(__doc__)
+        sys.exit(2)
+    sys.exit(asyncio.run(main(args[0], args[1] if len(args) > 1 else None)))
@@ -0,0 +1,108 @@
+"""
+Tek seferlik taşıma: user_profiles ve events tablolarındaki base64 görselleri medya deposuna taşır.
+Satırlarda sadece "media:<hash>" referansı kalır.
+Kullanım: python migrate_media.py
+Tekrar çalıştırmak güvenlidir; zaten taşınmış satırlar atlanır.
+"""
+import asyncio
+import os
+from dotenv import load_dotenv
+from tortoise import Tortoise
+
+load_dotenv()
+
+from models import UserProfile, Event
+from media_store import MediaStore, decode_data_uri, to_media_ref
+from image_pipeline import InvalidImage, transcode
+
+BATCH_SIZE = 50
+# Alan -> resim türü (hangi varyantların üretileceği)
+PHOTO_FIELDS = {"profile_photo": "avatar", "cover_photo": "cover"}
+
+
+def store_image(store, data, kind):
+    """Orijinali ve varyantları depoya yaz. Çözülemeyen dosyalar sadece orijinal olarak saklanır."""
+    # Yüklenen fotoğraflar gibi /media/<hash> orijinali de servis edilebilsin
+    key = store.put(data)
+    try:
+        variants = transcode(data, kind)
+    except InvalidImage:
+        return key
+    for size, body in variants.items():
+        store.put_variant(key, size, body)
+    return key
+
+
+async def migrate_profiles(store):
+    """base64 içeren profilleri küçük gruplar halinde taşı (büyük satırlar RAM'i şişirmesin)"""
+    moved = 0
+    last_id = 0
+    while True:
+        # Sadece id'leri çek, fotoğrafları satır satır okuyacağız
+        ids = await UserProfile.filter(id__gt=last_id).order_by("id").limit(BATCH_SIZE).values_list("id", flat=True)
+        if not ids:
+            break
+        last_id = ids[-1]
+
+        rows = await UserProfile.filter(id__in=ids).values("id", *PHOTO_FIELDS)
+        for row in rows:
+            updates = {}
+            for field, kind in PHOTO_FIELDS.items():
+                data = decode_data_uri(row[field])
+                if data is not None:
+                    updates[field] = to_media_ref(store_image(store, data, kind))
+            if updates:
+                await UserProfile.filter(id=row["id"]).update(**updates)
+                moved += 1
+                print(f"✅ Profil {row['id']} taşındı: {', '.join(updates)}")
+    return moved
+
+
+async def migrate_events(store):
+    """events.image_url içindeki base64 görselleri taşı"""
+    moved = 0
+    ids = await Event.filter(image_url__startswith="data:").values_list("event_id", flat=True)
+    for event_id in ids:
+        rows = await Event.filter(event_id=event_id).values_list("image_url", flat=True)
+        data = decode_data_uri(rows[0]) if rows else None
+        if data is None:
+            continue
+        ref = to_media_ref(store_image(store, data, "event"))
+        await Event.filter(event_id=event_id).update(image_url=ref)
+        moved += 1
+        print(f"✅ Etkinlik {event_id} görseli taşındı")
+    return moved
+
+
+async def main():
+    print("🌍 Connecting to MySQL...")
+
+    db_url = (
+        f"mysql://{os.getenv('DB_USER','root')}:"
+        f"{os.getenv('DB_PASS','')}"
+        f"@{os.getenv('DB_HOST','127.0.0.1')}:"
+        f"{int(os.getenv('DB_PORT',3306))}/"
+        f"{os.getenv('DB_NAME','event_management_system')}"
+    )
+
+    await Tortoise.init(
+        db_url=db_url,
+        modules={"models": ["models"]},
+        timezone="UTC",
+        use_tz=True,
+    )
+
+    try:
+        store = MediaStore()
+        moved = await migrate_profiles(store)
+        print(f"📦 Toplam {moved} profil medya deposuna taşındı. (Klasör: {store.root})")
+        moved = await migrate_events(store)
+        print(f"📦 Toplam {moved} etkinlik görseli medya deposuna taşındı.")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
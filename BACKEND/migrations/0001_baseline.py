@@ -0,0 +1,82 @@
+"""Başlangıç şeması (versiyonlamadan önce modellerden üretilen tablolar). Var olanlara dokunmaz."""
+from migrations import create_table
+
+
+async def up(conn):
+    await create_table(conn, "universities", [
+        "`university_id` {pk}",
+        "`name` VARCHAR(255) NOT NULL",
+        "`logo_url` VARCHAR(255)",
+    ])
+    await create_table(conn, "users", [
+        "`user_id` {pk}",
+        "`email` VARCHAR(255) NOT NULL UNIQUE",
+        "`password` VARCHAR(255) NOT NULL",
+        "`role` VARCHAR(50) NOT NULL DEFAULT 'user'",
+        "`is_active` {bool} NOT NULL DEFAULT 1",
+        "`is_admin` {bool} NOT NULL DEFAULT 0",
+        "`is_banned` {bool} NOT NULL DEFAULT 0",
+        "`ban_reason` VARCHAR(500)",
+        "`ban_until` {datetime}",
+        "`created_at` {datetime} NOT NULL DEFAULT {now}",
+        "`last_login` {datetime}",
+    ])
+    await create_table(conn, "user_profiles", [
+        "`id` {pk}",
+        "`full_name` VARCHAR(255)",
+        "`bio` {text}",
+        "`profile_photo` {text}",
+        "`cover_photo` {text}",
+        "`department` VARCHAR(255)",
+        "`grade` VARCHAR(50)",
+        "`phone_number` VARCHAR(255)",
+        "`user_id` INT NOT NULL UNIQUE",
+        "FOREIGN KEY (`user_id`) REFERENCES `users` (`user_id`) ON DELETE CASCADE",
+    ])
+    await create_table(conn, "events", [
+        "`event_id` {pk}",
+        "`title` VARCHAR(255) NOT NULL",
+        "`description` {text}",
+        "`location` VARCHAR(255)",
+        "`image_url` {text}",
+        "`category` VARCHAR(100)",
+        "`club` VARCHAR(255)",
+        "`start_datetime` {datetime}",
+        "`end_datetime` {datetime}",
+        "`created_at` {datetime} NOT NULL DEFAULT {now}",
+        "`is_active` {bool} NOT NULL DEFAULT 1",
+        "`max_participants` INT",
+        "`university_id` INT",
+        "FOREIGN KEY (`university_id`) REFERENCES `universities` (`university_id`) ON DELETE CASCADE",
+    ])
+    await create_table(conn, "favourite_events", [
+        "`id` {pk}",
+        "`added_at` {datetime} NOT NULL DEFAULT {now}",
+        "`event_id` INT NOT NULL",
+        "`user_id` INT NOT NULL",
+        "FOREIGN KEY (`event_id`) REFERENCES `events` (`event_id`) ON DELETE CASCADE",
+        "FOREIGN KEY (`user_id`) REFERENCES `users` (`user_id`) ON DELETE CASCADE",
+    ])
+    await create_table(conn, "comments", [
+        "`comment_id` {pk}",
+        "`message` {text} NOT NULL",
+        "`rating` INT",
+        "`created_at` {datetime} NOT NULL DEFAULT {now}",
+        "`updated_at` {datetime} NOT NULL DEFAULT {now} {on_update_now}",
+        "`event_id` INT NOT NULL",
+        "`user_id` INT NOT NULL",
+        "FOREIGN KEY (`event_id`) REFERENCES `events` (`event_id`) ON DELETE CASCADE",
+        "FOREIGN KEY (`user_id`) REFERENCES `users` (`user_id`) ON DELETE CASCADE",
+    ])
+    await create_table(conn, "feedbacks", [
+        "`feedback_id` {pk}",
+        "`type` VARCHAR(50)",
+        "`title` VARCHAR(255)",
+        "`message` {text} NOT NULL",
+        "`status` VARCHAR(50) NOT NULL DEFAULT 'pending'",
+        "`created_at` {datetime} NOT NULL DEFAULT {now}",
+        "`event_id` INT",
+        "`user_id` INT NOT NULL",
+        "FOREIGN KEY (`event_id`) REFERENCES `events` (`event_id`) ON DELETE CASCADE",
+        "FOREIGN KEY (`user_id`) REFERENCES `users` (`user_id`) ON DELETE CASCADE",
+    ])
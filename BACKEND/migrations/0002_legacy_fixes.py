@@ -0,0 +1,15 @@
+"""
+Eski elle çalıştırılan düzeltmeler (fix_schema_event_id.py, drop_views.py):
+- feedbacks.event_id genel geri bildirimler için NULL olabilir
+- Artık kullanılmayan view'lar kaldırılır
+"""
+from migrations import dialect
+
+OLD_VIEWS = ["ActiveEventsWithParticipants", "UpcomingEvents", "UserFullProfile"]
+
+
+async def up(conn):
+    if dialect(conn) == "mysql":
+        await conn.execute_script("ALTER TABLE feedbacks MODIFY COLUMN event_id INT NULL")
+    for view in OLD_VIEWS:
+        await conn.execute_script(f"DROP VIEW IF EXISTS {view}")
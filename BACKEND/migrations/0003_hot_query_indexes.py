@@ -0,0 +1,20 @@
+"""Sık çalışan sorguların ihtiyaç duyduğu indexler"""
+from migrations import create_index
+
+INDEXES = [
+    # Etkinlik listesi / takvim: WHERE is_active ORDER BY start_datetime (+ event_id, PK)
+    ("events", "idx_events_active_start", ["is_active", "start_datetime"]),
+    # Favori kontrolü / kullanıcının favorileri
+    ("favourite_events", "idx_fav_user_event", ["user_id", "event_id"]),
+    # Etkinlik detayındaki yorumlar
+    ("comments", "idx_comments_event_created", ["event_id", "created_at"]),
+    # Herkese açık profildeki yorumlar
+    ("comments", "idx_comments_user_created", ["user_id", "created_at"]),
+    # Admin geri bildirim listesi
+    ("feedbacks", "idx_feedbacks_status_created", ["status", "created_at"]),
+]
+
+
+async def up(conn):
+    for table, name, columns in INDEXES:
+        await create_index(conn, table, name, columns)
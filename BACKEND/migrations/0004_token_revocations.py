@@ -0,0 +1,11 @@
+"""İptal edilmiş token'lar tablosu (token_revocations)"""
+from migrations import create_table
+
+
+async def up(conn):
+    # Kullanıcı silinse de kayıt token ömrü boyunca kalmalı: FK yok
+    await create_table(conn, "token_revocations", [
+        "`user_id` INT NOT NULL PRIMARY KEY",
+        "`revoked_before` {datetime} NOT NULL",
+        "`expires_at` {datetime} NOT NULL",
+    ])
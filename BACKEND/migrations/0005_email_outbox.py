@@ -0,0 +1,19 @@
+"""Gönderilecek e-postalar tablosu (email_outbox)"""
+from migrations import create_index, create_table
+
+
+async def up(conn):
+    await create_table(conn, "email_outbox", [
+        "`id` {pk}",
+        "`to_address` VARCHAR(255) NOT NULL",
+        "`subject` VARCHAR(255) NOT NULL",
+        "`body` {text} NOT NULL",
+        "`status` VARCHAR(20) NOT NULL DEFAULT 'pending'",
+        "`attempts` INT NOT NULL DEFAULT 0",
+        "`next_attempt_at` {datetime} NOT NULL",
+        "`last_error` VARCHAR(500)",
+        "`created_at` {datetime} NOT NULL DEFAULT {now}",
+        "`sent_at` {datetime}",
+    ])
+    # Sıradaki e-postaları bulan index
+    await create_index(conn, "email_outbox", "idx_outbox_status_next", ["status", "next_attempt_at"])
@@ -0,0 +1,13 @@
+"""Şifre sıfırlama token'ları tablosu (password_reset_tokens)"""
+from migrations import create_index, create_table
+
+
+async def up(conn):
+    await create_table(conn, "password_reset_tokens", [
+        "`token_hash` VARCHAR(64) NOT NULL PRIMARY KEY",
+        "`email` VARCHAR(255) NOT NULL",
+        "`expires_at` {datetime} NOT NULL",
+        "`created_at` {datetime} NOT NULL",
+    ])
+    await create_index(conn, "password_reset_tokens", "idx_reset_expires", ["expires_at"])
+    await create_index(conn, "password_reset_tokens", "idx_reset_email_created", ["email", "created_at"])
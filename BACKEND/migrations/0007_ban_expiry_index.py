@@ -0,0 +1,7 @@
+"""Süresi dolan banları temizleyen zamanlanmış iş için index"""
+from migrations import create_index
+
+
+async def up(conn):
+    # WHERE is_banned = 1 AND ban_until <= ?: sadece banlı satırlar taranır
+    await create_index(conn, "users", "idx_users_banned_until", ["is_banned", "ban_until"])
@@ -0,0 +1,7 @@
+"""Admin kullanıcı listesi sıralaması için index"""
+from migrations import create_index
+
+
+async def up(conn):
+    # ORDER BY is_admin DESC, created_at DESC, user_id DESC (PK index'in sonunda)
+    await create_index(conn, "users", "idx_users_admin_created", ["is_admin", "created_at"])
@@ -0,0 +1,23 @@
+"""Günlük özet tablosu (daily_stats) ve artımlı doldurma için tarih index'leri"""
+from migrations import create_index, create_table
+
+INDEXES = [
+    # Özet işi sadece son kayıtlı günden sonrasını sayar: WHERE <tarih> >= ?
+    ("users", "idx_users_created", ["created_at"]),
+    ("comments", "idx_comments_created", ["created_at"]),
+    ("favourite_events", "idx_fav_added", ["added_at"]),
+    ("feedbacks", "idx_feedbacks_created", ["created_at"]),
+]
+
+
+async def up(conn):
+    await create_table(conn, "daily_stats", [
+        "`id` {pk}",
+        "`metric` VARCHAR(32) NOT NULL",
+        "`day` DATE NOT NULL",
+        "`value` INT NOT NULL DEFAULT 0",
+    ])
+    # Upsert'in dayandığı tekil index
+    await create_index(conn, "daily_stats", "uniq_daily_stats_metric_day", ["metric", "day"], unique=True)
+    for table, name, columns in INDEXES:
+        await create_index(conn, table, name, columns)
@@ -0,0 +1,35 @@
+"""
+token_revocations: kullanıcı başına tür ("session" / "ban") başına bir kayıt.
+Ban kaldırılınca şifre sıfırlama iptali de silinmesin diye iki kısım ayrı tutulur.
+Mevcut kayıtlar "session" sayılır (güvenli taraf: en fazla token ömrü kadar kalır).
+"""
+from migrations import column_exists, create_index, create_table, dialect
+
+OLD_TABLE = "token_revocations_old"
+
+
+async def up(conn):
+    renamed = await column_exists(conn, OLD_TABLE, "user_id")
+    if not renamed and not await column_exists(conn, "token_revocations", "kind"):
+        await conn.execute_script(f"ALTER TABLE token_revocations RENAME TO {OLD_TABLE}")
+        renamed = True
+
+    await create_table(conn, "token_revocations", [
+        "`id` {pk}",
+        "`user_id` INT NOT NULL",
+        "`kind` VARCHAR(8) NOT NULL",
+        "`revoked_before` {datetime} NOT NULL",
+        "`expires_at` {datetime} NOT NULL",
+    ])
+    await create_index(conn, "token_revocations", "uniq_token_revocations_user_kind", ["user_id", "kind"], unique=True)
+
+    if renamed:
+        # Yarıda kalıp tekrar çalışırsa zaten kopyalanmış satırlar atlanır
+        ignore = "OR IGNORE" if dialect(conn) == "sqlite" else "IGNORE"
+        await conn.execute_script(
+            f"""
+            INSERT {ignore} INTO token_revocations (user_id, kind, revoked_before, expires_at)
+            SELECT user_id, 'session', revoked_before, expires_at FROM {OLD_TABLE}
+            """
+        )
+        await conn.execute_script(f"DROP TABLE {OLD_TABLE}")
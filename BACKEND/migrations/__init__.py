@@ -0,0 +1,256 @@
+"""
+Sürümlü şema migration'ları.
+
+Her migration bu klasörde "NNNN_aciklama.py" adlı bir modüldür ve
+`async def up(conn)` fonksiyonu tanımlar. Migration'lar şemayı kendi DDL'leriyle
+(create_table, add_column ...) tanımlar, modellerden üretmez: böylece boş bir
+veritabanında her sürüm o günkü şemayı kurar. Uygulanan sürümler
+`schema_migrations` tablosuna yazılır; tekrar çalıştırmak sadece eksik
+olanları sırayla uygular. Yardımcılar (create_index vb.) idempotenttir,
+yarıda kalmış bir migration güvenle tekrar çalıştırılabilir.
+
+Komut satırı: python migrate.py [up|status]
+"""
+import importlib
+import os
+import re
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATION_TABLE = "schema_migrations"
+# Aynı anda iki deploy migration çalıştırmasın (MySQL GET_LOCK)
+LOCK_NAME = "campushub_schema_migrations"
+LOCK_TIMEOUT = 60
+
+_FILE_RE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    def __init__(self, version, name, module_name):
+        self.version = version
+        self.name = name
+        self.module_name = module_name
+
+    def load(self):
+        module = importlib.import_module(f"{__name__}.{self.module_name}")
+        if not hasattr(module, "up"):
+            raise MigrationError(f"{self.module_name}: up(conn) fonksiyonu yok")
+        return module
+
+    def __repr__(self):
+        return f"<Migration {self.version}_{self.name}>"
+
+
+def discover(directory=MIGRATIONS_DIR):
+    """Klasördeki migration'ları sürüm sırasıyla döndür"""
+    found = {}
+    for filename in os.listdir(directory):
+        match = _FILE_RE.match(filename)
+        if not match:
+            continue
+        version, name = match.groups()
+        if version in found:
+            raise MigrationError(f"Aynı sürüm iki kez tanımlı: {version}")
+        found[version] = Migration(version, name, filename[:-3])
+    return [found[v] for v in sorted(found)]
+
+
+# -------------------------------------------------
+# Veritabanı yardımcıları (MySQL + testler için SQLite)
+# -------------------------------------------------
+def dialect(conn):
+    return conn.capabilities.dialect
+
+
+def placeholder(conn):
+    return "?" if dialect(conn) == "sqlite" else "%s"
+
+
+# create_table kolon tanımlarındaki {pk}, {text} ... yer tutucuları
+SQL_TYPES = {
+    "mysql": {
+        "pk": "INT NOT NULL PRIMARY KEY AUTO_INCREMENT",
+        "text": "LONGTEXT",
+        "datetime": "DATETIME(6)",
+        "now": "CURRENT_TIMESTAMP(6)",
+        "on_update_now": "ON UPDATE CURRENT_TIMESTAMP(6)",
+        "bool": "BOOL",
+    },
+    "sqlite": {
+        "pk": "INTEGER PRIMARY KEY AUTOINCREMENT NOT NULL",
+        "text": "TEXT",
+        "datetime": "TIMESTAMP",
+        "now": "CURRENT_TIMESTAMP",
+        "on_update_now": "",
+        "bool": "INT",
+    },
+}
+TABLE_OPTIONS = {"mysql": " CHARACTER SET utf8mb4", "sqlite": ""}
+
+
+async def create_table(conn, table, columns):
+    """Tablo yoksa oluştur. `columns`: kolon / kısıt tanımları, ör. "`title` VARCHAR(255) NOT NULL",
+    "`created_at` {datetime} NOT NULL DEFAULT {now}". Tanımlayıcılar ` ile yazılır (SQLite da kabul eder)."""
+    types = SQL_TYPES[dialect(conn)]
+    body = ",\n    ".join(c.format(**types) for c in columns)
+    await conn.execute_script(
+        f"CREATE TABLE IF NOT EXISTS `{table}` (\n    {body}\n){TABLE_OPTIONS[dialect(conn)]}"
+    )
+
+
+async def index_columns(conn, table):
+    """Tablodaki indexler: {index_adı: (kolon, ...)}"""
+    indexes = {}
+    if dialect(conn) == "sqlite":
+        rows = await conn.execute_query_dict(f'PRAGMA index_list("{table}")')
+        for row in rows:
+            info = await conn.execute_query_dict(f'PRAGMA index_info("{row["name"]}")')
+            indexes[row["name"]] = tuple(r["name"] for r in sorted(info, key=lambda r: r["seqno"]))
+        return indexes
+
+    rows = await conn.execute_query_dict(
+        """
+        SELECT INDEX_NAME AS index_name, COLUMN_NAME AS column_name
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+        """,
+        [table],
+    )
+    for row in rows:
+        indexes.setdefault(row["index_name"], ())
+        indexes[row["index_name"]] += (row["column_name"],)
+    return indexes
+
+
+async def create_index(conn, table, name, columns, unique=False):
+    """Index'i oluştur. Aynı kolonlarla başlayan bir index zaten varsa atla."""
+    columns = tuple(columns)
+    for existing_name, existing in (await index_columns(conn, table)).items():
+        if existing_name == name or existing[:len(columns)] == columns:
+            return False
+    cols = ", ".join(f"`{c}`" if dialect(conn) == "mysql" else f'"{c}"' for c in columns)
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    await conn.execute_script(f"CREATE {kind} {name} ON {table} ({cols})")
+    return True
+
+
+async def drop_index(conn, table, name):
+    if name not in await index_columns(conn, table):
+        return False
+    if dialect(conn) == "sqlite":
+        await conn.execute_script(f"DROP INDEX {name}")
+    else:
+        await conn.execute_script(f"DROP INDEX {name} ON {table}")
+    return True
+
+
+async def column_exists(conn, table, column):
+    if dialect(conn) == "sqlite":
+        rows = await conn.execute_query_dict(f'PRAGMA table_info("{table}")')
+        return any(r["name"] == column for r in rows)
+    rows = await conn.execute_query_dict(
+        """
+        SELECT 1 FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        """,
+        [table, column],
+    )
+    return bool(rows)
+
+
+async def add_column(conn, table, column, definition):
+    if await column_exists(conn, table, column):
+        return False
+    await conn.execute_script(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+    return True
+
+
+# -------------------------------------------------
+# Çalıştırıcı
+# -------------------------------------------------
+async def ensure_table(conn):
+    await conn.execute_script(
+        f"""
+        CREATE TABLE IF NOT EXISTS {MIGRATION_TABLE} (
+            version VARCHAR(16) NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL
+        )
+        """
+    )
+
+
+async def applied_versions(conn):
+    """{sürüm: uygulanma_zamanı}"""
+    await ensure_table(conn)
+    rows = await conn.execute_query_dict(f"SELECT version, applied_at FROM {MIGRATION_TABLE}")
+    return {row["version"]: row["applied_at"] for row in rows}
+
+
+async def status(conn, directory=MIGRATIONS_DIR):
+    """[(migration, uygulanma_zamanı veya None), ...]"""
+    applied = await applied_versions(conn)
+    return [(m, applied.get(m.version)) for m in discover(directory)]
+
+
+@asynccontextmanager
+async def _session(conn):
+    """Migration'ların tamamı için tek bağlantı.
+
+    MySQL'de GET_LOCK / RELEASE_LOCK oturuma bağlıdır; havuzdan her sorguda başka
+    bağlantı gelirse kilit başka bağlantıda kalır. Bağlantı bir işlem bloğuyla
+    sabitlenir ve blok hemen kapatılır: ifadeler havuzun autocommit ayarıyla tek
+    tek commit edilir (DDL zaten örtük commit eder).
+    """
+    if dialect(conn) != "mysql":
+        yield conn  # SQLite istemcisi tek bağlantılıdır
+        return
+    async with conn._in_transaction() as pinned:
+        await pinned.execute_script("COMMIT")
+        yield pinned
+
+
+async def migrate(conn, target=None, directory=MIGRATIONS_DIR, log=print):
+    """Eksik migration'ları sırayla uygula. `target` verilirse o sürümde dur."""
+    async with _session(conn) as conn:
+        locked = False
+        if dialect(conn) == "mysql":
+            rows = await conn.execute_query_dict("SELECT GET_LOCK(%s, %s) AS ok", [LOCK_NAME, LOCK_TIMEOUT])
+            if not rows or rows[0]["ok"] != 1:
+                raise MigrationError("Migration kilidi alınamadı; başka bir deploy çalışıyor olabilir.")
+            locked = True
+
+        try:
+            return await _apply_pending(conn, target, directory, log)
+        finally:
+            if locked:
+                await conn.execute_query("SELECT RELEASE_LOCK(%s)", [LOCK_NAME])
+
+
+async def _apply_pending(conn, target, directory, log):
+    applied = await applied_versions(conn)
+    done = []
+    for migration in discover(directory):
+        if target is not None and migration.version > target:
+            break
+        if migration.version in applied:
+            continue
+
+        log(f"⏫ {migration.version}_{migration.name} uygulanıyor...")
+        module = migration.load()
+        await module.up(conn)
+
+        ph = placeholder(conn)
+        await conn.execute_query(
+            f"INSERT INTO {MIGRATION_TABLE} (version, name, applied_at) VALUES ({ph}, {ph}, {ph})",
+            [migration.version, migration.name, datetime.now(timezone.utc).replace(tzinfo=None)],
+        )
+        done.append(migration)
+        log(f"✅ {migration.version}_{migration.name} uygulandı")
+    return done
@@ -73,6 +73,13 @@ class Event(models.Model):
     
     class Meta:
         table = "events"
+        # 🔥 Etkinlik listesi / imleçli sayfalama: build_event_list_query'nin keyset sorgusu
+        # (is_active, start_datetime) index'ine dayanır; ORDER BY start_datetime DESC, event_id DESC
+        # index'ten geriye okunur (event_id InnoDB'de index'e dahildir). İmleç koşulu
+        # "start_datetime <= ? OR start_datetime IS NULL" tek bir aralıktır (NULL en küçük değer),
+        # tarihsiz etkinliklere geçiş de aynı index'ten okunur. test_event_dates bunu doğrular.
+        # Mevcut veritabanlarında migrations/0003_hot_query_indexes.py ile oluşturulur
+        indexes = (("is_active", "start_datetime"),)
 
 # 4. Favori Etkinlikler
 class FavouriteEvent(models.Model):
@@ -84,6 +91,7 @@ class FavouriteEvent(models.Model):
     
     class Meta:
         table = "favourite_events"
+        indexes = (("user", "event"),)
 
 # 5. Etkinlik Yorumları (YENI - Feedback'in yerine)
 class Comment(models.Model):
@@ -99,6 +107,7 @@ class Comment(models.Model):
     
     class Meta:
         table = "comments"
+        indexes = (("event", "created_at"), ("user", "created_at"))
 
 # 6. Geri Bildirimler
 class Feedback(models.Model):
@@ -115,4 +124,60 @@ class Feedback(models.Model):
 
     class Meta:
         table = "feedbacks"
+        indexes = (("status", "created_at"),)
 
+
+# 7. İptal Edilmiş Token'lar (ban / silme / şifre sıfırlama)
+class TokenRevocation(models.Model):
+    # Kullanıcı silinse de kayıt token ömrü boyunca kalmalı: FK değil, düz alan
+    id = fields.IntField(pk=True)
+    user_id = fields.IntField()
+    kind = fields.CharField(max_length=8)    # "session" (şifre sıfırlama/silme) veya "ban"
+    revoked_before = fields.DatetimeField()  # Bu andan önce verilen token'lar geçersiz
+    expires_at = fields.DatetimeField()      # Ban bitişi veya son token'ın ömrü
+
+    class Meta:
+        table = "token_revocations"
+        unique_together = (("user_id", "kind"),)
+
+# 8. Gönderilecek E-postalar (outbox)
+class OutboxEmail(models.Model):
+    id = fields.IntField(pk=True)
+    to_address = fields.CharField(max_length=255)
+    subject = fields.CharField(max_length=255)
+    body = fields.TextField()
+
+    status = fields.CharField(max_length=20, default="pending")  # pending, sending, sent, failed
+    attempts = fields.IntField(default=0)
+    next_attempt_at = fields.DatetimeField()  # Gönderim sırası / yeniden deneme / kilit süresi
+    last_error = fields.CharField(max_length=500, null=True)
+
+    created_at = fields.DatetimeField(auto_now_add=True)
+    sent_at = fields.DatetimeField(null=True)
+
+    class Meta:
+        table = "email_outbox"
+        indexes = (("status", "next_attempt_at"),)
+
+# 9. Şifre Sıfırlama Token'ları
+class PasswordResetToken(models.Model):
+    # Token'ın kendisi saklanmaz, SHA-256 özeti birincil anahtardır
+    token_hash = fields.CharField(max_length=64, pk=True)
+    email = fields.CharField(max_length=255)
+    expires_at = fields.DatetimeField(index=True)  # Süresi dolanları toplu silmek için
+    created_at = fields.DatetimeField()
+
+    class Meta:
+        table = "password_reset_tokens"
+        indexes = (("email", "created_at"),)  # E-posta başına gönderim sınırı
+
+# 10. Günlük Özet İstatistikler (admin analitiği)
+class DailyStat(models.Model):
+    id = fields.IntField(pk=True)
+    metric = fields.CharField(max_length=32)  # signups, logins, comments ...
+    day = fields.DateField()                  # İstanbul takvim günü
+    value = fields.IntField(default=0)
+
+    class Meta:
+        table = "daily_stats"
+        unique_together = (("metric", "day"),)
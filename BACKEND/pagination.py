@@ -0,0 +1,67 @@
+"""
+İmleç (keyset / cursor) tabanlı sayfalama.
+
+OFFSET yerine son görülen satırın sıralama anahtarı kullanılır:
+    WHERE (tarih, id) < (son_tarih, son_id) ORDER BY tarih DESC, id DESC LIMIT n
+Böylece derin sayfalar da ilk sayfa kadar ucuzdur. İmleç istemciye opak bir
+string olarak verilir (base64url ile kodlanmış JSON).
+"""
+import base64
+import json
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class PaginationError(ValueError):
+    """Geçersiz limit veya imleç"""
+
+
+def encode_cursor(*values):
+    """Sıralama anahtarını opak imlece çevir (datetime'lar ISO formatında saklanır)"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor, types):
+    """İmleci çöz. `types`: her değerin tipi (datetime, int, str); None değerlere izin verilir."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError
+        values = []
+        for value, kind in zip(payload, types):
+            if value is None:
+                values.append(None)
+            elif kind is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif kind is int:
+                if not isinstance(value, int) or isinstance(value, bool):
+                    raise ValueError
+                values.append(value)
+            else:
+                values.append(kind(value))
+        return values
+    except (ValueError, TypeError):
+        raise PaginationError("Geçersiz sayfa imleci.") from None
+
+
+def parse_limit(args, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    raw = args.get("limit")
+    if raw is None or raw == "":
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise PaginationError("limit bir sayı olmalı.") from None
+    if limit < 1:
+        raise PaginationError("limit en az 1 olmalı.")
+    return min(limit, maximum)
+
+
+def wants_pagination(args):
+    """Sayfalama isteğe bağlıdır: limit veya cursor verilmezse eski tam liste döner"""
+    return bool(args.get("limit") or args.get("cursor"))
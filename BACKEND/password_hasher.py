@@ -0,0 +1,166 @@
+"""
+Şifre hash'leme havuzu (bcrypt).
+
+bcrypt bilerek yavaştır (~200 ms); event loop içinde çağrıldığında o süre
+boyunca worker'daki bütün istekler bekler. Hash/doğrulama işleri burada
+sınırlı bir thread havuzunda çalışır (bcrypt çalışırken GIL'i bırakır).
+Kuyruk doluysa iş beklemeye alınmaz, PasswordHasherBusy ile hemen reddedilir.
+
+Maliyet (rounds) açılışta ölçülür: gecikme bütçesini aşmayan en yüksek değer
+seçilir. Girişte daha düşük maliyetle saklanmış hash'ler yeniden hesaplanır.
+"""
+import asyncio
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", 2))
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", 32))
+# Tek bir hash işlemi için hedeflenen süre (ms)
+PASSWORD_HASH_BUDGET_MS = float(os.getenv("PASSWORD_HASH_BUDGET_MS", 250))
+
+DEFAULT_ROUNDS = 12
+MIN_ROUNDS = 10
+MAX_ROUNDS = 15
+
+
+class PasswordHasherBusy(Exception):
+    """Şifre kuyruğu dolu, iş kabul edilmedi"""
+
+
+def hash_rounds(hashed):
+    """"$2b$12$..." -> 12; bcrypt hash'i değilse None"""
+    parts = hashed.split("$") if hashed else []
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def _timed(func, *args):
+    """Thread'de çalışır: (sonuç, başlangıç, bitiş)"""
+    started = time.perf_counter()
+    result = func(*args)
+    return result, started, time.perf_counter()
+
+
+def _hashpw(password, rounds):
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _checkpw(password, hashed):
+    # Hash bcrypt formatında değilse ValueError (eski düz metin şifreler)
+    return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+
+
+def _measure(rounds):
+    _, started, finished = _timed(_hashpw, "calibration", rounds)
+    return finished - started
+
+
+class _Timing:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def stats(self):
+        return {
+            "avg_ms": round(self.total / self.count * 1000, 2) if self.count else None,
+            "max_ms": round(self.max * 1000, 2),
+        }
+
+
+class PasswordHasher:
+    """Sınırlı kuyruklu bcrypt havuzu
+
+    Aynı anda en fazla `max_pending` iş kabul edilir (çalışan + bekleyen).
+    """
+
+    def __init__(self, workers=PASSWORD_WORKERS, max_pending=PASSWORD_MAX_PENDING, rounds=DEFAULT_ROUNDS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.rounds = rounds
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait = _Timing()
+        self.hash_time = _Timing()
+        self._executor = None
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    def _job_done(self):
+        self.pending -= 1
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy("Şifre işleme kuyruğu dolu")
+
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        future = self._get_executor().submit(_timed, func, *args)
+        # İstek iptal edilse de iş thread'de bitene kadar kuyruk hakkını tutar
+        self.pending += 1
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._job_done))
+        result, started, finished = await asyncio.wrap_future(future)
+        self.completed += 1
+        self.queue_wait.add(started - submitted)
+        self.hash_time.add(finished - started)
+        return result
+
+    async def hash(self, password):
+        return await self._run(_hashpw, password, self.rounds)
+
+    async def verify(self, password, hashed):
+        return await self._run(_checkpw, password, hashed)
+
+    def needs_rehash(self, hashed):
+        rounds = hash_rounds(hashed)
+        return rounds is not None and rounds < self.rounds
+
+    def calibrate(self, budget_ms=PASSWORD_HASH_BUDGET_MS, measure=None):
+        """Bütçeyi aşmayan en yüksek maliyeti seç (her +1 round süreyi ikiye katlar)
+
+        `measure(rounds)` saniye döndürür; verilmezse gerçek bir hash ölçülür.
+        """
+        measure = measure or _measure
+        elapsed = max(measure(MIN_ROUNDS), 1e-6)
+        extra = math.floor(math.log2(budget_ms / 1000 / elapsed)) if budget_ms / 1000 > elapsed else 0
+        self.rounds = min(MAX_ROUNDS, MIN_ROUNDS + extra)
+        return self.rounds
+
+    async def calibrate_async(self, budget_ms=PASSWORD_HASH_BUDGET_MS):
+        """Ölçümü event loop dışında yap (sunucu açılışı)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self.calibrate, budget_ms)
+
+    def stats(self):
+        return {
+            "rounds": self.rounds,
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "queue_wait": self.queue_wait.stats(),
+            "hash_time": self.hash_time.stats(),
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,102 @@
+"""
+Seyrek alan seçimi (sparse fieldsets): ?fields=id,title,date
+
+Liste endpoint'leri istemcinin istediği alanları seçmesine izin verir.
+Seçilmeyen alanların kolonları SQL/ORM sorgusuna hiç eklenmez; böylece
+description / image_url gibi büyük TextField'lar MySQL'den çekilmez ve
+JSON'a yazılmaz.
+
+Her alan, ihtiyaç duyduğu kolonları {takma_ad: kaynak} olarak tanımlar.
+Kaynak, ORM sorgularında `.values()` alan yolu ("university__name"),
+ham SQL sorgularında ise SELECT ifadesidir ("uni.name").
+"""
+
+
+class ProjectionError(ValueError):
+    """İstemci bilinmeyen bir alan istedi"""
+
+
+class Field:
+    def __init__(self, name, columns=None, render=None):
+        self.name = name
+        # Kolon verilmezse alan adı ile aynı isimli tek kolon kullanılır
+        self.columns = columns if columns is not None else {name: name}
+        first = next(iter(self.columns))
+        self.render = render or (lambda row: row[first])
+
+
+class Projection:
+    """Bir endpoint'in seçilebilir alanları
+
+    default: `fields` parametresi yoksa dönen alanlar (eski tam yanıt)
+    lean   : `?lean=1` ile dönen küçük kart görünümü
+    always : her yanıtta bulunan alanlar (ör. id)
+    """
+
+    def __init__(self, *fields, lean=None, always=()):
+        self.fields = {f.name: f for f in fields}
+        self.default = tuple(self.fields)
+        self.lean = tuple(lean) if lean else self.default
+        self.always = tuple(always)
+
+    def parse(self, args, param="fields"):
+        """İstek parametrelerinden seçilen alanları bul"""
+        raw = (args.get(param) or "").strip()
+        if raw:
+            names = [n.strip() for n in raw.split(",") if n.strip()]
+            unknown = [n for n in names if n not in self.fields]
+            if unknown:
+                raise ProjectionError(f"Bilinmeyen alan(lar): {', '.join(unknown)}")
+        elif args.get("lean") in ("1", "true"):
+            names = list(self.lean)
+        else:
+            names = list(self.default)
+
+        for name in reversed(self.always):
+            if name not in names:
+                names.insert(0, name)
+        # Sırayı koru, tekrarları at
+        return tuple(self.fields[n] for n in dict.fromkeys(names))
+
+    @staticmethod
+    def columns(selected, extra=None):
+        """Seçilen alanların ihtiyaç duyduğu kolonlar: {takma_ad: kaynak}"""
+        cols = {}
+        for field in selected:
+            cols.update(field.columns)
+        if extra:
+            cols.update(extra)
+        return cols
+
+    def sql_select(self, selected, extra=None):
+        """Ham SQL için SELECT listesi: "kaynak AS takma_ad, ..." """
+        return ",\n            ".join(
+            f"{source} AS {alias}" for alias, source in self.columns(selected, extra).items()
+        )
+
+    @staticmethod
+    def render(row, selected):
+        return {field.name: field.render(row) for field in selected}
+
+
+
+# -------------------------------------------------
+# Sık kullanılan biçimlendiriciler
+# -------------------------------------------------
+def strftime_of(alias, pattern, convert=None):
+    """Tarih kolonunu verilen kalıpla string'e çevir (None ise None)"""
+    def render(row):
+        value = row[alias]
+        if not value:
+            return None
+        return (convert(value) if convert else value).strftime(pattern)
+    return render
+
+
+def isoformat_of(alias, convert=None):
+    def render(row):
+        value = row[alias]
+        if not value:
+            return None
+        return (convert(value) if convert else value).isoformat()
+    return render
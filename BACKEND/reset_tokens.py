@@ -0,0 +1,115 @@
+"""
+Şifre sıfırlama token'ları: password_reset_tokens tablosunda tutulur.
+
+Önceden worker belleğindeki bir sözlükteydi: yeniden başlatmada kayboluyor,
+süresi dolanlar hiç silinmiyor ve bağlantı sadece token'ı veren worker'a
+düşerse çalışıyordu. Şimdi:
+
+  * Token'ın SHA-256 özeti birincil anahtardır; her worker tek bir PK
+    sorgusuyla doğrular (token'ın kendisi DB'de tutulmaz).
+  * Token tek kullanımlıktır: koşullu DELETE ile harcanır, aynı bağlantı iki
+    kez (veya iki worker'da aynı anda) kullanılamaz.
+  * Aynı e-postaya RESET_MAX_PER_WINDOW'dan fazla bağlantı gönderilmez.
+  * Süresi dolan kayıtlar zamanlanmış işte (sweep) parça parça silinir.
+"""
+import hashlib
+import os
+import secrets
+from datetime import datetime, timedelta, timezone
+
+from models import PasswordResetToken
+
+RESET_TOKEN_TTL = int(os.getenv("RESET_TOKEN_TTL", 3600))
+# Bir e-postaya RESET_WINDOW_SECONDS içinde en fazla bu kadar bağlantı
+RESET_MAX_PER_WINDOW = int(os.getenv("RESET_MAX_PER_WINDOW", 3))
+RESET_WINDOW_SECONDS = int(os.getenv("RESET_WINDOW_SECONDS", 3600))
+RESET_SWEEP_INTERVAL = float(os.getenv("RESET_SWEEP_INTERVAL", 600))
+# Tek DELETE ile silinecek en fazla kayıt (tabloyu uzun süre kilitlemesin)
+SWEEP_BATCH_SIZE = 500
+
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+
+def hash_token(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class ResetTokenStore:
+    def __init__(self, ttl=RESET_TOKEN_TTL, max_per_window=RESET_MAX_PER_WINDOW,
+                 window=RESET_WINDOW_SECONDS, clock=utcnow):
+        self.ttl = ttl
+        self.max_per_window = max_per_window
+        self.window = window
+        self.clock = clock
+        self.issued = 0
+        self.throttled = 0
+        self.consumed = 0
+        self.swept = 0
+
+    async def issue(self, email):
+        """Yeni token üret ve kaydet; e-posta sınırı aşıldıysa None"""
+        now = self.clock()
+        # Sınır yaklaşıktır: aynı anda gelen iki istek birlikte sayılabilir
+        recent = await PasswordResetToken.filter(
+            email=email, created_at__gt=now - timedelta(seconds=self.window)
+        ).count()
+        if recent >= self.max_per_window:
+            self.throttled += 1
+            return None
+        token = secrets.token_urlsafe(32)
+        await PasswordResetToken.create(
+            token_hash=hash_token(token), email=email,
+            expires_at=now + timedelta(seconds=self.ttl), created_at=now,
+        )
+        self.issued += 1
+        return token
+
+    async def lookup(self, token):
+        """Geçerli token'ın e-postası; yoksa / süresi dolmuşsa None"""
+        if not token:
+            return None
+        row = await PasswordResetToken.get_or_none(token_hash=hash_token(token))
+        if row is None or row.expires_at <= self.clock():
+            return None
+        return row.email
+
+    async def consume(self, token):
+        """Token'ı harca; başka bir istek daha önce harcadıysa False.
+
+        Başarılı olursa aynı e-postaya verilmiş diğer bağlantılar da geçersiz olur.
+        """
+        email = await self.lookup(token)
+        if email is None:
+            return False
+        deleted = await PasswordResetToken.filter(token_hash=hash_token(token)).delete()
+        if not deleted:
+            return False
+        await PasswordResetToken.filter(email=email).delete()
+        self.consumed += 1
+        return True
+
+    async def sweep(self, batch_size=SWEEP_BATCH_SIZE):
+        """Süresi dolan kayıtları parça parça sil; silinen sayısını döndür"""
+        now = self.clock()
+        total = 0
+        while True:
+            hashes = await PasswordResetToken.filter(expires_at__lte=now).limit(batch_size).values_list(
+                "token_hash", flat=True
+            )
+            if not hashes:
+                break
+            total += await PasswordResetToken.filter(token_hash__in=hashes).delete()
+            if len(hashes) < batch_size:
+                break
+        self.swept += total
+        return total
+
+    def stats(self):
+        return {
+            "issued": self.issued,
+            "throttled": self.throttled,
+            "consumed": self.consumed,
+            "swept": self.swept,
+        }
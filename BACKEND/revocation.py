@@ -0,0 +1,171 @@
+"""
+Token iptal listesi: banlanan, silinen veya şifresini sıfırlayan kullanıcıların
+eski JWT'lerini geçersiz kılar.
+
+JWT'ler 24 saat geçerli ve durumsuzdur; her istekte kullanıcıyı DB'den okumak
+yerine worker belleğinde {user_id: {tür: (iptal_sınırı, bitiş)}} tutulur. Bir token,
+`iat` değeri herhangi bir türün iptal anı veya öncesiyse reddedilir. Her kısım, ban
+bittiğinde veya o ana kadar verilmiş tüm token'ların süresi dolduğunda kendiliğinden düşer.
+
+Kayıtlar kalıcı depoya (token_revocations tablosu) yazılır ve worker açılırken
+oradan yüklenir; değişiklikler paylaşılan önbellek kanalı üzerinden diğer
+worker'lara anahtarın içinde taşınır, yani duyuru alan worker DB'ye gitmez.
+"""
+import asyncio
+import heapq
+import time
+
+TOKEN_LIFETIME = 24 * 3600
+REVOCATION_CHANNEL_PREFIX = "revoke:"
+
+# İptal türleri: şifre sıfırlama / hesap silme ile ban ayrı tutulur. Ban kaldırılınca
+# sadece ban kısmı düşer; sıfırlamadan önce verilmiş (ör. çalınmış) token'lar geçersiz kalır.
+SESSION = "session"
+BAN = "ban"
+
+
+class RevocationList:
+    """load_all() -> [(user_id, tür, iptal_sınırı, bitiş)], save(user_id, tür, iptal_sınırı, bitiş),
+    delete(user_id, tür). Zamanlar epoch saniyesi."""
+
+    def __init__(self, backend=None, load_all=None, save=None, delete=None,
+                 token_lifetime=TOKEN_LIFETIME, clock=time.time):
+        self.backend = backend
+        self.load_all = load_all
+        self.save = save
+        self.delete = delete
+        self.token_lifetime = token_lifetime
+        self.clock = clock
+        self._entries = {}     # user_id -> {tür: (iptal_sınırı, bitiş)}
+        self._expiry = []      # (bitiş, user_id, tür) süresi dolanları temizlemek için
+        self._reloading = None
+        if backend is not None:
+            backend.add_listener(self._on_message)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ------ İstek yolu ------
+    def is_revoked(self, user_id, issued_at):
+        """Token iptal edilmiş mi? issued_at: token'ın `iat` değeri (epoch saniyesi)"""
+        if self.backend is not None:
+            self.backend.poll()
+        parts = self._entries.get(user_id)
+        if not parts:
+            return False
+        now = self.clock()
+        revoked = False
+        for revoked_before, expires_at in parts.values():
+            if expires_at <= now:
+                continue
+            # Veriliş zamanı bilinmiyorsa token iptalden sonra verildiği kanıtlanamaz
+            if issued_at is None or issued_at <= revoked_before:
+                revoked = True
+        if not revoked:
+            self._purge()
+        return revoked
+
+    def issued_at(self, payload):
+        """`iat` yoksa (eski token'lar) veriliş zamanı bitişten geriye hesaplanır"""
+        if "iat" in payload:
+            return payload["iat"]
+        if "exp" in payload:
+            return payload["exp"] - self.token_lifetime
+        return None
+
+    # ------ Değişiklikler ------
+    async def revoke(self, user_id, until=None, ban=False):
+        """Şu ana kadar verilmiş token'ları iptal et. `until`: ban bitişi (epoch), yoksa token ömrü.
+        `ban=True` ise kayıt ban kısmına yazılır ve restore() ile kaldırılabilir."""
+        now = self.clock()
+        # Tam iptal anı: yeni token'ların iat'ı mikrosaniye hassasiyetinde. Eski (tam
+        # saniye) iat'lı token'lar iptalle aynı saniyedeyse yine reddedilir.
+        revoked_before = now
+        expires_at = now + self.token_lifetime
+        if until is not None:
+            expires_at = min(expires_at, until)
+        if expires_at <= now:
+            return
+        kind = BAN if ban else SESSION
+        revoked_before, expires_at = self._apply(user_id, kind, revoked_before, expires_at)
+        if self.save is not None:
+            await self.save(user_id, kind, revoked_before, expires_at)
+        await self._publish(f"{REVOCATION_CHANNEL_PREFIX}{user_id}:{kind}:{revoked_before:.6f}:{expires_at:.0f}")
+
+    async def restore(self, user_id):
+        """Ban iptalini kaldır (ör. ban erken kaldırıldı). Şifre sıfırlama / silme iptali kalır."""
+        self._remove(user_id, BAN)
+        if self.delete is not None:
+            await self.delete(user_id, BAN)
+        await self._publish(f"{REVOCATION_CHANNEL_PREFIX}{user_id}:{BAN}:-")
+
+    async def _publish(self, key):
+        if self.backend is None:
+            return
+        try:
+            await self.backend.publish(key)
+        except Exception as e:
+            print(f"⚠️ Token iptali duyurulamadı: {e!r}")
+
+    def _apply(self, user_id, kind, revoked_before, expires_at):
+        """Kaydı birleştir ve geçerli (iptal_sınırı, bitiş) değerini döndür.
+        Oturum iptalleri en geç sınırı ve en geç bitişi korur; yeni ban eskisinin yerini alır
+        (admin ban süresini kısaltabilir)."""
+        parts = self._entries.setdefault(user_id, {})
+        current = parts.get(kind)
+        if kind == SESSION and current is not None:
+            revoked_before = max(revoked_before, current[0])
+            expires_at = max(expires_at, current[1])
+        parts[kind] = (revoked_before, expires_at)
+        heapq.heappush(self._expiry, (expires_at, user_id, kind))
+        return revoked_before, expires_at
+
+    def _remove(self, user_id, kind):
+        parts = self._entries.get(user_id)
+        if parts is None:
+            return
+        parts.pop(kind, None)
+        if not parts:
+            del self._entries[user_id]
+
+    def _purge(self):
+        now = self.clock()
+        while self._expiry and self._expiry[0][0] <= now:
+            _, user_id, kind = heapq.heappop(self._expiry)
+            part = self._entries.get(user_id, {}).get(kind)
+            if part is not None and part[1] <= now:
+                self._remove(user_id, kind)
+
+    # ------ Worker'lar arası ------
+    def _on_message(self, key):
+        if key is None:
+            # Duyurular kaçırılmış olabilir: listeyi depodan yeniden yükle
+            if self.load_all is not None and (self._reloading is None or self._reloading.done()):
+                self._reloading = asyncio.ensure_future(self.load())
+            return
+        if not key.startswith(REVOCATION_CHANNEL_PREFIX):
+            return
+        user_id, kind, rest = key[len(REVOCATION_CHANNEL_PREFIX):].split(":", 2)
+        if rest == "-":
+            self._remove(int(user_id), kind)
+        else:
+            revoked_before, expires_at = rest.split(":")
+            self._apply(int(user_id), kind, float(revoked_before), float(expires_at))
+
+    async def load(self):
+        """Kalıcı depodaki geçerli kayıtları yükle (worker açılışı)"""
+        if self.backend is not None:
+            # Önce kanala bağlan: yükleme sırasında gelen duyurular kaçmasın
+            self.backend.poll()
+        rows = await self.load_all()
+        now = self.clock()
+        self._entries.clear()
+        self._expiry.clear()
+        for user_id, kind, revoked_before, expires_at in rows:
+            if expires_at > now:
+                self._apply(user_id, kind, revoked_before, expires_at)
+        return len(self._entries)
+
+    def stats(self):
+        self._purge()
+        return {"revoked_users": len(self._entries)}
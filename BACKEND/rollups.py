@@ -0,0 +1,199 @@
+"""
+Admin analitiği için günlük özet (rollup) tablosu: daily_stats(metric, day, value).
+
+Zaman serisi istekleri ham tabloları (users, comments ...) taramaz; sadece
+bu tablodaki gün satırlarını okur. Tablo zamanlanmış işle artımlı doldurulur:
+
+  * Sayım metrikleri (kayıt, yorum, favori, geri bildirim): her turda sadece
+    metriğin son kayıtlı gününden bugüne kadarki satırlar sayılır (tarih
+    kolonundaki index ile). Tekrar çalıştırmak aynı sonucu yazar, bu yüzden
+    işin tüm worker'larda çalışması sorun değildir. Geçmiş günler kaydedildiği
+    gibi kalır (sonradan silinen satırlar eski günlerden düşülmez).
+  * Girişler tabloda iz bırakmadığından (last_login üzerine yazılır) her
+    worker kendi girişlerini bellekte sayar ve turda farkı ekler.
+  * Aktif etkinlik sayısı anlık bir değerdir; her turda bugünün satırına yazılır
+    (günün son ölçümü kalır).
+
+Günler İstanbul takvimine göredir (istanbul_time yardımcıları). SQL'de gruplama
+sabit bir farkla yapılır (ISTANBUL_SQL_OFFSET), bkz. _day_sql.
+"""
+import os
+from datetime import date, datetime, timedelta, timezone
+
+from istanbul_time import istanbul_day, istanbul_midnight_utc
+from migrations import dialect, placeholder
+
+ROLLUP_INTERVAL = float(os.getenv("ROLLUP_INTERVAL", 300))
+# SQL tarafında İstanbul günü için UTC farkı (saat). İstanbul Eylül 2016'dan beri
+# yaz saati uygulamıyor (sürekli UTC+3); veritabanında saat dilimi tabloları
+# (CONVERT_TZ) yüklü olmayabileceği için sabit fark kullanılır.
+ISTANBUL_SQL_OFFSET = 3
+
+# metrik -> (tablo, tarih kolonu)
+COUNT_METRICS = {
+    "signups": ("users", "created_at"),
+    "comments": ("comments", "created_at"),
+    "favourites": ("favourite_events", "added_at"),
+    "feedbacks": ("feedbacks", "created_at"),
+}
+LOGIN_METRIC = "logins"
+GAUGE_METRICS = ("active_events",)
+METRICS = (*COUNT_METRICS, LOGIN_METRIC, *GAUGE_METRICS)
+
+BUCKETS = ("day", "week", "month")
+# Tek upsert ile yazılacak en fazla gün
+UPSERT_BATCH_SIZE = 200
+
+
+def _day_sql(conn, column):
+    """Kolonun İstanbul günü (SQL). Sabit UTC+3 farkı: 2016 öncesi kışın (UTC+2)
+    gece 00:00-01:00 arasındaki kayıtlar bir sonraki güne yazılır. Sadece ilk
+    çalıştırmadaki geçmiş taramasını etkiler; sonraki turlar güncel günleri sayar."""
+    hours = ISTANBUL_SQL_OFFSET
+    if dialect(conn) == "sqlite":
+        return f"DATE({column}, '+{hours} hours')"
+    return f"DATE(DATE_ADD({column}, INTERVAL {hours} HOUR))"
+
+
+def _as_date(value):
+    # MySQL date, SQLite "YYYY-MM-DD" döndürür
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+async def upsert_daily(conn, metric, values, add=False):
+    """values: {gün: değer}. add=True: mevcut değere ekle, aksi halde üzerine yaz."""
+    p = placeholder(conn)
+    if dialect(conn) == "sqlite":
+        new_value = "excluded.value"
+        conflict = "ON CONFLICT(metric, day) DO UPDATE SET value = {}"
+    else:
+        new_value = "VALUES(value)"
+        conflict = "ON DUPLICATE KEY UPDATE value = {}"
+    conflict = conflict.format(f"value + {new_value}" if add else new_value)
+
+    items = sorted(values.items())
+    for start in range(0, len(items), UPSERT_BATCH_SIZE):
+        chunk = items[start:start + UPSERT_BATCH_SIZE]
+        params = [v for day, value in chunk for v in (metric, day.isoformat(), value)]
+        await conn.execute_query(
+            f"INSERT INTO daily_stats (metric, day, value) VALUES "
+            f"{', '.join([f'({p}, {p}, {p})'] * len(chunk))} {conflict}",
+            params,
+        )
+
+
+async def last_recorded_day(conn, metric):
+    p = placeholder(conn)
+    rows = await conn.execute_query_dict(f"SELECT MAX(day) AS day FROM daily_stats WHERE metric = {p}", [metric])
+    return _as_date(rows[0]["day"]) if rows and rows[0]["day"] is not None else None
+
+
+async def refresh_count_metric(conn, metric):
+    """Son kayıtlı günden (dahil) itibaren günlük sayıları yeniden hesapla; yazılan gün sayısını döndür"""
+    table, column = COUNT_METRICS[metric]
+    since = await last_recorded_day(conn, metric)
+    query = f"SELECT {_day_sql(conn, column)} AS day, COUNT(*) AS value FROM {table}"
+    params = []
+    if since is not None:
+        query += f" WHERE {column} >= {placeholder(conn)}"
+        params.append(istanbul_midnight_utc(since))
+    # İlk çalıştırmada (since yok) tüm geçmiş bir kez taranır
+    rows = await conn.execute_query_dict(f"{query} GROUP BY {_day_sql(conn, column)}", params)
+    values = {_as_date(r["day"]): int(r["value"]) for r in rows if r["day"] is not None}
+    await upsert_daily(conn, metric, values)
+    return len(values)
+
+
+async def snapshot_active_events(conn, today):
+    rows = await conn.execute_query_dict("SELECT COUNT(*) AS value FROM events WHERE is_active = TRUE")
+    await upsert_daily(conn, "active_events", {today: int(rows[0]["value"])})
+
+
+async def read_daily(conn, metric, first_day, last_day):
+    """{gün: değer}, iki uç dahil"""
+    p = placeholder(conn)
+    rows = await conn.execute_query_dict(
+        f"SELECT day, value FROM daily_stats WHERE metric = {p} AND day >= {p} AND day <= {p}",
+        [metric, first_day.isoformat(), last_day.isoformat()],
+    )
+    return {_as_date(r["day"]): int(r["value"]) for r in rows}
+
+
+def bucket_start(day, bucket):
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())  # Pazartesi
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucketize(values, first_day, last_day, bucket="day", gauge=False):
+    """Günlük değerleri gün/hafta/ay dilimlerine topla: [{"start": "YYYY-MM-DD", "value": n}]
+
+    Sayım metriklerinde dilim toplamı (eksik gün 0), anlık metriklerde dilimin
+    son ölçümü (hiç ölçüm yoksa None) döner.
+    """
+    series = {}
+    day = first_day
+    while day <= last_day:
+        key = bucket_start(day, bucket)
+        value = values.get(day)
+        if gauge:
+            if value is not None:
+                series[key] = value
+            else:
+                series.setdefault(key, None)
+        else:
+            series[key] = series.get(key, 0) + (value or 0)
+        day += timedelta(days=1)
+    return [{"start": key.isoformat(), "value": value} for key, value in series.items()]
+
+
+class DailyRollups:
+    """get_conn() -> veritabanı bağlantısı"""
+
+    def __init__(self, get_conn, clock=lambda: datetime.now(timezone.utc)):
+        self.get_conn = get_conn
+        self.clock = clock
+        self.logins = {}  # gün -> bu worker'da henüz yazılmamış giriş sayısı
+        self.runs = 0
+        self.days_written = 0
+
+    def record_login(self, when):
+        day = istanbul_day(when)
+        self.logins[day] = self.logins.get(day, 0) + 1
+
+    async def flush_logins(self):
+        if not self.logins:
+            return 0
+        pending, self.logins = self.logins, {}
+        try:
+            await upsert_daily(self.get_conn(), LOGIN_METRIC, pending, add=True)
+        except Exception:
+            # Sonraki tura geri koy
+            for day, count in pending.items():
+                self.logins[day] = self.logins.get(day, 0) + count
+            raise
+        return len(pending)
+
+    async def run(self):
+        """Zamanlanmış iş: özet tabloyu güncelle; yazılan gün sayısını döndür"""
+        conn = self.get_conn()
+        written = 0
+        for metric in COUNT_METRICS:
+            written += await refresh_count_metric(conn, metric)
+        await snapshot_active_events(conn, istanbul_day(self.clock()))
+        written += 1 + await self.flush_logins()
+        self.runs += 1
+        self.days_written += written
+        return written
+
+    async def read(self, metric, first_day, last_day):
+        return await read_daily(self.get_conn(), metric, first_day, last_day)
+
+    def stats(self):
+        return {
+            "runs": self.runs,
+            "days_written": self.days_written,
+            "pending_login_days": len(self.logins),
+        }
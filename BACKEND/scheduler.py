@@ -0,0 +1,84 @@
+"""
+Periyodik arka plan işleri (süresi dolan ban / token temizliği vb.).
+
+İstek yolunda yapılan bakım yazmaları buraya taşınır: her iş kendi task'ında
+belirli aralıkla çalışır, hata olursa loglanıp bir sonraki turda tekrar
+denenir. İşler tüm worker'larda çalışır; bu yüzden tekrar çalıştırılması
+zararsız (idempotent) olmalıdır.
+"""
+import asyncio
+import time
+
+
+class Job:
+    def __init__(self, name, interval, func, run_at_start=False):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.run_at_start = run_at_start
+        self.runs = 0
+        self.errors = 0
+        self.last_result = None
+        self.last_ms = None
+        self.task = None
+        self.current = None
+
+    async def run_once(self):
+        started = time.perf_counter()
+        try:
+            self.last_result = await self.func()
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Zamanlanmış iş başarısız ({self.name}): {e!r}")
+        else:
+            self.runs += 1
+        self.last_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    async def _loop(self):
+        if not self.run_at_start:
+            await asyncio.sleep(self.interval)
+        while True:
+            # Kapanışta iptal edilse bile başlamış tur yarıda kalmaz (stop() bekler)
+            self.current = asyncio.ensure_future(self.run_once())
+            await asyncio.shield(self.current)
+            await asyncio.sleep(self.interval)
+
+    def stats(self):
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "errors": self.errors,
+            "last_result": self.last_result,
+            "last_ms": self.last_ms,
+        }
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs = {}
+
+    def every(self, interval, name, func, run_at_start=False):
+        """`func()` -> awaitable; her `interval` saniyede bir çağrılır"""
+        self.jobs[name] = Job(name, interval, func, run_at_start)
+        return self.jobs[name]
+
+    def start(self):
+        for job in self.jobs.values():
+            if job.task is None or job.task.done():
+                job.task = asyncio.ensure_future(job._loop())
+
+    async def stop(self):
+        for job in self.jobs.values():
+            if job.task is None:
+                continue
+            job.task.cancel()
+            try:
+                await job.task
+            except asyncio.CancelledError:
+                pass
+            job.task = None
+            if job.current is not None and not job.current.done():
+                await job.current
+
+    def stats(self):
+        return {name: job.stats() for name, job in self.jobs.items()}
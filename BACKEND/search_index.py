@@ -0,0 +1,261 @@
+"""
+Etkinlik araması: Türkçe'ye duyarlı ters index (inverted index) + BM25 sıralama.
+
+Metinler Türkçe kurallarıyla küçültülür (I -> ı, İ -> i) ve aksanlar
+katlanır (ı/i, ş/s, ğ/g, ç/c, ö/o, ü/u); böylece "istanbul", "İSTANBUL" ve
+"ıstanbul" aynı terime düşer. Sorgudaki her kelime önek (prefix) olarak da
+eşleşir ("konf" -> "konferans"). Sonuçlar BM25 ile puanlanır; başlık,
+kategori ve kulüp alanları açıklamadan daha ağırdır.
+
+Index bellekte tutulur ve admin etkinlik değiştirdikçe sadece ilgili
+etkinlik güncellenir; değişiklik diğer worker'lara da duyurulur.
+"""
+import asyncio
+import heapq
+import math
+import re
+from bisect import bisect_left
+
+# Alan ağırlıkları (BM25F benzeri: terim sıklığı ve doküman uzunluğu ağırlıklı)
+FIELD_WEIGHTS = {"title": 3.0, "category": 2.0, "club": 2.0, "university": 1.5, "description": 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Önek eşleşmesi tam eşleşmeden biraz düşük puan alır
+PREFIX_WEIGHT = 0.7
+# Kısa öneklerde en sık geçen bu kadar terim genişletilir (sorgu süresi sabit kalsın)
+MAX_EXPANSIONS = 50
+MIN_TOKEN_LENGTH = 2
+
+SEARCH_CHANNEL_PREFIX = "search:event:"
+
+_FOLD = str.maketrans({"ı": "i", "ş": "s", "ğ": "g", "ç": "c", "ö": "o", "ü": "u",
+                       "â": "a", "î": "i", "û": "u", "\u0307": None})
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def turkish_fold(text):
+    """Türkçe küçük harfe çevir ve aksanları katla"""
+    if not text:
+        return ""
+    return text.replace("I", "ı").replace("İ", "i").lower().translate(_FOLD)
+
+
+def tokenize(text):
+    return [t for t in _TOKEN_RE.findall(turkish_fold(text)) if len(t) >= MIN_TOKEN_LENGTH]
+
+
+class InvertedIndex:
+    """Artımlı güncellenebilen ters index"""
+
+    def __init__(self, weights=FIELD_WEIGHTS):
+        self.weights = weights
+        self.postings = {}      # terim -> {doc_id: ağırlıklı tf}
+        self.doc_terms = {}     # doc_id -> {terim: ağırlıklı tf}
+        self.doc_length = {}    # doc_id -> ağırlıklı uzunluk
+        self.total_length = 0.0
+        self.terms = []         # önek araması için sıralı terim listesi
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.doc_terms
+
+    def upsert(self, doc_id, fields):
+        """Dokümanı ekle veya güncelle. fields: {alan_adı: metin}"""
+        self.remove(doc_id)
+        terms = {}
+        length = 0.0
+        for name, text in fields.items():
+            weight = self.weights.get(name, 1.0)
+            for token in tokenize(text):
+                terms[token] = terms.get(token, 0.0) + weight
+                length += weight
+        if not terms:
+            return
+
+        self.doc_terms[doc_id] = terms
+        self.doc_length[doc_id] = length
+        self.total_length += length
+        for term, tf in terms.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                self.terms.insert(bisect_left(self.terms, term), term)
+            posting[doc_id] = tf
+
+    def remove(self, doc_id):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return False
+        self.total_length -= self.doc_length.pop(doc_id)
+        for term in terms:
+            posting = self.postings[term]
+            del posting[doc_id]
+            if not posting:
+                del self.postings[term]
+                del self.terms[bisect_left(self.terms, term)]
+        return True
+
+    def _expand(self, token):
+        """Sorgu kelimesinin eşleştiği terimler: [(terim, ağırlık)]"""
+        start = bisect_left(self.terms, token)
+        end = bisect_left(self.terms, token + "\uffff", start)
+        matches = self.terms[start:end]
+        if len(matches) > MAX_EXPANSIONS:
+            matches = heapq.nlargest(MAX_EXPANSIONS, matches, key=lambda t: len(self.postings[t]))
+        return [(term, 1.0 if term == token else PREFIX_WEIGHT) for term in matches]
+
+    def search(self, query, limit=20):
+        """Tüm kelimeleri içeren dokümanlar, BM25 puanına göre: [(doc_id, puan)]"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.doc_terms:
+            return []
+
+        n_docs = len(self.doc_terms)
+        avg_length = self.total_length / n_docs
+        scores = None
+        for token in tokens:
+            expansions = self._expand(token)
+            # idf sorgu kelimesi için hesaplanır: nadir bir genişleme tam eşleşmeyi geçemesin
+            df = len(set().union(*(self.postings[term] for term, _ in expansions)))
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            token_scores = {}
+            for term, weight in expansions:
+                for doc_id, tf in self.postings[term].items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_length[doc_id] / avg_length)
+                    score = weight * idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    # Aynı kelimenin birden fazla genişlemesi eşleşirse en iyisi sayılır
+                    if score > token_scores.get(doc_id, 0.0):
+                        token_scores[doc_id] = score
+            if not token_scores:
+                return []
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {d: s + token_scores[d] for d, s in scores.items() if d in token_scores}
+                if not scores:
+                    return []
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+        return [(doc_id, round(score, 4)) for doc_id, score in best]
+
+
+class SyncedIndex:
+    """Worker içi index'in yaşam döngüsü ve worker'lar arası senkronizasyonu
+
+    load_all() -> [(id, doküman)], load_one(id) -> doküman veya None
+    (silinmiş / gizlenmiş kayıt). Index ilk aramada oluşturulur; alt sınıflar
+    `channel_prefix` ve `new_index()` tanımlar. Index `upsert`/`remove`/`search`
+    sağlamalıdır.
+    """
+
+    channel_prefix = None
+
+    def __init__(self, load_all, load_one, backend=None):
+        self.load_all = load_all
+        self.load_one = load_one
+        self.backend = backend
+        self.index = None
+        self._building = None
+        self._tasks = set()
+        # Index oluşturulurken değişen etkinlikler; oluşturma bitince yeniden okunur
+        self._changed_during_build = set()
+        if backend is not None:
+            backend.add_listener(self._on_message)
+
+    def _on_message(self, key):
+        if key is None:
+            # Mesaj kaçırılmış olabilir: bir sonraki aramada baştan oluştur
+            self.index = None
+        elif key.startswith(self.channel_prefix):
+            self._changed(int(key[len(self.channel_prefix):]))
+
+    def _changed(self, event_id):
+        if self.index is not None:
+            self._spawn(self._reload(event_id))
+        elif self._building is not None and not self._building.done():
+            self._changed_during_build.add(event_id)
+
+    def _spawn(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def new_index(self):
+        raise NotImplementedError
+
+    async def _build(self):
+        index = self.new_index()
+        self._changed_during_build.clear()
+        for event_id, fields in await self.load_all():
+            index.upsert(event_id, fields)
+        self.index = index
+        for event_id in self._changed_during_build:
+            self._spawn(self._reload(event_id))
+        self._changed_during_build.clear()
+        return index
+
+    async def ready(self):
+        if self.backend is not None:
+            self.backend.poll()
+        if self._tasks:
+            # Duyurusu gelmiş güncellemeler bitmeden eski sonuç dönmesin
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.index is not None:
+            return self.index
+        if self._building is None or self._building.done():
+            self._building = asyncio.ensure_future(self._build())
+        return await asyncio.shield(self._building)
+
+    async def _reload(self, doc_id):
+        try:
+            doc = await self.load_one(doc_id)
+        except Exception as e:
+            print(f"⚠️ Arama index'i güncellenemedi ({doc_id}): {e!r}")
+            self.index = None
+            return
+        if self.index is None:
+            return
+        if doc is None:
+            self.index.remove(doc_id)
+        else:
+            self.index.upsert(doc_id, doc)
+
+    async def changed(self, doc_id):
+        """Kayıt eklendi/güncellendi/silindi: bu worker'da güncelle, diğerlerine duyur"""
+        if self.index is not None:
+            await self._reload(doc_id)
+        else:
+            self._changed(doc_id)
+        if self.backend is not None:
+            try:
+                await self.backend.publish(f"{self.channel_prefix}{doc_id}")
+            except Exception as e:
+                print(f"⚠️ Arama index'i güncellemesi duyurulamadı: {e!r}")
+
+    async def search(self, query, limit=20):
+        index = await self.ready()
+        return index.search(query, limit)
+
+    def stats(self):
+        if self.index is None:
+            return {"ready": False}
+        return {"ready": True, "documents": len(self.index)}
+
+
+class EventSearchIndex(SyncedIndex):
+    """Etkinlik index'i. Doküman: {alan_adı: metin}; pasif/silinmiş etkinlik için None."""
+
+    channel_prefix = SEARCH_CHANNEL_PREFIX
+
+    def new_index(self):
+        return InvertedIndex()
+
+    async def event_changed(self, event_id):
+        await self.changed(event_id)
+
+    def stats(self):
+        if self.index is None:
+            return {"ready": False}
+        return {"ready": True, "events": len(self.index), "terms": len(self.index.terms)}
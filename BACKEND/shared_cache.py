@@ -0,0 +1,606 @@
+"""
+Worker'lar arası paylaşılan önbellek.
+
+Sanic birden fazla worker ile çalıştığında her process'in kendi RAM önbelleği
+olur; bir worker'daki güncelleme diğerlerinde eski verinin kalmasına yol açar.
+Bu modül iki katmanlı bir önbellek sunar:
+
+- L1: worker içi BoundedCache (çözülmüş Python nesneleri)
+- L2: tüm worker'ların gördüğü paylaşılan backend (JSON byte'ları)
+
+Bir kayıt silindiğinde (invalidate) L2'den de silinir ve bir geçersizleştirme
+mesajı yayınlanır; mesajı alan her worker kendi L1 kopyasını atar.
+
+Sürüm damgası: her silme, anahtarın sürümünü yeniler. Iskalamada DB'den okunan
+değer, okumadan önce alınan damgayla yazılır (lookup + set(stamp=)); arada
+başka bir worker kaydı sildiyse geç gelen yazma eski veriyi geri koymaz.
+
+Backend'ler (CACHE_BACKEND):
+- "local": paylaşım yok, sadece L1 (varsayılan; tek worker / Windows)
+- "mmap" : aynı makinedeki worker'lar için dosya tabanlı paylaşılan bellek.
+           Her işlem kısa bir flock ve mmap kopyası yapar (event loop üzerinde).
+- "redis": Redis protokolü konuşan bir sunucu (CACHE_URL)
+Birden fazla worker çalıştırılıyorsa mmap veya redis seçilmelidir; aksi halde
+geçersizleştirmeler ve duyurular diğer worker'lara ulaşmaz.
+"""
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from cache import BoundedCache, PROFILE_CACHE_TTL, encode_json
+
+try:
+    import fcntl
+except ImportError:  # Windows: dosya kilidi yok, mmap backend kullanılamaz
+    fcntl = None
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "local")
+CACHE_URL = os.getenv("CACHE_URL", "redis://127.0.0.1:6379/0")
+CACHE_CHANNEL = os.getenv("CACHE_CHANNEL", "campushub:invalidate")
+CACHE_MMAP_PATH = os.getenv("CACHE_MMAP_PATH", os.path.join(tempfile.gettempdir(), "campushub-cache.bin"))
+CACHE_MMAP_SLOTS = int(os.getenv("CACHE_MMAP_SLOTS", 1024))
+CACHE_MMAP_SLOT_SIZE = int(os.getenv("CACHE_MMAP_SLOT_SIZE", 16 * 1024))
+
+
+# Anahtarın sürüm kaydı (silmede yenilenir). Bir DB okumasından uzun yaşaması yeterli.
+VERSION_PREFIX = "~v:"
+VERSION_TTL = 3600
+# set(..., expected=ANY): sürüme bakmadan yaz
+ANY = object()
+
+
+class CacheUnavailable(Exception):
+    """Paylaşılan backend'e ulaşılamadı; istek önbelleksiz devam eder"""
+
+
+def new_version():
+    return os.urandom(8).hex().encode("ascii")
+
+
+class CacheBackend:
+    """Backend arayüzü. Geçersizleştirme mesajları dinleyicilere iletilir (key=None: hepsini at)."""
+
+    name = "local"
+    # False iken yayınlanan mesajlar kaçırılabilir; L1 kullanılmamalı
+    listening = True
+
+    def __init__(self):
+        self._listeners = []
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def _notify(self, key):
+        for callback in self._listeners:
+            callback(key)
+
+    def poll(self):
+        """Bekleyen geçersizleştirme mesajlarını işle (her okumadan önce çağrılır)"""
+
+    async def get(self, key):
+        return None
+
+    async def get_versioned(self, key):
+        """(veri veya None, sürüm veya None)"""
+        return None, None
+
+    async def set(self, key, data, ttl, expected=ANY):
+        """Yaz; `expected` verilirse sadece sürüm hâlâ o ise.
+
+        True: yazıldı, False: sürüm değişmiş, None: saklanmadı (yer yok / paylaşım yok)
+        """
+        return None
+
+    async def delete(self, key):
+        """Kaydı sil ve sürümünü yenile"""
+
+    async def publish(self, key):
+        pass
+
+    async def close(self):
+        pass
+
+
+# -------------------------------------------------
+# mmap: aynı makinedeki process'ler arası paylaşılan bellek
+# -------------------------------------------------
+class MmapBackend(CacheBackend):
+    """Dosyaya eşlenmiş sabit boyutlu hash tablosu
+
+    Dosya düzeni: başlık | geçersizleştirme halkası | slotlar
+    Her anahtar `PROBE` ardışık slottan birine yazılır; yer yoksa süresi en
+    erken dolacak kayıt ezilir. Yazmalar flock ile korunur. Geçersizleştirme
+    mesajları halkaya sıra numarasıyla yazılır; her worker okumadan önce
+    sıra numarasının değişip değişmediğine bakar.
+    """
+
+    name = "mmap"
+    MAGIC = b"CHC1"
+    HEADER = struct.Struct("<4sIIIQ")   # magic, slots, slot_size, ring_size, seq
+    HEADER_SIZE = 64
+    SEQ_OFFSET = 16
+    RING_ENTRY_SIZE = 128
+    RING_KEY = struct.Struct("<H")
+    CLEAR_ALL = 0xFFFF
+    SLOT_HEAD = struct.Struct("<QdIH")  # key_hash, expires_at, data_len, key_len
+    PROBE = 8
+
+    def __init__(self, path=CACHE_MMAP_PATH, slots=CACHE_MMAP_SLOTS, slot_size=CACHE_MMAP_SLOT_SIZE, ring_size=256):
+        super().__init__()
+        if fcntl is None:
+            raise RuntimeError("mmap önbelleği bu platformda desteklenmiyor (fcntl yok)")
+        self.path = path
+        self.slots = slots
+        self.slot_size = slot_size
+        self.ring_size = ring_size
+        self.ring_offset = self.HEADER_SIZE
+        self.slots_offset = self.ring_offset + ring_size * self.RING_ENTRY_SIZE
+        self.size = self.slots_offset + slots * slot_size
+        self._fd = None
+        self._mm = None
+        self._seen_seq = 0
+
+    @contextmanager
+    def _locked(self, exclusive):
+        fcntl.flock(self._fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield self._mm
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _open(self):
+        if self._mm is not None:
+            return self._mm
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size != self.size:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, self.size)
+            self._mm = mmap.mmap(self._fd, self.size)
+            magic, slots, slot_size, ring_size, seq = self.HEADER.unpack_from(self._mm, 0)
+            if (magic, slots, slot_size, ring_size) != (self.MAGIC, self.slots, self.slot_size, self.ring_size):
+                # Yeni dosya veya farklı düzen: sıfırdan başlat
+                self._mm[:] = bytes(self.size)
+                seq = 0
+                self.HEADER.pack_into(self._mm, 0, self.MAGIC, self.slots, self.slot_size, self.ring_size, seq)
+            self._seen_seq = seq
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        return self._mm
+
+    def _key_hash(self, key_bytes):
+        # 0 boş slot anlamına gelir
+        return int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), "little") | 1
+
+    def _window(self, key_hash):
+        home = key_hash % self.slots
+        for i in range(self.PROBE):
+            yield self.slots_offset + ((home + i) % self.slots) * self.slot_size
+
+    def _find(self, mm, key_bytes, key_hash):
+        for offset in self._window(key_hash):
+            slot_hash, expires_at, data_len, key_len = self.SLOT_HEAD.unpack_from(mm, offset)
+            start = offset + self.SLOT_HEAD.size
+            if slot_hash == key_hash and mm[start:start + key_len] == key_bytes:
+                return offset, expires_at, data_len, key_len
+        return None
+
+    def _read(self, mm, key_bytes, now):
+        found = self._find(mm, key_bytes, self._key_hash(key_bytes))
+        if found is None:
+            return None
+        offset, expires_at, data_len, key_len = found
+        if expires_at <= now:
+            return None
+        start = offset + self.SLOT_HEAD.size + key_len
+        return bytes(mm[start:start + data_len])
+
+    def _write(self, mm, key_bytes, data, expires_at, now):
+        key_hash = self._key_hash(key_bytes)
+        found = self._find(mm, key_bytes, key_hash)
+        if found is not None:
+            target = found[0]
+        else:
+            # Boş / süresi dolmuş slot, yoksa süresi en erken dolacak olan
+            target, earliest = None, None
+            for offset in self._window(key_hash):
+                slot_hash, slot_expires, _, _ = self.SLOT_HEAD.unpack_from(mm, offset)
+                if slot_hash == 0 or slot_expires <= now:
+                    target = offset
+                    break
+                if earliest is None or slot_expires < earliest:
+                    target, earliest = offset, slot_expires
+
+        start = target + self.SLOT_HEAD.size
+        mm[start:start + len(key_bytes) + len(data)] = key_bytes + data
+        self.SLOT_HEAD.pack_into(mm, target, key_hash, expires_at, len(data), len(key_bytes))
+
+    async def get(self, key):
+        mm = self._open()
+        with self._locked(exclusive=False):
+            return self._read(mm, key.encode("utf-8"), time.time())
+
+    async def get_versioned(self, key):
+        mm = self._open()
+        now = time.time()
+        with self._locked(exclusive=False):
+            data = self._read(mm, key.encode("utf-8"), now)
+            version = self._read(mm, (VERSION_PREFIX + key).encode("utf-8"), now)
+        return data, version
+
+    async def set(self, key, data, ttl, expected=ANY):
+        mm = self._open()
+        key_bytes = key.encode("utf-8")
+        if self.SLOT_HEAD.size + len(key_bytes) + len(data) > self.slot_size:
+            return None
+
+        now = time.time()
+        with self._locked(exclusive=True):
+            if expected is not ANY and self._read(mm, (VERSION_PREFIX + key).encode("utf-8"), now) != expected:
+                return False
+            self._write(mm, key_bytes, data, now + ttl, now)
+        return True
+
+    async def delete(self, key):
+        mm = self._open()
+        key_bytes = key.encode("utf-8")
+        now = time.time()
+        with self._locked(exclusive=True):
+            found = self._find(mm, key_bytes, self._key_hash(key_bytes))
+            if found is not None:
+                self.SLOT_HEAD.pack_into(mm, found[0], 0, 0.0, 0, 0)
+            self._write(mm, (VERSION_PREFIX + key).encode("utf-8"), new_version(), now + VERSION_TTL, now)
+
+    async def publish(self, key):
+        mm = self._open()
+        key_bytes = key.encode("utf-8")
+        with self._locked(exclusive=True):
+            seq = struct.unpack_from("<Q", mm, self.SEQ_OFFSET)[0]
+            offset = self.ring_offset + (seq % self.ring_size) * self.RING_ENTRY_SIZE
+            if len(key_bytes) > self.RING_ENTRY_SIZE - self.RING_KEY.size:
+                self.RING_KEY.pack_into(mm, offset, self.CLEAR_ALL)
+            else:
+                self.RING_KEY.pack_into(mm, offset, len(key_bytes))
+                start = offset + self.RING_KEY.size
+                mm[start:start + len(key_bytes)] = key_bytes
+            struct.pack_into("<Q", mm, self.SEQ_OFFSET, seq + 1)
+
+    def poll(self):
+        mm = self._open()
+        if struct.unpack_from("<Q", mm, self.SEQ_OFFSET)[0] == self._seen_seq:
+            return
+
+        keys = []
+        with self._locked(exclusive=False):
+            seq = struct.unpack_from("<Q", mm, self.SEQ_OFFSET)[0]
+            if seq - self._seen_seq > self.ring_size:
+                keys = [None]  # Halka taştı, kaçırılan mesajlar var
+            else:
+                for n in range(self._seen_seq, seq):
+                    offset = self.ring_offset + (n % self.ring_size) * self.RING_ENTRY_SIZE
+                    key_len = self.RING_KEY.unpack_from(mm, offset)[0]
+                    if key_len == self.CLEAR_ALL:
+                        keys = [None]
+                        break
+                    start = offset + self.RING_KEY.size
+                    keys.append(mm[start:start + key_len].decode("utf-8"))
+            self._seen_seq = seq
+
+        for key in keys:
+            self._notify(key)
+
+    async def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            os.close(self._fd)
+            self._mm = None
+            self._fd = None
+
+
+# -------------------------------------------------
+# Redis protokolü (RESP)
+# -------------------------------------------------
+class RedisError(CacheUnavailable):
+    """Sunucu hata yanıtı döndürdü"""
+
+
+def encode_command(*args):
+    out = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode("utf-8")
+        out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(out)
+
+
+async def read_reply(reader):
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Bağlantı kapandı")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode("utf-8")
+    if kind == b"-":
+        raise RedisError(payload.decode("utf-8", "replace"))
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(payload)
+        if count < 0:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise ConnectionError(f"Beklenmeyen yanıt: {line[:20]!r}")
+
+
+class RedisBackend(CacheBackend):
+    """Redis protokolü konuşan sunucu üzerinden paylaşılan önbellek
+
+    Komutlar tek bir bağlantı üzerinden sırayla gönderilir. Geçersizleştirme
+    mesajları için ayrı bir SUBSCRIBE bağlantısı arka planda dinlenir; bağlantı
+    koparsa yeniden bağlanılır ve kaçırılmış olabilecek mesajlar yüzünden
+    tüm L1 kayıtları atılır.
+    """
+
+    name = "redis"
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, url=CACHE_URL, channel=CACHE_CHANNEL, timeout=1.0):
+        super().__init__()
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.strip("/") or 0)
+        self.channel = channel
+        self.timeout = timeout
+        self.listening = False
+        self._conn = None
+        self._lock = None
+        self._subscriber = None
+
+    async def _connect(self):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+        try:
+            if self.password:
+                writer.write(encode_command("AUTH", self.password))
+                await read_reply(reader)
+            if self.db:
+                writer.write(encode_command("SELECT", self.db))
+                await read_reply(reader)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def _command(self, *args):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            try:
+                if self._conn is None:
+                    self._conn = await self._connect()
+                reader, writer = self._conn
+                writer.write(encode_command(*args))
+                await writer.drain()
+                return await asyncio.wait_for(read_reply(reader), self.timeout)
+            except RedisError:
+                raise
+            except (OSError, EOFError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                self._drop_connection()
+                raise CacheUnavailable(f"Redis bağlantı hatası: {e!r}") from None
+
+    def _drop_connection(self):
+        if self._conn is not None:
+            self._conn[1].close()
+            self._conn = None
+
+    def poll(self):
+        # Dinleyici ilk kullanımda, çalışan event loop içinde başlatılır
+        if self._subscriber is None:
+            self._subscriber = asyncio.ensure_future(self._subscribe_loop())
+
+    async def _subscribe_loop(self):
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._connect()
+                writer.write(encode_command("SUBSCRIBE", self.channel))
+                await writer.drain()
+                await read_reply(reader)  # abonelik onayı
+                # Abone olmadan önce yayınlanan mesajlar kaçırılmış olabilir
+                self._notify(None)
+                self.listening = True
+                while True:
+                    message = await read_reply(reader)
+                    if isinstance(message, list) and len(message) == 3 and message[0] == b"message":
+                        self._notify(message[2].decode("utf-8"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.listening:
+                    print(f"⚠️ Önbellek dinleyicisi koptu: {e!r}")
+                self.listening = False
+                await asyncio.sleep(self.RECONNECT_DELAY)
+            finally:
+                self.listening = False
+                if writer is not None:
+                    writer.close()
+
+    async def get(self, key):
+        return await self._command("GET", key)
+
+    async def get_versioned(self, key):
+        data, version = await self._command("MGET", key, VERSION_PREFIX + key)
+        return data, version
+
+    async def set(self, key, data, ttl, expected=ANY):
+        # Sürüm kontrolü ile yazma arası atomik değil; pencere bir gidiş-dönüş kadar
+        if expected is not ANY and await self._command("GET", VERSION_PREFIX + key) != expected:
+            return False
+        await self._command("SET", key, data, "PX", int(ttl * 1000))
+        return True
+
+    async def delete(self, key):
+        await self._command("DEL", key)
+        await self._command("SET", VERSION_PREFIX + key, new_version(), "PX", VERSION_TTL * 1000)
+
+    async def publish(self, key):
+        await self._command("PUBLISH", self.channel, key)
+
+    async def close(self):
+        if self._subscriber is not None:
+            self._subscriber.cancel()
+            try:
+                await self._subscriber
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._subscriber = None
+        self._drop_connection()
+
+
+def create_backend(kind=CACHE_BACKEND):
+    if kind == "mmap":
+        return MmapBackend()
+    if kind == "redis":
+        return RedisBackend()
+    if kind == "local":
+        return CacheBackend()
+    raise ValueError(f"Bilinmeyen önbellek backend'i: {kind}")
+
+
+# -------------------------------------------------
+# İki katmanlı önbellek
+# -------------------------------------------------
+class SharedCache:
+    """Worker içi L1 + paylaşılan L2 önbellek
+
+    Anahtarlar backend'de "<namespace>:<key>" olarak tutulur. Değerler
+    backend'e `encode` ile byte olarak yazılır, okunurken `decode` ile çözülür
+    (varsayılan JSON). Değerler yerinde değiştirilmemelidir.
+
+    Iskalamada DB'den okuyup yazan kod damgayı kullanmalıdır:
+        value, stamp = await cache.lookup(key)
+        if value is None:
+            value = await load()
+            await cache.set(key, value, stamp=stamp)
+    """
+
+    def __init__(self, namespace, backend, ttl=PROFILE_CACHE_TTL, local=None, encode=encode_json, decode=json.loads):
+        self.namespace = namespace
+        self.prefix = f"{namespace}:"
+        self.backend = backend
+        self.ttl = ttl
+        self.encode = encode
+        self.decode = decode
+        self.local = local if local is not None else BoundedCache(ttl=ttl)
+        self.shared_hits = 0
+        self.shared_misses = 0
+        self.errors = 0
+        self.invalidations_received = 0
+        self.stale_writes = 0
+        # Bu worker'da görülen her geçersizleştirmede artar (L1 için damga)
+        self._generation = 0
+        backend.add_listener(self._on_invalidate)
+
+    def _on_invalidate(self, key):
+        if key is None:
+            self._generation += 1
+            self.local.clear()
+        elif key.startswith(self.prefix):
+            self._generation += 1
+            self.local.invalidate(key)
+            self.invalidations_received += 1
+
+    async def get(self, key, default=None):
+        value, _ = await self.lookup(key)
+        return default if value is None else value
+
+    async def lookup(self, key):
+        """(değer veya None, damga). Damga ıskalamada DB'den okunan değeri yazarken set'e verilir."""
+        full_key = self.prefix + str(key)
+        self.backend.poll()
+        if self.backend.listening:
+            value = self.local.get(full_key)
+            if value is not None:
+                return value, None
+
+        generation = self._generation
+        try:
+            data, version = await self.backend.get_versioned(full_key)
+        except CacheUnavailable as e:
+            self.errors += 1
+            print(f"⚠️ Paylaşılan önbellek okunamadı: {e}")
+            data, version = None, ANY
+        stamp = (generation, version)
+        if data is None:
+            self.shared_misses += 1
+            return None, stamp
+
+        self.shared_hits += 1
+        value = self.decode(data)
+        self.backend.poll()
+        if self.backend.listening and generation == self._generation:
+            self.local.set(full_key, value, size=len(data))
+        return value, stamp
+
+    async def set(self, key, value, stamp=None):
+        """Yaz. `stamp` (lookup'tan) verilirse ve kayıt o zamandan beri geçersizleştirildiyse yazılmaz."""
+        full_key = self.prefix + str(key)
+        data = self.encode(value)
+        self.backend.poll()
+        generation, expected = stamp if stamp is not None else (self._generation, ANY)
+        if generation != self._generation:
+            self.stale_writes += 1
+            return False
+        try:
+            stored = await self.backend.set(full_key, data, self.ttl, expected=expected)
+        except CacheUnavailable as e:
+            self.errors += 1
+            print(f"⚠️ Paylaşılan önbelleğe yazılamadı: {e}")
+            stored = None
+        if stored is False:
+            self.stale_writes += 1
+            return False
+        self.backend.poll()
+        if self.backend.listening and generation == self._generation:
+            self.local.set(full_key, value, size=len(data))
+        return True
+
+    async def invalidate(self, key):
+        """Kaydı bu worker'dan ve paylaşılan katmandan sil, diğer worker'lara duyur"""
+        full_key = self.prefix + str(key)
+        self._generation += 1
+        existed = self.local.invalidate(full_key)
+        try:
+            await self.backend.delete(full_key)
+            await self.backend.publish(full_key)
+        except CacheUnavailable as e:
+            self.errors += 1
+            print(f"⚠️ Önbellek geçersizleştirme yayınlanamadı: {e}")
+        return existed
+
+    def stats(self):
+        return {
+            "backend": self.backend.name,
+            "listening": self.backend.listening,
+            "local": self.local.stats(),
+            "shared_hits": self.shared_hits,
+            "shared_misses": self.shared_misses,
+            "errors": self.errors,
+            "invalidations_received": self.invalidations_received,
+            "stale_writes": self.stale_writes,
+        }
@@ -0,0 +1,88 @@
+import asyncio
+
+import jwt
+import pytest
+
+import app as app_module
+from app import SECRET_KEY
+from cache import BoundedCache
+from shared_cache import CacheBackend, SharedCache
+
+
+@pytest.fixture
+def admin_cache(monkeypatch):
+    cache = SharedCache("admin", CacheBackend(), ttl=30, local=BoundedCache(ttl=30))
+    monkeypatch.setattr(app_module, "ADMIN_AUTH_CACHE", cache)
+    return cache
+
+
+@pytest.fixture
+def db_lookups(monkeypatch, admin_cache):
+    """Veritabanı yerine sayaçlı yükleyici: {user_id: admin mi}"""
+    admins = {}
+    calls = []
+
+    async def load(user_id, stamp=None):
+        calls.append(user_id)
+        await asyncio.sleep(0)
+        allowed = admins.get(user_id, False)
+        await admin_cache.set(user_id, allowed, stamp=stamp)
+        return allowed
+
+    monkeypatch.setattr(app_module, "_load_admin_status", load)
+    return admins, calls
+
+
+def auth_headers(user_id, is_admin):
+    token = jwt.encode({"user_id": user_id, "is_admin": is_admin}, SECRET_KEY, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_token_admin_degilse_sorgusuz_reddedilir(test_client, db_lookups):
+    _, calls = db_lookups
+    _, response = await test_client.get("/api/admin/cache", headers=auth_headers(7, False))
+    assert response.status == 403
+    assert calls == []
+
+
+async def test_admin_yetkisi_onbellekten_okunur(test_client, db_lookups):
+    admins, calls = db_lookups
+    admins[1] = True
+
+    for _ in range(3):
+        _, response = await test_client.get("/api/admin/cache", headers=auth_headers(1, True))
+        assert response.status == 200
+    assert calls == [1]
+
+
+async def test_es_zamanli_istekler_tek_sorgu_bekler(db_lookups):
+    admins, calls = db_lookups
+    admins[1] = True
+
+    results = await asyncio.gather(*(app_module.is_active_admin(1) for _ in range(5)))
+    assert results == [True] * 5
+    assert calls == [1]
+
+
+async def test_yetki_geri_alininca_token_gecersiz_olur(test_client, db_lookups, admin_cache):
+    admins, calls = db_lookups
+    admins[1] = True
+    _, response = await test_client.get("/api/admin/cache", headers=auth_headers(1, True))
+    assert response.status == 200
+
+    # Ban / silme: önbellek kaydı silinir, bir sonraki istek DB'den okunur
+    admins[1] = False
+    await admin_cache.invalidate(1)
+    _, response = await test_client.get("/api/admin/cache", headers=auth_headers(1, True))
+    assert response.status == 403
+    assert calls == [1, 1]
+
+
+async def test_yetki_kontrolu_hatasi_istemciye_sizdirilmaz(test_client, admin_cache, monkeypatch):
+    async def load(user_id, stamp=None):
+        raise RuntimeError("db-host:3306 bağlantı reddedildi")
+
+    monkeypatch.setattr(app_module, "_load_admin_status", load)
+    _, response = await test_client.get("/api/admin/cache", headers=auth_headers(1, True))
+    assert response.status == 500
+    assert "db-host" not in response.json["mesaj"]
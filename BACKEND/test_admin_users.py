@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+
+from app import ADMIN_USER_FIELDS, ADMIN_USER_INTERNAL_COLUMNS, build_admin_user_query
+from models import User, UserProfile
+from pagination import decode_cursor, encode_cursor
+from projection import Projection
+
+T0 = datetime(2025, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+
+async def add_user(user_id, minutes, name, is_admin=False, is_banned=False, ban_until=None):
+    await User.create(
+        user_id=user_id, email=f"u{user_id}@ankara.edu.tr", password="-", is_admin=is_admin,
+        is_banned=is_banned, ban_until=ban_until,
+    )
+    # auto_now_add'i ez: sıralama için farklı kayıt zamanları
+    await User.filter(user_id=user_id).update(created_at=T0 + timedelta(minutes=minutes))
+    await UserProfile.create(user_id=user_id, full_name=name)
+
+
+async def fetch(query):
+    selected = ADMIN_USER_FIELDS.parse({"fields": "email"})
+    return await query.values(**Projection.columns(selected, ADMIN_USER_INTERNAL_COLUMNS))
+
+
+async def test_once_adminler_sonra_en_yeniler_imlecle_sayfalanir(db):
+    await add_user(1, 0, "Ayşe Yılmaz", is_admin=True)
+    await add_user(2, 10, "Mehmet Demir")
+    await add_user(3, 20, "Ali Kaya")
+    await add_user(4, 5, "Zeynep Ak", is_admin=True)
+    await add_user(5, 20, "Can Er")  # 3 ile aynı kayıt zamanı
+
+    expected = [4, 1, 5, 3, 2]
+    assert [r["user_id"] for r in await fetch(build_admin_user_query())] == expected
+
+    seen, after = [], None
+    while True:
+        rows = await fetch(build_admin_user_query(after=after).limit(3))
+        page = rows[:2]
+        seen.extend(r["user_id"] for r in page)
+        if len(rows) <= 2:
+            break
+        last = page[-1]
+        cursor = encode_cursor(int(last["is_admin"]), last["created_at"], last["user_id"])
+        after = decode_cursor(cursor, (int, datetime, int))
+    assert seen == expected
+
+
+async def test_filtreler(db):
+    now = datetime.now(timezone.utc)
+    await add_user(1, 0, "Ayşe Yılmaz", is_admin=True)
+    await add_user(2, 1, "Mehmet Demir", is_banned=True)  # Kalıcı ban
+    await add_user(3, 2, "Ali Kaya", is_banned=True, ban_until=now + timedelta(days=1))
+    await add_user(4, 3, "Veli Kaya", is_banned=True, ban_until=now - timedelta(hours=1))  # Süresi dolmuş
+
+    ids = lambda rows: sorted(r["user_id"] for r in rows)
+    assert ids(await fetch(build_admin_user_query(search="kaya"))) == [3, 4]
+    assert ids(await fetch(build_admin_user_query(search="u2@"))) == [2]
+    assert ids(await fetch(build_admin_user_query(banned_only=True, now=now))) == [2, 3]
+    assert ids(await fetch(build_admin_user_query(admins_only=True))) == [1]
+    assert ids(await fetch(build_admin_user_query(search="kaya", banned_only=True, now=now))) == [3]
@@ -0,0 +1,62 @@
+from cache import BoundedCache, estimate_size
+
+
+def test_lru_bayt_butcesi_asilinca_en_eski_atilir():
+    cache = BoundedCache(max_bytes=300, max_entries=100, ttl=60)
+    cache.set(1, b"a" * 100)
+    cache.set(2, b"b" * 100)
+    cache.set(3, b"c" * 100)
+
+    assert cache.get(1) is not None  # 1 en son kullanılan oldu
+    cache.set(4, b"d" * 100)
+
+    assert 2 not in cache
+    assert 1 in cache and 3 in cache and 4 in cache
+    assert cache.bytes == 300
+    assert cache.stats()["evictions"] == 1
+
+
+def test_kayit_sayisi_siniri():
+    cache = BoundedCache(max_bytes=10_000, max_entries=2, ttl=60)
+    for key in range(5):
+        cache.set(key, {"id": key})
+    assert len(cache) == 2
+    assert 3 in cache and 4 in cache
+
+
+def test_ttl_dolunca_kayit_yok_sayilir(clock):
+    cache = BoundedCache(max_bytes=10_000, ttl=30, clock=clock)
+    cache.set("u1", {"ad": "Ayşe"})
+
+    clock.now = 29
+    assert cache.get("u1") == {"ad": "Ayşe"}
+    clock.now = 31
+    assert cache.get("u1") is None
+
+    stats = cache.stats()
+    assert stats["expirations"] == 1
+    assert stats["entries"] == 0 and stats["bytes"] == 0
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_butceden_buyuk_deger_onbellege_alinmaz():
+    cache = BoundedCache(max_bytes=50, ttl=60)
+    cache.set("kucuk", b"x" * 10)
+    assert cache.set("buyuk", b"x" * 51) is False
+    assert "kucuk" in cache
+    assert cache.stats()["rejected"] == 1
+
+
+def test_ayni_anahtar_tekrar_yazilinca_boyut_guncellenir():
+    cache = BoundedCache(max_bytes=1000, ttl=60)
+    cache.set("k", b"x" * 100)
+    cache.set("k", b"x" * 40)
+    assert cache.bytes == 40
+    assert cache.invalidate("k") is True
+    assert cache.invalidate("k") is False
+    assert cache.bytes == 0
+
+
+def test_boyut_tahmini_utf8():
+    assert estimate_size("ğ") == 2
+    assert estimate_size({"a": 1}) == len('{"a": 1}')
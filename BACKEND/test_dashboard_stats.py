@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta, timezone
+
+from dashboard_stats import DashboardStats, load_dashboard_counts
+from shared_cache import MmapBackend
+
+
+async def test_sayaclar_tek_sorguda_hesaplanir(db):
+    now = datetime.now(timezone.utc)
+    naive = now.replace(tzinfo=None)
+    # Ham SQL: modelin önbelleğe aldığı INSERT sorgusu başka testin (MySQL) ayarından kalmış olabilir
+    for user_id, created in [(1, naive - timedelta(days=30)), (2, naive - timedelta(days=1)), (3, naive)]:
+        await db.execute_query(
+            "INSERT INTO users (user_id, email, password, role, is_active, is_admin, is_banned, created_at)"
+            " VALUES (?, ?, '-', 'user', 1, 0, 0, ?)",
+            [user_id, f"{user_id}@x.com", created],
+        )
+    for event_id, is_active in [(1, True), (2, False), (3, True)]:
+        await db.execute_query(
+            "INSERT INTO events (event_id, title, is_active, created_at) VALUES (?, 'E', ?, ?)",
+            [event_id, is_active, naive],
+        )
+    for status in ("pending", "resolved", "pending"):
+        await db.execute_query(
+            "INSERT INTO feedbacks (user_id, message, status, created_at) VALUES (1, 'm', ?, ?)",
+            [status, naive],
+        )
+
+    assert await load_dashboard_counts(db, now) == {
+        "total_users": 3, "new_users_week": 2, "total_events": 3, "active_events": 2,
+        "total_feedbacks": 3, "pending_feedbacks": 2,
+    }
+
+
+async def test_okumalar_bellekten_degisiklikler_farkla_uygulanir(tmp_path, clock):
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return {"total_users": 10, "new_users_week": 1, "total_events": 4, "active_events": 3,
+                "total_feedbacks": 2, "pending_feedbacks": 2}
+
+    path = str(tmp_path / "cache.bin")
+    worker_a = DashboardStats(load, MmapBackend(path, slots=16, slot_size=256), ttl=60, clock=clock)
+    worker_b = DashboardStats(load, MmapBackend(path, slots=16, slot_size=256), ttl=60, clock=clock)
+    await worker_a.get()
+    await worker_b.get()
+    assert len(loads) == 2
+
+    await worker_a.adjust(total_events=1, active_events=1)
+    await worker_a.adjust(pending_feedbacks=-1)
+    for worker in (worker_a, worker_b):
+        counts = await worker.get()
+        assert (counts["total_events"], counts["active_events"], counts["pending_feedbacks"]) == (5, 4, 1)
+    assert len(loads) == 2  # Farklar için sorgu yok
+
+    # Toplu silme: her iki worker da yeniden yükler
+    await worker_a.invalidate()
+    assert (await worker_a.get())["total_events"] == 4
+    assert (await worker_b.get())["total_events"] == 4
+    assert len(loads) == 4
+
+    # Süre dolunca yeniden hesaplanır
+    clock.now = 61
+    await worker_a.get()
+    assert len(loads) == 5
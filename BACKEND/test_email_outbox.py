@@ -0,0 +1,154 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from email_outbox import EmailOutbox, RateLimiter, SmtpConnection, retry_delay, utcnow
+from models import OutboxEmail
+
+
+class MiniSMTP:
+    """Testler için yerel SMTP sunucusu. `replies`: RCPT TO adresi -> (kod, mesaj)"""
+
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+        self.replies = {}
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+
+        def send(line):
+            writer.write(line.encode() + b"\r\n")
+
+        send("220 mini ESMTP")
+        rcpt = None
+        while True:
+            line = (await reader.readline()).decode().strip()
+            if not line:
+                break
+            command = line.split(" ", 1)[0].upper()
+            if command in ("EHLO", "HELO"):
+                send("250 mini")
+            elif command == "MAIL":
+                send("250 OK")
+            elif command == "RCPT":
+                rcpt = line.split(":", 1)[1].strip("<> ")
+                code, text = self.replies.get(rcpt, (250, "OK"))
+                send(f"{code} {text}")
+            elif command == "DATA":
+                send("354 devam")
+                lines = []
+                while (data := (await reader.readline()).decode()) not in (".\r\n", ""):
+                    lines.append(data)
+                self.messages.append((rcpt, "".join(lines)))
+                send("250 kuyrukta")
+            elif command in ("RSET", "NOOP"):
+                send("250 OK")
+            elif command == "QUIT":
+                send("221 bye")
+                break
+            else:
+                send("502 desteklenmiyor")
+            await writer.drain()
+        await writer.drain()
+        writer.close()
+
+
+@pytest.fixture
+async def smtp():
+    server = MiniSMTP()
+    port = await server.start()
+    server.port = port
+    yield server
+    await server.stop()
+
+
+def make_outbox(smtp, **kwargs):
+    connection = SmtpConnection("127.0.0.1", smtp.port, security="none", timeout=5)
+    return EmailOutbox(connection, sender="noreply@campushub.test", rate_per_minute=6000, **kwargs)
+
+
+async def test_kuyruktaki_epostalar_tek_baglantiyla_gonderilir(db, smtp):
+    outbox = make_outbox(smtp)
+    for i in range(3):
+        await outbox.enqueue(f"ogrenci{i}@ankara.edu.tr", "Şifre Sıfırlama", f"Bağlantı {i}")
+
+    assert await outbox.process_due() == 3
+    assert [rcpt for rcpt, _ in smtp.messages] == [f"ogrenci{i}@ankara.edu.tr" for i in range(3)]
+    assert smtp.connections == 1
+    assert await OutboxEmail.filter(status="sent").count() == 3
+    await outbox.stop()
+
+
+async def test_gecici_hata_bekleyip_tekrar_denenir_kalici_hata_durur(db, smtp):
+    smtp.replies["dolu@ankara.edu.tr"] = (452, "kota doldu")
+    smtp.replies["yok@ankara.edu.tr"] = (550, "boyle biri yok")
+    outbox = make_outbox(smtp)
+    await outbox.enqueue("dolu@ankara.edu.tr", "Konu", "Gövde")
+    await outbox.enqueue("yok@ankara.edu.tr", "Konu", "Gövde")
+    await outbox.enqueue("tamam@ankara.edu.tr", "Konu", "Gövde")
+
+    await outbox.process_due()
+    emails = {e.to_address: e for e in await OutboxEmail.all()}
+    assert emails["dolu@ankara.edu.tr"].status == "pending"
+    assert emails["dolu@ankara.edu.tr"].attempts == 1
+    assert emails["dolu@ankara.edu.tr"].next_attempt_at > utcnow() + timedelta(seconds=20)
+    assert emails["yok@ankara.edu.tr"].status == "failed"
+    assert emails["tamam@ankara.edu.tr"].status == "sent"
+    # Hatalardan sonra oturum temizlendi, bağlantı yeniden kullanıldı
+    assert smtp.connections == 1
+
+    # Zamanı gelince tekrar denenir
+    del smtp.replies["dolu@ankara.edu.tr"]
+    await OutboxEmail.filter(to_address="dolu@ankara.edu.tr").update(next_attempt_at=utcnow())
+    assert await outbox.process_due() == 1
+    assert (await OutboxEmail.get(to_address="dolu@ankara.edu.tr")).status == "sent"
+    await outbox.stop()
+
+
+async def test_baska_workerin_aldigi_eposta_tekrar_gonderilmez(db, smtp):
+    worker_a = make_outbox(smtp)
+    worker_b = make_outbox(smtp)
+    await worker_a.enqueue("a@ankara.edu.tr", "Konu", "Gövde")
+
+    results = await asyncio.gather(worker_a.process_due(), worker_b.process_due())
+    assert sorted(results) == [0, 1]
+    assert len(smtp.messages) == 1
+    await worker_a.stop()
+    await worker_b.stop()
+
+
+async def test_arka_plan_gonderici_kuyruga_yazilinca_uyanir(db, smtp):
+    outbox = make_outbox(smtp, poll_interval=60)
+    outbox.start()
+    await outbox.enqueue("a@ankara.edu.tr", "Konu", "Gövde")
+    for _ in range(100):
+        if smtp.messages:
+            break
+        await asyncio.sleep(0.02)
+    await outbox.stop()
+    assert len(smtp.messages) == 1
+
+
+def test_hiz_siniri_ve_bekleme_suresi():
+    now = [0.0]
+    limiter = RateLimiter(per_minute=60, burst=2, clock=lambda: now[0])
+    for _ in range(2):
+        assert limiter.delay() == 0
+        limiter.take()
+    assert limiter.delay() == pytest.approx(1.0)
+    now[0] = 1.0
+    assert limiter.delay() == 0
+
+    assert [retry_delay(n) for n in (1, 2, 3)] == [30, 60, 120]
+    assert retry_delay(20) == 3600
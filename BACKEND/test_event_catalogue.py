@@ -0,0 +1,145 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from event_catalogue import CatalogueEntry, CatalogueSnapshot, EventCatalogue, sort_key
+from shared_cache import MmapBackend
+
+NOW = datetime(2025, 5, 15, 12, 0)
+UNIVERSITIES = ["ODTÜ", "Hacettepe", "Bilkent", None]
+
+
+def random_events(count, seed=1):
+    rng = random.Random(seed)
+    base = datetime(2025, 5, 1)
+    events = []
+    for event_id in range(1, count + 1):
+        start = None if rng.random() < 0.1 else base + timedelta(hours=rng.randrange(0, 24 * 60))
+        # Aynı başlangıç saatine sahip etkinlikler de olsun
+        if start and rng.random() < 0.2:
+            start = start.replace(hour=10, minute=0)
+        end = None if start is None or rng.random() < 0.1 else start + timedelta(hours=rng.randrange(1, 5))
+        university = rng.choice(UNIVERSITIES)
+        events.append(CatalogueEntry(event_id, start, end, university, {"id": event_id, "university": university}))
+    return events
+
+
+def reference_query(events, university=None, start_range=(None, None), current_only=False, after=None, limit=None):
+    """SQL sorgusunun anlamı: WHERE ... ORDER BY start DESC, id DESC LIMIT n"""
+    range_start, range_end = start_range
+    result = []
+    for e in events:
+        if university and (e.university or "").casefold() != university.casefold():
+            continue
+        if range_start and (e.start is None or e.start < range_start):
+            continue
+        if range_end and (e.start is None or e.start >= range_end):
+            continue
+        if current_only and (e.end is None or e.end < NOW):
+            continue
+        if after and not sort_key(e.start, e.event_id) > sort_key(*after):
+            continue
+        result.append(e)
+    result.sort(key=lambda e: sort_key(e.start, e.event_id))
+    return result[:limit] if limit is not None else result
+
+
+def test_snapshot_sorgusu_sql_ile_ayni_sonucu_verir():
+    events = random_events(400)
+    snapshot = CatalogueSnapshot(events, version=0, built_at=0)
+    rng = random.Random(7)
+    for _ in range(300):
+        filters = {
+            "university": rng.choice(UNIVERSITIES + ["odtü", "Yok"]),
+            "current_only": rng.random() < 0.3,
+            "limit": rng.choice([None, 1, 5, 20]),
+        }
+        if rng.random() < 0.6:
+            day = datetime(2025, 5, 1) + timedelta(days=rng.randrange(0, 60))
+            filters["start_range"] = (
+                day if rng.random() < 0.8 else None,
+                day + timedelta(days=rng.choice([1, 7, 30])) if rng.random() < 0.8 else None,
+            )
+        if rng.random() < 0.4:
+            pivot = rng.choice(events)
+            filters["after"] = (pivot.start, pivot.event_id)
+
+        got = snapshot.query(**filters, now=NOW)
+        expected = reference_query(events, **filters)
+        assert [e.event_id for e in got] == [e.event_id for e in expected], filters
+
+
+def test_imlecle_tum_sayfalar_gezilir():
+    events = random_events(57, seed=3)
+    snapshot = CatalogueSnapshot(events, version=0, built_at=0)
+    seen, after = [], None
+    while True:
+        page = snapshot.query(after=after, limit=10)
+        seen.extend(e.event_id for e in page)
+        if len(page) < 10:
+            break
+        after = (page[-1].start, page[-1].event_id)
+    assert sorted(seen) == list(range(1, 58))
+    assert len(seen) == len(set(seen))
+
+
+async def test_surum_artinca_tek_yeniden_olusturma():
+    calls = 0
+    data = random_events(5)
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return list(data)
+
+    catalogue = EventCatalogue(loader)
+    first = await catalogue.snapshot()
+    assert calls == 1 and len(first) == 5
+    assert await catalogue.snapshot() is first
+
+    data.append(CatalogueEntry(99, NOW, None, "ODTÜ", {"id": 99}))
+    await catalogue.invalidate()
+    # Aynı anda gelen okumalar aynı yeniden oluşturmayı bekler
+    results = await asyncio.gather(*(catalogue.snapshot() for _ in range(10)))
+    assert calls == 2
+    assert all(r is results[0] and len(r) == 6 for r in results)
+
+
+async def test_diger_workerin_katalogu_duyuruyla_yenilenir(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    rows = random_events(3)
+
+    async def loader():
+        return list(rows)
+
+    worker_a = EventCatalogue(loader, MmapBackend(path, slots=16, slot_size=256))
+    worker_b = EventCatalogue(loader, MmapBackend(path, slots=16, slot_size=256))
+    assert len(await worker_b.snapshot()) == 3
+
+    rows.pop()
+    await worker_a.invalidate()
+    assert len(await worker_b.snapshot()) == 2
+
+    await worker_a.backend.close()
+    await worker_b.backend.close()
+
+
+async def test_eski_goruntu_arka_planda_yenilenir():
+    now = [0.0]
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        return []
+
+    catalogue = EventCatalogue(loader, max_age=60, clock=lambda: now[0])
+    first = await catalogue.snapshot()
+    now[0] = 61
+    assert await catalogue.snapshot() is first  # beklemeden eski görüntü döner
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert calls == 2
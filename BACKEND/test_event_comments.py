@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+
+from app import build_comment_page_query
+from models import Comment, Event, User, UserProfile
+
+T0 = datetime(2025, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+
+async def run(conn, query, params):
+    return await conn.execute_query_dict(query.replace("%s", "?"), params)
+
+
+async def add_comment(comment_id, event_id, user_id, minutes):
+    await Comment.create(comment_id=comment_id, event_id=event_id, user_id=user_id, message=f"yorum {comment_id}")
+    # auto_now_add'i ez: sıralama için farklı zamanlar
+    await Comment.filter(comment_id=comment_id).update(created_at=T0 + timedelta(minutes=minutes))
+
+
+async def test_yorumlar_imlecle_sayfalanir_ve_base64_foto_tasinmaz(db):
+    await User.create(user_id=1, email="a@ankara.edu.tr", password="-")
+    await User.create(user_id=2, email="b@ankara.edu.tr", password="-")
+    await UserProfile.create(user_id=1, full_name="Ayşe Yılmaz", profile_photo="data:image/png;base64," + "A" * 5000)
+    await UserProfile.create(user_id=2, full_name="Ali Kaya", profile_photo="media:" + "a" * 64)
+    await Event.create(event_id=1, title="Bahar Şenliği")
+    await Event.create(event_id=2, title="Kariyer Günü")
+    await add_comment(1, 1, 1, 0)
+    await add_comment(2, 1, 2, 10)
+    await add_comment(3, 1, 1, 10)  # 2 ile aynı zaman: comment_id ile ayrılır
+    await add_comment(4, 1, 2, 5)
+    await add_comment(5, 2, 1, 30)  # Başka etkinlik
+
+    seen, after = [], None
+    while True:
+        rows = await run(db, *build_comment_page_query(1, after=after, limit=2))
+        page = rows[:2]
+        seen.extend(page)
+        if len(rows) <= 2:
+            break
+        after = (page[-1]["created_at"], page[-1]["comment_id"])
+    assert [r["comment_id"] for r in seen] == [3, 2, 4, 1]
+
+    photos = {r["user_id"]: r["photo"] for r in seen}
+    assert photos == {1: None, 2: "media:" + "a" * 64}
+    assert {r["full_name"] for r in seen} == {"Ayşe Yılmaz", "Ali Kaya"}
+
+
+async def test_yorum_sayfasi_index_ile_siralanir(db):
+    query, params = build_comment_page_query(1, after=(T0.replace(tzinfo=None), 10))
+    rows = await db.execute_query_dict("EXPLAIN QUERY PLAN " + query.replace("%s", "?"), params)
+    plan = " | ".join(row["detail"] for row in rows)
+    # (event_id, created_at) index'i: filtre ve sıralama tek aramada, ayrı sıralama yok
+    assert "SEARCH c USING INDEX" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,75 @@
+from datetime import datetime
+
+import pytest
+
+from app import EVENT_CARD_FIELDS, build_event_list_query, istanbul_days_to_utc_range
+from models import Event
+
+
+def test_istanbul_gunu_utc_yari_acik_araliga_cevrilir():
+    # İstanbul UTC+3: 1 Mayıs 00:00 (yerel) = 30 Nisan 21:00 UTC
+    assert istanbul_days_to_utc_range("2025-05-01", "2025-05-01") == (
+        datetime(2025, 4, 30, 21, 0), datetime(2025, 5, 1, 21, 0)
+    )
+    # Hafta görünümü: iki uç dahil
+    assert istanbul_days_to_utc_range("2025-05-05", "2025-05-11") == (
+        datetime(2025, 5, 4, 21, 0), datetime(2025, 5, 11, 21, 0)
+    )
+    assert istanbul_days_to_utc_range("2025-05-05", None) == (datetime(2025, 5, 4, 21, 0), None)
+    assert istanbul_days_to_utc_range(None, None) == (None, None)
+
+
+@pytest.mark.parametrize("first,last", [("2025-13-01", None), ("dün", None), ("2025-05-10", "2025-05-01")])
+def test_gecersiz_tarih(first, last):
+    with pytest.raises(ValueError):
+        istanbul_days_to_utc_range(first, last)
+
+
+def test_gece_yarisina_yakin_etkinlik_dogru_gune_duser():
+    # İstanbul'da 2 Mayıs 01:30 başlayan etkinlik UTC'de 1 Mayıs 22:30'dur
+    event_start_utc = datetime(2025, 5, 1, 22, 30)
+    start, end = istanbul_days_to_utc_range("2025-05-02", "2025-05-02")
+    assert start <= event_start_utc < end
+    start, end = istanbul_days_to_utc_range("2025-05-01", "2025-05-01")
+    assert not (start <= event_start_utc < end)
+
+
+async def explain(conn, query, params):
+    rows = await conn.execute_query_dict("EXPLAIN QUERY PLAN " + query.replace("%s", "?"), params)
+    return " | ".join(row["detail"] for row in rows)
+
+
+async def test_tarih_filtresi_index_ile_aranir(db):
+    selected = EVENT_CARD_FIELDS.parse({})
+    query, params = build_event_list_query(
+        selected, start_range=istanbul_days_to_utc_range("2025-05-01", "2025-05-31")
+    )
+    plan = await explain(db, query, params)
+    assert "SEARCH e USING INDEX" in plan
+    assert "start_datetime>? AND start_datetime<?" in plan
+
+
+
+async def test_imlecli_sayfalar_index_ile_tum_etkinlikleri_gezer(db):
+    starts = {1: datetime(2025, 5, 1), 2: datetime(2025, 5, 3), 3: datetime(2025, 5, 3),
+              4: None, 5: datetime(2025, 4, 20), 6: None, 7: datetime(2025, 5, 3)}
+    for event_id, start in starts.items():
+        await Event.create(event_id=event_id, title=f"Etkinlik {event_id}", start_datetime=start)
+    await Event.create(event_id=8, title="Pasif", start_datetime=datetime(2025, 5, 2), is_active=False)
+
+    selected = EVENT_CARD_FIELDS.parse({"lean": "1"})
+    seen, after = [], None
+    while True:
+        query, params = build_event_list_query(selected, paginate=True, after=after, limit=2)
+        # Her imleç biçiminde (ilk sayfa, tarihli, tarihsiz) index sırası kullanılır, ayrı sıralama yok
+        plan = await explain(db, query, params)
+        assert "USING INDEX idx_events_active_start" in plan
+        assert "TEMP B-TREE" not in plan
+
+        rows = await db.execute_query_dict(query.replace("%s", "?"), params)
+        seen.extend(r["cursor_id"] for r in rows[:2])
+        if len(rows) <= 2:
+            break
+        after = (rows[1]["cursor_start"], rows[1]["cursor_id"])
+    # Aynı tarihte event_id azalan, tarihsizler en sonda
+    assert seen == [7, 3, 2, 1, 5, 6, 4]
@@ -0,0 +1,74 @@
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from image_pipeline import ImagePipeline, InvalidImage, PipelineBusy, transcode
+from media_store import MediaStore, media_key_from_ref
+from migrate_media import store_image
+
+
+def make_jpeg(width, height):
+    """EXIF bilgisi içeren örnek bir JPEG üret"""
+    img = Image.new("RGB", (width, height), (200, 30, 30))
+    exif = Image.Exif()
+    exif[0x010F] = "Telefon Markasi"  # Make
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", exif=exif)
+    return buf.getvalue()
+
+
+def test_avatar_varyantlari_kare_ve_metadata_yok():
+    variants = transcode(make_jpeg(800, 500), "avatar")
+
+    assert set(variants) == {"64", "256"}
+    for size, body in variants.items():
+        img = Image.open(io.BytesIO(body))
+        assert img.format == "WEBP"
+        assert img.size == (int(size), int(size))
+        assert not img.getexif()
+
+
+def test_kapak_orani_korunur():
+    img = Image.open(io.BytesIO(transcode(make_jpeg(2400, 1200), "cover")["1200"]))
+    assert img.size == (1200, 600)
+
+
+def test_resim_olmayan_dosya_reddedilir():
+    with pytest.raises(InvalidImage):
+        transcode(b"bu bir resim degil", "event")
+
+
+@pytest.mark.asyncio
+async def test_pipeline_varyantlari_depoya_yazar(tmp_path):
+    store = MediaStore(str(tmp_path))
+    pipeline = ImagePipeline(workers=1, max_pending=2, timeout=30)
+    try:
+        data_uri = "data:image/jpeg;base64," + base64.b64encode(make_jpeg(1000, 800)).decode()
+        ref = await pipeline.store_value(store, data_uri, "event")
+        key = media_key_from_ref(ref)
+
+        assert store.exists(f"{key}-600")
+        # Orijinal dosya (EXIF'li) saklanmaz
+        assert not store.exists(key)
+        assert pipeline.pending == 0
+    finally:
+        pipeline.shutdown()
+
+
+def test_tasinan_gorselin_orijinali_de_saklanir(tmp_path):
+    store = MediaStore(str(tmp_path))
+    key = store_image(store, make_jpeg(1000, 800), "event")
+    assert store.exists(key)
+    assert store.exists(f"{key}-600")
+
+    # Çözülemeyen dosya sadece orijinal olarak saklanır
+    assert store.exists(store_image(store, b"resim degil", "event"))
+
+
+@pytest.mark.asyncio
+async def test_kuyruk_doluysa_hemen_reddedilir():
+    pipeline = ImagePipeline(workers=1, max_pending=0)
+    with pytest.raises(PipelineBusy):
+        await pipeline.run(transcode, make_jpeg(10, 10), "avatar")
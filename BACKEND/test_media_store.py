@@ -0,0 +1,133 @@
+import pytest
+
+import app as backend
+from media_store import (
+    MediaStore, event_image_url, media_key_from_url, media_url, parse_range, to_media_ref
+)
+
+# Küçük ama geçerli bir PNG başlığı (sniff için yeterli)
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + bytes(range(200))
+
+
+@pytest.fixture
+def media_store(tmp_path, monkeypatch):
+    store = MediaStore(str(tmp_path))
+    monkeypatch.setattr(backend, "MEDIA_STORE", store)
+    return store
+
+
+def test_ayni_dosya_tek_kez_yazilir(media_store, tmp_path):
+    """Aynı içerik iki kez yüklenince aynı anahtar dönmeli ve tek dosya oluşmalı"""
+    key1 = media_store.put(PNG_BYTES)
+    key2 = media_store.put(PNG_BYTES)
+
+    assert key1 == key2
+    files = [p for p in tmp_path.rglob("*") if p.is_file()]
+    assert len(files) == 1
+
+
+def test_medya_adresi_referansa_geri_cevrilir(media_store):
+    """Varyant adresinden orijinal anahtar geri çıkarılabilmeli"""
+    key = media_store.put(PNG_BYTES)
+    ref = to_media_ref(key)
+
+    assert media_key_from_url(media_url(ref, "256")) == key
+    assert media_key_from_url("https://ornek.com/a.jpg") is None
+
+
+def test_eksik_varyant_orijinale_duser(media_store):
+    """Varyantı olmayan eski yüklemelerde orijinal dosya servis edilmeli"""
+    key = media_store.put(PNG_BYTES)
+    assert media_store.resolve(f"{key}-256") == key
+    media_store.put_variant(key, "256", b"RIFF....WEBP")
+    assert media_store.resolve(f"{key}-256") == f"{key}-256"
+
+
+def test_etkinlik_gorsel_adresi_surum_tasir():
+    """Liste yanıtları görselin kendisi yerine sürümlü, sabit bir adres taşımalı"""
+    key = "ab" * 32
+    url = event_image_url(7, to_media_ref(key))
+    assert url.endswith(f"/media/etkinlik/7?v={key[:12]}")
+
+    # Taşınmamış base64 görsel yanıtın içine gömülmemeli
+    assert event_image_url(7, "data:image/png;base64,AAAA").endswith("/media/etkinlik/7")
+    assert event_image_url(7, "https://ornek.com/a.jpg") == "https://ornek.com/a.jpg"
+    assert event_image_url(7, "") is None
+
+
+async def test_profil_favorilerinde_base64_gorsel_cekilmez(db):
+    await db.execute_query("INSERT INTO users (user_id, email, password) VALUES (1, 'a@ankara.edu.tr', '-')")
+    await db.execute_query(
+        "INSERT INTO events (event_id, title, image_url) VALUES (7, 'Bahar Şenliği', ?)",
+        ["data:image/png;base64," + "A" * 5000],
+    )
+    await db.execute_query("INSERT INTO favourite_events (user_id, event_id) VALUES (1, 7)")
+
+    selected = backend.PUBLIC_PROFILE_EVENT_FIELDS.parse({"fields": "id,image_url"})
+    query = backend.build_public_profile_events_query(selected).replace("%s", "?")
+    rows = await db.execute_query_dict(query, [1])
+    assert rows[0]["image_url"] == "data:"
+    assert backend.Projection.render(rows[0], selected)["image_url"].endswith("/media/etkinlik/7")
+
+
+async def test_admin_etkinlik_listesinde_base64_gorsel_cekilmez(db):
+    await db.execute_query(
+        "INSERT INTO events (event_id, title, image_url) VALUES (7, 'Bahar Şenliği', ?)",
+        ["data:image/png;base64," + "A" * 5000],
+    )
+    await db.execute_query(
+        "INSERT INTO events (event_id, title, image_url) VALUES (8, 'Kariyer Günü', 'https://ornek.com/a.png')"
+    )
+
+    selected = backend.ADMIN_EVENT_FIELDS.parse({})
+    rows = {r["event_id"]: r for r in await backend.admin_events_query(selected)}
+    assert rows[7]["image_ref"] == "data:"
+    assert rows[8]["image_ref"] == "https://ornek.com/a.png"
+    assert backend.Projection.render(rows[7], selected)["image_url"].endswith("/media/etkinlik/7")
+
+
+@pytest.mark.asyncio
+async def test_buyuk_json_yanitlari_sikistirilir(test_client):
+    _, response = await test_client.get("/api/faq", headers={"Accept-Encoding": "gzip"})
+    assert response.status == 200
+    assert response.headers.get("content-encoding") == "gzip"
+    assert response.json["faqs"]
+
+
+def test_range_basligi():
+    assert parse_range(None, 100) is None
+    assert parse_range("bytes=0-9", 100) == (0, 9)
+    assert parse_range("bytes=90-", 100) == (90, 99)
+    assert parse_range("bytes=-10", 100) == (90, 99)
+    assert parse_range("bytes=50-500", 100) == (50, 99)
+    assert parse_range("bytes=5-3", 100) is None  # Ters aralık yok sayılır: 200
+    assert parse_range("bytes=150-120", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
+
+
+@pytest.mark.asyncio
+async def test_media_endpoint_etag_ve_range(test_client, media_store):
+    """Medya endpoint'i ETag, 304 ve 206 yanıtlarını doğru vermeli"""
+    key = media_store.put(PNG_BYTES)
+
+    _, response = await test_client.get(f"/media/{key}")
+    assert response.status == 200
+    assert response.body == PNG_BYTES
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["etag"] == f'"{key}"'
+    assert "immutable" in response.headers["cache-control"]
+
+    _, response = await test_client.get(f"/media/{key}", headers={"If-None-Match": f'"{key}"'})
+    assert response.status == 304
+
+    _, response = await test_client.get(f"/media/{key}", headers={"Range": "bytes=0-7"})
+    assert response.status == 206
+    assert response.body == PNG_BYTES[:8]
+    assert response.headers["content-range"] == f"bytes 0-7/{len(PNG_BYTES)}"
+
+
+@pytest.mark.asyncio
+async def test_olmayan_medya_404(test_client, media_store):
+    _, response = await test_client.get(f"/media/{'0' * 64}")
+    assert response.status == 404
@@ -0,0 +1,69 @@
+from tortoise import Tortoise
+
+from migrations import create_index, discover, index_columns, migrate, status
+
+
+def test_migrationlar_sirali_ve_tekil():
+    versions = [m.version for m in discover()]
+    assert versions == sorted(versions)
+    assert versions[0] == "0001"
+    assert len(versions) == len(set(versions))
+
+
+async def test_migrate_idempotent_ve_indexleri_olusturur(empty_db):
+    applied = await migrate(empty_db, log=lambda *_: None)
+    assert [m.version for m in applied] == [m.version for m in discover()]
+
+    # İkinci çalıştırma hiçbir şey yapmaz
+    assert await migrate(empty_db, log=lambda *_: None) == []
+    assert all(applied_at is not None for _, applied_at in await status(empty_db))
+
+    expected = {
+        "events": ("is_active", "start_datetime"),
+        "favourite_events": ("user_id", "event_id"),
+        "comments": ("event_id", "created_at"),
+        "feedbacks": ("status", "created_at"),
+    }
+    for table, columns in expected.items():
+        assert columns in (await index_columns(empty_db, table)).values(), table
+    assert ("user_id", "created_at") in (await index_columns(empty_db, "comments")).values()
+
+
+async def tables(conn):
+    rows = await conn.execute_query_dict("SELECT name FROM sqlite_master WHERE type = 'table'")
+    return {r["name"] for r in rows}
+
+
+async def test_hedef_surume_kadar_uygular(empty_db):
+    applied = await migrate(empty_db, target="0001", log=lambda *_: None)
+    assert [m.version for m in applied] == ["0001"]
+    pending = [m.version for m, applied_at in await status(empty_db) if applied_at is None]
+    assert pending and "0001" not in pending
+    # Sonraki migration'ların tabloları henüz yok (şema modellerden üretilmez)
+    assert "users" in await tables(empty_db)
+    assert not {"token_revocations", "email_outbox", "daily_stats"} & await tables(empty_db)
+
+
+async def test_token_iptalleri_turlu_tabloya_tasinir(empty_db):
+    await migrate(empty_db, target="0009", log=lambda *_: None)
+    await empty_db.execute_query(
+        "INSERT INTO token_revocations (user_id, revoked_before, expires_at) VALUES (?, ?, ?)",
+        [5, "2025-05-01 10:00:00", "2025-05-02 10:00:00"],
+    )
+    await migrate(empty_db, log=lambda *_: None)
+
+    rows = await empty_db.execute_query_dict("SELECT user_id, kind FROM token_revocations")
+    assert rows == [{"user_id": 5, "kind": "session"}]
+    assert "token_revocations_old" not in await tables(empty_db)
+
+
+async def test_migration_semasi_modellerle_ayni(db):
+    for model in Tortoise.apps["models"].values():
+        rows = await db.execute_query_dict(f'PRAGMA table_info("{model._meta.db_table}")')
+        assert {r["name"] for r in rows} == set(model._meta.fields_db_projection.values()), model.__name__
+
+
+async def test_ayni_kolonlu_index_tekrar_olusturulmaz(db):
+    assert await create_index(db, "events", "idx_events_active_start", ["is_active", "start_datetime"]) is False
+    assert await create_index(db, "events", "idx_events_title", ["title"]) is True
+    assert await create_index(db, "events", "idx_events_title", ["title"]) is False
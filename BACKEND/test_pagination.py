@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import jwt
+import pytest
+
+from app import SECRET_KEY
+from pagination import PaginationError, decode_cursor, encode_cursor, parse_limit, wants_pagination
+
+
+def test_imlec_gidis_donus():
+    start = datetime(2025, 5, 1, 18, 30)
+    cursor = encode_cursor(start, 42)
+    assert "=" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor, (datetime, int)) == [start, 42]
+
+
+def test_tarihsiz_etkinlik_imleci():
+    assert decode_cursor(encode_cursor(None, 7), (datetime, int)) == [None, 7]
+
+
+@pytest.mark.parametrize("cursor", ["bozuk!", encode_cursor("x", 1), encode_cursor(1), encode_cursor("2025-01-01", "1")])
+def test_gecersiz_imlec(cursor):
+    with pytest.raises(PaginationError):
+        decode_cursor(cursor, (datetime, int))
+
+
+def test_limit():
+    assert parse_limit({}) == 20
+    assert parse_limit({"limit": "5"}) == 5
+    assert parse_limit({"limit": "5000"}) == 100
+    for bad in ("0", "abc"):
+        with pytest.raises(PaginationError):
+            parse_limit({"limit": bad})
+
+
+def test_sayfalama_istege_bagli():
+    assert not wants_pagination({"university": "ODTÜ"})
+    assert wants_pagination({"limit": "10"})
+    assert wants_pagination({"cursor": "abc"})
+
+
+@pytest.mark.asyncio
+async def test_gecersiz_imlec_400(test_client):
+    token = jwt.encode({"user_id": 1}, SECRET_KEY, algorithm="HS256")
+    _, response = await test_client.get(
+        "/api/etkinlikler", params={"cursor": "bozuk!"}, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status == 400
+    assert response.json["basarili"] is False
@@ -0,0 +1,59 @@
+import asyncio
+import threading
+
+import pytest
+
+from password_hasher import MAX_ROUNDS, MIN_ROUNDS, PasswordHasher, PasswordHasherBusy, hash_rounds
+
+
+async def test_hash_ve_dogrulama_event_loop_disinda():
+    hasher = PasswordHasher(rounds=4)
+    hashed = await hasher.hash("gizli123")
+
+    assert hash_rounds(hashed) == 4
+    assert await hasher.verify("gizli123", hashed)
+    assert not await hasher.verify("yanlis", hashed)
+    stats = hasher.stats()
+    assert stats["completed"] == 3 and stats["pending"] == 0
+    assert stats["hash_time"]["avg_ms"] is not None
+    hasher.shutdown()
+
+
+async def test_duz_metin_sifre_value_error_verir():
+    hasher = PasswordHasher(rounds=4)
+    with pytest.raises(ValueError):
+        await hasher.verify("sifre", "sifre")
+    hasher.shutdown()
+
+
+async def test_kuyruk_doluyken_hemen_reddedilir(monkeypatch):
+    hasher = PasswordHasher(workers=1, max_pending=2, rounds=4)
+    release = threading.Event()
+    monkeypatch.setattr("password_hasher._hashpw", lambda password, rounds: release.wait(5) and "hash")
+
+    jobs = [asyncio.ensure_future(hasher.hash("a")) for _ in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.hash("a")
+    assert hasher.stats()["rejected"] == 1
+
+    release.set()
+    assert await asyncio.gather(*jobs) == ["hash", "hash"]
+    # İkinci iş birincinin bitmesini kuyrukta bekledi
+    assert hasher.stats()["queue_wait"]["max_ms"] > 0
+    hasher.shutdown()
+
+
+def test_maliyet_gecikme_butcesine_gore_secilir():
+    hasher = PasswordHasher()
+    # MIN_ROUNDS 20 ms sürüyorsa: 40, 80, 160 ms -> 250 ms bütçede +3
+    assert hasher.calibrate(250, measure=lambda rounds: 0.020) == MIN_ROUNDS + 3
+    assert hasher.calibrate(250, measure=lambda rounds: 0.500) == MIN_ROUNDS
+    assert hasher.calibrate(250, measure=lambda rounds: 0.00001) == MAX_ROUNDS
+
+
+def test_dusuk_maliyetli_hash_yenilenir():
+    hasher = PasswordHasher(rounds=12)
+    assert hasher.needs_rehash("$2b$10$" + "a" * 53)
+    assert not hasher.needs_rehash("$2b$12$" + "a" * 53)
+    assert not hasher.needs_rehash("duz-metin")
@@ -0,0 +1,49 @@
+import jwt
+import pytest
+
+import app as app_module
+from app import SECRET_KEY
+from cache import EncodedEntry
+from shared_cache import CacheBackend, SharedCache
+
+
+@pytest.fixture
+def profile_cache(monkeypatch):
+    cache = SharedCache("profile", CacheBackend(), encode=lambda e: e.body, decode=EncodedEntry)
+    monkeypatch.setattr(app_module, "PROFILE_CACHE", cache)
+    return cache
+
+
+def auth_headers(user_id):
+    token = jwt.encode({"user_id": user_id}, SECRET_KEY, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_etag_icerige_gore_degisir():
+    a = EncodedEntry.from_value({"ad": "Ayşe"})
+    b = EncodedEntry.from_value({"ad": "Ayşe"})
+    c = EncodedEntry.from_value({"ad": "Fatma"})
+    assert a.etag == b.etag != c.etag
+    assert a.body == '{"ad":"Ayşe"}'.encode("utf-8")
+
+
+@pytest.mark.asyncio
+async def test_profil_cache_isabetinde_hazir_govde_ve_304(test_client, profile_cache):
+    entry = EncodedEntry.from_value({"basarili": True, "profile": {"full_name": "Ayşe"}})
+    await profile_cache.set(42, entry)
+
+    _, response = await test_client.get("/api/profile", headers=auth_headers(42))
+    assert response.status == 200
+    assert response.body == entry.body
+    assert response.headers["etag"] == entry.etag
+    assert response.json["profile"]["full_name"] == "Ayşe"
+
+    headers = {**auth_headers(42), "If-None-Match": entry.etag}
+    _, response = await test_client.get("/api/profile", headers=headers)
+    assert response.status == 304
+    assert response.body == b""
+
+    # İçerik değişince eski ETag artık eşleşmez
+    await profile_cache.set(42, EncodedEntry.from_value({"basarili": True, "profile": {"full_name": "Ayşe Y."}}))
+    _, response = await test_client.get("/api/profile", headers=headers)
+    assert response.status == 200
@@ -0,0 +1,44 @@
+import pytest
+
+from projection import Field, Projection, ProjectionError, strftime_of
+
+EVENTS = Projection(
+    Field("id", {"id": "e.event_id"}),
+    Field("title", {"title": "e.title"}),
+    Field("description", {"description": "e.description"}),
+    Field("date", {"start_datetime": "e.start_datetime"}, strftime_of("start_datetime", "%Y-%m-%d")),
+    Field("time", {"start_datetime": "e.start_datetime"}, strftime_of("start_datetime", "%H:%M")),
+    lean=("id", "title"),
+    always=("id",),
+)
+
+
+def test_parametre_yoksa_tum_alanlar():
+    assert [f.name for f in EVENTS.parse({})] == ["id", "title", "description", "date", "time"]
+
+
+def test_istenmeyen_kolonlar_sorguya_girmez():
+    """description istenmediyse SELECT listesinde olmamalı; id her zaman eklenir"""
+    selected = EVENTS.parse({"fields": "title,date,time"})
+
+    assert [f.name for f in selected] == ["id", "title", "date", "time"]
+    sql = EVENTS.sql_select(selected)
+    assert "description" not in sql
+    # date ve time aynı kolonu kullanır, kolon bir kez seçilmeli
+    assert sql.count("e.start_datetime") == 1
+
+
+def test_lean_modu():
+    assert [f.name for f in EVENTS.parse({"lean": "1"})] == ["id", "title"]
+
+
+def test_bilinmeyen_alan_hata_verir():
+    with pytest.raises(ProjectionError):
+        EVENTS.parse({"fields": "title,sifre"})
+
+
+def test_satir_render():
+    from datetime import datetime
+    selected = EVENTS.parse({"fields": "date,time"})
+    row = {"id": 3, "start_datetime": datetime(2025, 5, 1, 14, 30)}
+    assert Projection.render(row, selected) == {"id": 3, "date": "2025-05-01", "time": "14:30"}
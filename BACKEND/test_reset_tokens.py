@@ -0,0 +1,58 @@
+import asyncio
+
+from models import PasswordResetToken
+from reset_tokens import ResetTokenStore, hash_token, utcnow
+
+
+async def test_token_baska_workerda_dogrulanir_ve_tek_kullanimlik(db):
+    issuer, other_worker = ResetTokenStore(), ResetTokenStore()
+    token = await issuer.issue("ogrenci@ankara.edu.tr")
+
+    # Token'ın kendisi saklanmaz
+    assert await PasswordResetToken.get_or_none(token_hash=token) is None
+    assert (await PasswordResetToken.get(token_hash=hash_token(token))).email == "ogrenci@ankara.edu.tr"
+
+    assert await other_worker.lookup(token) == "ogrenci@ankara.edu.tr"
+    assert await other_worker.lookup("uydurma") is None
+
+    results = await asyncio.gather(issuer.consume(token), other_worker.consume(token))
+    assert sorted(results) == [False, True]
+    assert await issuer.lookup(token) is None
+
+
+async def test_basarili_sifirlama_diger_baglantilari_gecersiz_kilar(db):
+    store = ResetTokenStore()
+    first = await store.issue("a@ankara.edu.tr")
+    second = await store.issue("a@ankara.edu.tr")
+    other = await store.issue("b@ankara.edu.tr")
+
+    assert await store.consume(second)
+    assert await store.lookup(first) is None
+    assert await store.lookup(other) == "b@ankara.edu.tr"
+
+
+async def test_eposta_basina_gonderim_siniri(db, clock):
+    clock.now = utcnow()
+    store = ResetTokenStore(max_per_window=2, window=3600, clock=clock)
+    assert await store.issue("a@ankara.edu.tr")
+    assert await store.issue("a@ankara.edu.tr")
+    assert await store.issue("a@ankara.edu.tr") is None
+    assert await store.issue("b@ankara.edu.tr")  # Başka e-postayı etkilemez
+    assert store.stats()["throttled"] == 1
+
+    clock.advance(3601)
+    assert await store.issue("a@ankara.edu.tr")
+
+
+async def test_suresi_dolanlar_parca_parca_silinir(db, clock):
+    clock.now = utcnow()
+    store = ResetTokenStore(ttl=60, max_per_window=100, clock=clock)
+    expired = [await store.issue(f"u{i}@ankara.edu.tr") for i in range(5)]
+    clock.advance(30)
+    fresh = await store.issue("yeni@ankara.edu.tr")
+    clock.advance(31)
+
+    assert await store.lookup(expired[0]) is None
+    assert await store.sweep(batch_size=2) == 5
+    assert await PasswordResetToken.all().count() == 1
+    assert await store.lookup(fresh) == "yeni@ankara.edu.tr"
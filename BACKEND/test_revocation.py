@@ -0,0 +1,139 @@
+from datetime import datetime, timezone
+
+import jwt
+
+import app as app_module
+from app import SECRET_KEY, create_access_token
+from revocation import RevocationList
+from shared_cache import MmapBackend
+
+NOW = 1_750_000_000.0
+
+
+async def test_iptal_oncesi_token_reddedilir_sonrasi_gecer(clock):
+    clock.now = NOW
+    revocations = RevocationList(clock=clock)
+    await revocations.revoke(5)
+
+    assert revocations.is_revoked(5, NOW - 3600)
+    assert revocations.is_revoked(5, NOW)  # iptal anında verilmiş
+    assert not revocations.is_revoked(5, NOW + 0.001)  # aynı saniyede yeniden giriş
+    assert not revocations.is_revoked(5, NOW + 2)
+    assert not revocations.is_revoked(6, NOW - 3600)
+
+
+async def test_kayit_ban_veya_token_omru_bitince_duser(clock):
+    clock.now = NOW
+    revocations = RevocationList(clock=clock)
+    await revocations.revoke(1, until=NOW + 600, ban=True)  # 10 dakikalık ban
+    await revocations.revoke(2)
+
+    clock.now = NOW + 601
+    assert not revocations.is_revoked(1, NOW - 60)
+    assert revocations.is_revoked(2, NOW - 60)
+
+    clock.now = NOW + revocations.token_lifetime
+    assert not revocations.is_revoked(2, NOW - 60)
+    assert len(revocations) == 0
+
+
+async def test_sifirlamadan_sonra_ban_sifirlama_iptalini_kisaltmaz(clock):
+    clock.now = 1000
+    revocations = RevocationList(clock=clock)
+    await revocations.revoke(5)  # Şifre sıfırlama
+    clock.now = 2000
+    await revocations.revoke(5, until=2600, ban=True)
+
+    clock.now = 2700  # Ban bitti, sıfırlama öncesi token hâlâ geçersiz
+    assert revocations.is_revoked(5, 500)
+    assert not revocations.is_revoked(5, 2100)
+
+
+async def test_ban_kaldirilinca_sifirlama_iptali_kalir(clock):
+    clock.now = 1000
+    revocations = RevocationList(clock=clock)
+    await revocations.revoke(5)  # Şifre sıfırlama
+    clock.now = 2000
+    await revocations.revoke(5, ban=True)
+    await revocations.restore(5)  # Ban kaldırıldı
+
+    assert revocations.is_revoked(5, 500)
+    assert not revocations.is_revoked(5, 1500)
+
+
+async def test_eski_tokenlarin_verilis_zamani_bitisten_hesaplanir():
+    revocations = RevocationList()
+    assert revocations.issued_at({"exp": NOW + revocations.token_lifetime}) == NOW
+    assert revocations.issued_at({"iat": 123, "exp": NOW}) == 123
+
+
+async def test_diger_worker_duyuruyla_gunceller(tmp_path, clock):
+    path = str(tmp_path / "cache.bin")
+    clock.now = NOW
+    async def load_all():
+        return []
+
+    worker_a = RevocationList(MmapBackend(path, slots=16, slot_size=256), load_all, clock=clock)
+    worker_b = RevocationList(MmapBackend(path, slots=16, slot_size=256), load_all, clock=clock)
+    await worker_a.load()
+    await worker_b.load()
+
+    await worker_a.revoke(9, until=NOW + 600, ban=True)
+    assert worker_b.is_revoked(9, NOW - 1)
+
+    await worker_a.restore(9)
+    assert not worker_b.is_revoked(9, NOW - 1)
+
+    await worker_a.backend.close()
+    await worker_b.backend.close()
+
+
+async def test_kalici_depodan_yeniden_yuklenir(db, monkeypatch):
+    monkeypatch.setattr(app_module, "TOKEN_REVOCATIONS", RevocationList())
+    now = datetime.now(timezone.utc).timestamp()
+    await app_module.save_token_revocation(3, "session", now, now + 3600)
+    await app_module.save_token_revocation(3, "ban", now + 60, now + 600)
+    await app_module.save_token_revocation(4, "session", now - 7200, now - 10)  # süresi dolmuş
+
+    # Yeni açılan worker
+    revocations = RevocationList(
+        load_all=app_module.load_token_revocations,
+        save=app_module.save_token_revocation,
+        delete=app_module.delete_token_revocation,
+    )
+    assert await revocations.load() == 1
+    assert revocations.is_revoked(3, now - 60)
+    assert not revocations.is_revoked(4, now - 7300)
+    assert await app_module.TokenRevocation.all().count() == 2
+
+    # Ban kaldırılınca kalıcı kopyada da sadece ban satırı silinir
+    await revocations.restore(3)
+    rows = await app_module.TokenRevocation.all().values_list("user_id", "kind")
+    assert rows == [(3, "session")]
+
+
+async def test_iptal_edilen_token_ile_istek_401(test_client, monkeypatch):
+    revocations = RevocationList()
+    monkeypatch.setattr(app_module, "TOKEN_REVOCATIONS", revocations)
+    issued = int(datetime.now(timezone.utc).timestamp()) - 60
+    token = jwt.encode({"user_id": 77, "iat": issued, "exp": issued + 3600}, SECRET_KEY, algorithm="HS256")
+    headers = {"Authorization": f"Bearer {token}"}
+
+    await revocations.revoke(77)
+    _, response = await test_client.get("/api/profile", headers=headers)
+    assert response.status == 401
+    assert response.json["mesaj"] == "Oturumunuz sonlandırıldı. Tekrar giriş yapın."
+
+
+async def test_iptalden_hemen_sonra_verilen_token_gecerli(monkeypatch):
+    revocations = RevocationList()
+    monkeypatch.setattr(app_module, "TOKEN_REVOCATIONS", revocations)
+    user = app_module.User(user_id=78, email="a@ankara.edu.tr", is_admin=False)
+    old_payload = jwt.decode(create_access_token(user), SECRET_KEY, algorithms=["HS256"])
+
+    # Şifre sıfırlama ve aynı saniye içinde yeniden giriş
+    await revocations.revoke(78)
+    new_payload = jwt.decode(create_access_token(user), SECRET_KEY, algorithms=["HS256"])
+
+    assert revocations.is_revoked(78, revocations.issued_at(old_payload))
+    assert not revocations.is_revoked(78, revocations.issued_at(new_payload))
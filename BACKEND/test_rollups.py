@@ -0,0 +1,68 @@
+from datetime import date, datetime, timedelta, timezone
+
+from istanbul_time import istanbul_day, istanbul_midnight_utc
+from rollups import DailyRollups, bucketize, read_daily
+
+# İstanbul 2 Mart 00:30 = UTC 1 Mart 21:30
+T0 = datetime(2025, 3, 1, 21, 30)
+
+
+async def add_user(db, user_id, created_at):
+    # Ham SQL: modelin önbelleğe aldığı INSERT sorgusu başka testin (MySQL) ayarından kalmış olabilir
+    await db.execute_query(
+        "INSERT INTO users (user_id, email, password, role, is_active, is_admin, is_banned, created_at)"
+        " VALUES (?, ?, '-', 'user', 1, 0, 0, ?)",
+        [user_id, f"{user_id}@x.com", created_at],
+    )
+
+
+def test_gunler_istanbul_takvimine_gore():
+    assert istanbul_day(T0) == date(2025, 3, 2)
+    assert istanbul_day(T0.replace(tzinfo=timezone.utc) - timedelta(minutes=31)) == date(2025, 3, 1)
+    # 2016 öncesi kış saati UTC+2: sabit +3 ile bir sonraki güne kayardı
+    assert istanbul_day(datetime(2015, 1, 15, 21, 30)) == date(2015, 1, 15)
+    assert istanbul_midnight_utc(date(2015, 1, 15)) == datetime(2015, 1, 14, 22, 0)
+
+
+async def test_ozet_artimli_doldurulur(db):
+    await add_user(db, 1, T0 - timedelta(days=3))
+    await add_user(db, 2, T0)
+    await add_user(db, 3, T0 + timedelta(hours=2))
+    await db.execute_query(
+        "INSERT INTO events (event_id, title, is_active, created_at) VALUES (1, 'E', 1, ?), (2, 'F', 0, ?)", [T0, T0]
+    )
+
+    rollups = DailyRollups(lambda: db, clock=lambda: T0.replace(tzinfo=timezone.utc))
+    rollups.record_login(T0)
+    rollups.record_login(T0 + timedelta(minutes=5))
+    await rollups.run()
+
+    first, last = date(2025, 2, 26), date(2025, 3, 2)
+    assert await read_daily(db, "signups", first, last) == {date(2025, 2, 27): 1, date(2025, 3, 2): 2}
+    assert await read_daily(db, "logins", first, last) == {date(2025, 3, 2): 2}
+    assert await read_daily(db, "active_events", first, last) == {date(2025, 3, 2): 1}
+
+    # Sonraki tur: aynı gün yeniden sayılır, girişler eklenir
+    await add_user(db, 4, T0 + timedelta(hours=3))
+    rollups.record_login(T0 + timedelta(hours=1))
+    await rollups.run()
+    assert (await read_daily(db, "signups", first, last))[date(2025, 3, 2)] == 3
+    assert (await read_daily(db, "logins", first, last))[date(2025, 3, 2)] == 3
+    assert rollups.stats()["pending_login_days"] == 0
+
+
+def test_dilimler():
+    values = {date(2025, 3, 2): 2, date(2025, 3, 3): 1, date(2025, 3, 10): 4, date(2025, 4, 1): 7}
+    first, last = date(2025, 3, 1), date(2025, 4, 2)
+
+    daily = bucketize(values, date(2025, 3, 1), date(2025, 3, 3))
+    assert daily == [{"start": "2025-03-01", "value": 0}, {"start": "2025-03-02", "value": 2},
+                     {"start": "2025-03-03", "value": 1}]
+    weekly = bucketize(values, first, last, "week")
+    assert weekly[:3] == [{"start": "2025-02-24", "value": 2}, {"start": "2025-03-03", "value": 1},
+                          {"start": "2025-03-10", "value": 4}]
+    assert bucketize(values, first, last, "month") == [{"start": "2025-03-01", "value": 7},
+                                                       {"start": "2025-04-01", "value": 7}]
+    # Anlık metrik: dilimin son ölçümü
+    assert bucketize(values, first, last, "month", gauge=True) == [{"start": "2025-03-01", "value": 4},
+                                                                   {"start": "2025-04-01", "value": 7}]
@@ -0,0 +1,41 @@
+import asyncio
+
+from scheduler import Scheduler
+
+
+async def test_is_aralikla_calisir_hata_sonraki_turu_durdurmaz():
+    calls = []
+
+    async def job():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise ConnectionError("db yok")
+        return len(calls)
+
+    scheduler = Scheduler()
+    scheduler.every(0.01, "temizlik", job, run_at_start=True)
+    scheduler.start()
+    await asyncio.sleep(0.05)
+    await scheduler.stop()
+
+    stats = scheduler.stats()["temizlik"]
+    assert stats["errors"] == 1
+    assert stats["runs"] == len(calls) - 1 >= 1
+    assert stats["last_result"] == len(calls)
+
+
+async def test_kapanista_baslamis_tur_tamamlanir():
+    finished = []
+    started = asyncio.Event()
+
+    async def job():
+        started.set()
+        await asyncio.sleep(0.02)
+        finished.append(True)
+
+    scheduler = Scheduler()
+    scheduler.every(60, "yavas", job, run_at_start=True)
+    scheduler.start()
+    await started.wait()
+    await scheduler.stop()
+    assert finished == [True]
@@ -0,0 +1,104 @@
+from app import EVENT_CARD_FIELDS, build_event_cards_query
+from models import Event, University
+from search_index import EventSearchIndex, InvertedIndex, tokenize, turkish_fold
+from shared_cache import MmapBackend
+
+
+def event(title, description="", club="", category="", university=""):
+    return {"title": title, "description": description, "club": club,
+            "category": category, "university": university}
+
+
+def test_turkce_harfler_katlanir():
+    assert turkish_fold("İSTANBUL Işık ÇAĞDAŞ") == "istanbul isik cagdas"
+    assert tokenize("Şiir-Gecesi, 2025!") == ["siir", "gecesi", "2025"]
+
+
+def test_onek_ve_turkce_karakter_duyarsiz_arama():
+    index = InvertedIndex()
+    index.upsert(1, event("Yapay Zekâ Konferansı", university="İstanbul Üniversitesi"))
+    index.upsert(2, event("Müzik Dinletisi", university="ODTÜ"))
+
+    assert [d for d, _ in index.search("konf")] == [1]
+    assert [d for d, _ in index.search("ISTANBUL")] == [1]
+    assert [d for d, _ in index.search("muzik")] == [2]
+    assert [d for d, _ in index.search("zeka")] == [1]
+
+
+def test_tum_kelimeler_eslesmeli():
+    index = InvertedIndex()
+    index.upsert(1, event("Python Atölyesi", university="ODTÜ"))
+    index.upsert(2, event("Python Atölyesi", university="Bilkent"))
+
+    assert [d for d, _ in index.search("python odtu")] == [1]
+    assert index.search("python hacettepe") == []
+
+
+def test_baslik_eslesmesi_aciklamadan_once_gelir():
+    index = InvertedIndex()
+    index.upsert(1, event("Kariyer Günleri", description="Tiyatro kulübü de katılıyor"))
+    index.upsert(2, event("Tiyatro Gösterisi", description="Sahne performansı"))
+    index.upsert(3, event("Satranç Turnuvası"))
+
+    assert [d for d, _ in index.search("tiyatro")] == [2, 1]
+    # Tam eşleşme önek eşleşmesinden yüksek puan alır
+    index.upsert(4, event("Tiyatrolar Gösterisi"))
+    ranked = [d for d, _ in index.search("tiyatro")]
+    assert ranked.index(2) < ranked.index(4)
+
+
+def test_guncelleme_ve_silme_indexi_temizler():
+    index = InvertedIndex()
+    index.upsert(1, event("Robotik Yarışması"))
+    index.upsert(1, event("Drone Yarışması"))
+
+    assert index.search("robotik") == []
+    assert [d for d, _ in index.search("drone")] == [1]
+    assert "robotik" not in index.terms
+
+    index.remove(1)
+    assert len(index) == 0 and index.terms == [] and index.total_length == 0
+
+
+async def test_diger_workerin_indexi_duyuruyla_guncellenir(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    rows = {1: event("Bahar Şenliği"), 2: event("Kodlama Kampı")}
+
+    async def load_all():
+        return list(rows.items())
+
+    async def load_one(event_id):
+        return rows.get(event_id)
+
+    worker_a = EventSearchIndex(load_all, load_one, MmapBackend(path, slots=16, slot_size=256))
+    worker_b = EventSearchIndex(load_all, load_one, MmapBackend(path, slots=16, slot_size=256))
+    assert [d for d, _ in await worker_b.search("senli")] == [1]
+
+    rows[1] = event("Güz Şenliği")
+    rows[3] = event("Şenlik Konseri")
+    await worker_a.event_changed(1)
+    await worker_a.event_changed(3)
+
+    assert [d for d, _ in await worker_b.search("guz")] == [1]
+    assert sorted(d for d, _ in await worker_b.search("senli")) == [1, 3]
+    assert await worker_b.search("bahar") == []
+
+    await worker_a.backend.close()
+    await worker_b.backend.close()
+
+
+async def test_katalog_kapaliyken_kartlar_sqlden_gelir(db):
+    await University.create(university_id=1, name="ODTÜ")
+    await Event.create(event_id=1, title="Bahar Şenliği", university_id=1)
+    await Event.create(event_id=2, title="Kariyer Günü")
+    await Event.create(event_id=3, title="Eski Etkinlik", is_active=False)
+
+    selected = EVENT_CARD_FIELDS.parse({"fields": "title,university"})
+    query, params = build_event_cards_query(selected, [2, 3, 1])
+    rows = await db.execute_query_dict(query.replace("%s", "?"), params)
+    cards = {r["cursor_id"]: EVENT_CARD_FIELDS.render(r, selected) for r in rows}
+    # Pasif etkinlik arama sonucunda olsa da kart dönmez
+    assert cards == {
+        1: {"id": 1, "title": "Bahar Şenliği", "university": "ODTÜ"},
+        2: {"id": 2, "title": "Kariyer Günü", "university": None},
+    }
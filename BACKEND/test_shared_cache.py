@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+
+from shared_cache import (
+    CacheBackend, MmapBackend, RedisBackend, SharedCache, encode_command, read_reply
+)
+
+
+class MiniRedis:
+    """Testler için Redis protokolü konuşan küçük sunucu (GET/MGET/SET/DEL/PUBLISH/SUBSCRIBE)"""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = {}
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        for writers in self.subscribers.values():
+            for writer in writers:
+                writer.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                command = await read_reply(reader)
+                name, args = command[0].upper(), command[1:]
+                if name == b"GET":
+                    value = self.data.get(args[0])
+                    writer.write(b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value))
+                elif name == b"MGET":
+                    values = [self.data.get(k) for k in args]
+                    writer.write(b"*%d\r\n" % len(values) + b"".join(
+                        b"$-1\r\n" if v is None else b"$%d\r\n%s\r\n" % (len(v), v) for v in values
+                    ))
+                elif name == b"SET":
+                    self.data[args[0]] = args[1]
+                    writer.write(b"+OK\r\n")
+                elif name == b"DEL":
+                    writer.write(b":%d\r\n" % (self.data.pop(args[0], None) is not None))
+                elif name == b"PUBLISH":
+                    targets = self.subscribers.get(args[0], [])
+                    for target in targets:
+                        target.write(encode_command("message", args[0], args[1]))
+                    writer.write(b":%d\r\n" % len(targets))
+                elif name == b"SUBSCRIBE":
+                    self.subscribers.setdefault(args[0], []).append(writer)
+                    writer.write(b"*3\r\n$9\r\nsubscribe\r\n$%d\r\n%s\r\n:1\r\n" % (len(args[0]), args[0]))
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def wait_until(condition, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Koşul zamanında sağlanmadı")
+
+
+async def test_mmap_iki_worker_ayni_kaydi_gorur_ve_silme_yayilir(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    worker_a = SharedCache("profile", MmapBackend(path, slots=64, slot_size=1024), ttl=60)
+    worker_b = SharedCache("profile", MmapBackend(path, slots=64, slot_size=1024), ttl=60)
+
+    await worker_a.set(7, {"full_name": "Ayşe"})
+    assert await worker_b.get(7) == {"full_name": "Ayşe"}
+    assert worker_b.shared_hits == 1
+    # İkinci okuma B'nin kendi L1'inden gelir
+    assert await worker_b.get(7) == {"full_name": "Ayşe"}
+    assert worker_b.local.hits == 1
+
+    await worker_a.invalidate(7)
+    assert await worker_b.get(7) is None
+    assert worker_b.invalidations_received == 1
+
+    await worker_a.backend.close()
+    await worker_b.backend.close()
+
+
+async def test_gec_kalan_yazma_yeni_gecersizlestirmeyi_ezmez(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    worker_a = SharedCache("profile", MmapBackend(path, slots=64, slot_size=1024), ttl=60)
+    worker_b = SharedCache("profile", MmapBackend(path, slots=64, slot_size=1024), ttl=60)
+
+    # A DB'den okurken B kaydı güncelleyip geçersizleştirir
+    value, stamp = await worker_a.lookup(7)
+    assert value is None
+    await worker_b.invalidate(7)
+
+    assert await worker_a.set(7, {"full_name": "Eski"}, stamp=stamp) is False
+    assert worker_a.stale_writes == 1
+    assert await worker_b.get(7) is None
+    assert await worker_a.get(7) is None
+
+    # Yeni okuma yeni damga alır ve yazabilir
+    _, stamp = await worker_a.lookup(7)
+    assert await worker_a.set(7, {"full_name": "Yeni"}, stamp=stamp) is True
+    assert await worker_b.get(7) == {"full_name": "Yeni"}
+
+    await worker_a.backend.close()
+    await worker_b.backend.close()
+
+
+async def test_mmap_ttl_ve_sigmayan_deger(tmp_path):
+    backend = MmapBackend(str(tmp_path / "cache.bin"), slots=8, slot_size=256)
+    assert await backend.set("k", b"x" * 10, ttl=-1) is True
+    assert await backend.get("k") is None
+    assert await backend.set("k", b"x" * 300, ttl=60) is None  # slota sığmaz
+    await backend.close()
+
+
+async def test_mmap_slot_dolunca_eski_kayit_ezilir(tmp_path):
+    backend = MmapBackend(str(tmp_path / "cache.bin"), slots=4, slot_size=128)
+    for i in range(20):
+        await backend.set(f"k{i}", b"%d" % i, ttl=60 + i)
+    assert await backend.get("k19") == b"19"
+    assert await backend.get("k0") is None
+    await backend.close()
+
+
+async def test_redis_protokolu_ile_gecersizlestirme_yayilir():
+    server = MiniRedis()
+    port = await server.start()
+    url = f"redis://127.0.0.1:{port}/0"
+    worker_a = SharedCache("event", RedisBackend(url), ttl=60)
+    worker_b = SharedCache("event", RedisBackend(url), ttl=60)
+    try:
+        for cache in (worker_a, worker_b):
+            cache.backend.poll()
+        await wait_until(lambda: worker_a.backend.listening and worker_b.backend.listening)
+
+        await worker_a.set(3, {"title": "Bahar Şenliği"})
+        assert await worker_b.get(3) == {"title": "Bahar Şenliği"}
+        assert len(worker_b.local) == 1
+
+        await worker_a.invalidate(3)
+        await wait_until(lambda: len(worker_b.local) == 0)
+        assert await worker_b.get(3) is None
+    finally:
+        await worker_a.backend.close()
+        await worker_b.backend.close()
+        await server.stop()
+
+
+async def test_redis_erisilemezse_onbelleksiz_devam_edilir():
+    cache = SharedCache("profile", RedisBackend("redis://127.0.0.1:1/0", timeout=0.2), ttl=60)
+    await cache.set(1, {"a": 1})
+    assert await cache.get(1) is None
+    assert cache.errors == 2
+    await cache.backend.close()
+
+
+async def test_local_backend_sadece_worker_ici():
+    cache = SharedCache("profile", CacheBackend(), ttl=60)
+    await cache.set(1, {"a": 1})
+    assert await cache.get(1) == {"a": 1}
+    assert await cache.invalidate(1) is True
+    assert await cache.get(1) is None
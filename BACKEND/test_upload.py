@@ -0,0 +1,112 @@
+import hashlib
+import os
+
+import jwt
+import pytest
+
+import upload as upload_module
+from app import SECRET_KEY
+from upload import UploadLimiter, UploadRejected, receive_upload
+
+BOUNDARY = "----CampusHubTestBoundary"
+JPEG_BYTES = b"\xff\xd8\xff\xe0" + os.urandom(50_000)
+
+
+def multipart(filename, content, field="file"):
+    return (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="aciklama"\r\n\r\n'
+        f"profil\r\n"
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+        f"Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + content + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+class FakeStream:
+    """Gövdeyi küçük parçalar halinde veren sahte request.stream"""
+
+    def __init__(self, body, chunk_size):
+        self.chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        self.read_count = 0
+
+    async def read(self):
+        if not self.chunks:
+            return None
+        self.read_count += 1
+        return self.chunks.pop(0)
+
+
+class FakeRequest:
+    def __init__(self, body, chunk_size=1000, content_length=True):
+        self.stream = FakeStream(body, chunk_size)
+        self.headers = {"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+        if content_length:
+            self.headers["Content-Length"] = str(len(body))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1000, 100_000])
+async def test_dosya_akisla_alinir_ve_hashlenir(chunk_size):
+    """Sınırlayıcı parçalar arasında bölünse bile dosya birebir alınmalı"""
+    body = multipart("foto.jpg", JPEG_BYTES) if chunk_size > 1 else multipart("foto.jpg", JPEG_BYTES[:300])
+    expected = JPEG_BYTES if chunk_size > 1 else JPEG_BYTES[:300]
+
+    received = await receive_upload(FakeRequest(body, chunk_size), "file")
+    try:
+        with open(received.path, "rb") as f:
+            assert f.read() == expected
+        assert received.size == len(expected)
+        assert received.sha256 == hashlib.sha256(expected).hexdigest()
+        assert received.filename == "foto.jpg"
+    finally:
+        received.cleanup()
+
+
+async def test_resim_olmayan_dosya_erken_reddedilir(tmp_path, monkeypatch):
+    """İlk byte'lar resim değilse gövdenin geri kalanı okunmamalı"""
+    monkeypatch.setattr(upload_module, "UPLOAD_TMP_DIR", str(tmp_path))
+    body = multipart("virus.exe", b"MZ" + b"\x00" * 200_000)
+    request = FakeRequest(body, chunk_size=1000)
+
+    with pytest.raises(UploadRejected) as exc:
+        await receive_upload(request, "file")
+
+    assert exc.value.status == 415
+    assert request.stream.chunks, "gövdenin tamamı okunmamalıydı"
+    assert list(tmp_path.iterdir()) == [], "geçici dosya silinmeli"
+
+
+async def test_boyut_siniri_akis_sirasinda_uygulanir():
+    """Content-Length olmasa bile sınır aşılınca okuma durmalı"""
+    body = multipart("buyuk.jpg", JPEG_BYTES)
+    request = FakeRequest(body, chunk_size=1000, content_length=False)
+
+    with pytest.raises(UploadRejected) as exc:
+        await receive_upload(request, "file", max_bytes=10_000)
+
+    assert exc.value.status == 413
+    assert request.stream.chunks
+
+
+def test_kullanici_basina_eszamanli_sinir():
+    limiter = UploadLimiter(per_user=1, total=2)
+    assert limiter.try_acquire(1)
+    assert not limiter.try_acquire(1)
+    assert limiter.try_acquire(2)
+    assert not limiter.try_acquire(3)  # toplam sınır
+    limiter.release(1)
+    assert limiter.try_acquire(1)
+
+
+@pytest.mark.asyncio
+async def test_buyuk_dosya_govde_okunmadan_413(test_client):
+    token = jwt.encode({"user_id": 1}, SECRET_KEY, algorithm="HS256")
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": f"multipart/form-data; boundary={BOUNDARY}",
+    }
+    body = multipart("buyuk.jpg", b"\xff\xd8\xff" + b"\x00" * (upload_module.UPLOAD_MAX_BYTES + 100_000))
+
+    _, response = await test_client.post("/api/profil/foto-guncelle", content=body, headers=headers)
+    assert response.status == 413
+    assert response.json["basarili"] is False
@@ -0,0 +1,84 @@
+import time
+
+from shared_cache import MmapBackend
+from user_search import NameIndex, TIER_EXACT, TIER_SIMILAR, UserCard, UserSearchIndex
+
+
+def build(names):
+    index = NameIndex()
+    for user_id, name in enumerate(names, start=1):
+        index.upsert(user_id, UserCard(user_id, name))
+    return index
+
+
+def names(results):
+    return [card.full_name for card, _ in results]
+
+
+def test_turkce_karakter_duyarsiz_onek_arama():
+    index = build(["Şükrü Öztürk", "Işıl Çelik", "İlker Gün"])
+
+    assert names(index.search("sukru")) == ["Şükrü Öztürk"]
+    assert names(index.search("ISIL")) == ["Işıl Çelik"]
+    assert names(index.search("il")) == ["İlker Gün"]  # 2 harf: sadece kelime başı
+    assert names(index.search("celi")) == ["Işıl Çelik"]
+
+
+def test_eslesme_kalitesine_gore_siralanir():
+    index = build(["Mehmet Ali Kaya", "Ali Kaya", "Alican Demir", "Vali Yılmaz", "Ali"])
+
+    results = index.search("ali", limit=10)
+    assert names(results) == ["Ali", "Ali Kaya", "Alican Demir", "Mehmet Ali Kaya", "Vali Yılmaz"]
+    assert results[0][1] == TIER_EXACT
+
+
+def test_birden_fazla_kelime_ve_yazim_hatasi():
+    index = build(["Ayşe Yılmaz", "Ayşe Kara", "Fatma Yıldız"])
+
+    assert names(index.search("ay yil")) == ["Ayşe Yılmaz"]
+    results = index.search("yilmza")
+    assert names(results) == ["Ayşe Yılmaz"] and results[0][1] == TIER_SIMILAR
+
+
+def test_guncelleme_ve_silme():
+    index = build(["Deniz Ak"])
+    index.upsert(1, UserCard(1, "Deniz Kara"))
+    assert index.search("ak") == []
+    assert names(index.search("kara")) == ["Deniz Kara"]
+
+    index.upsert(1, UserCard(1, ""))  # isim silindi: aramada görünmez
+    assert len(index) == 0 and index.words == [] and index.postings == {}
+
+
+def test_buyuk_indexte_arama_hizli():
+    index = build([f"Kullanıcı{i} Soyad{i % 97}" for i in range(20_000)] + ["Zeynep Şahin"])
+
+    started = time.perf_counter()
+    for _ in range(100):
+        assert names(index.search("zeyn"))[0] == "Zeynep Şahin"
+    assert (time.perf_counter() - started) / 100 < 0.005
+
+
+async def test_diger_workerin_indexi_duyuruyla_guncellenir(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    rows = {1: "Ece Tan"}
+
+    async def load_all():
+        return [(uid, UserCard(uid, name)) for uid, name in rows.items()]
+
+    async def load_one(user_id):
+        return UserCard(user_id, rows[user_id]) if user_id in rows else None
+
+    worker_a = UserSearchIndex(load_all, load_one, MmapBackend(path, slots=16, slot_size=256))
+    worker_b = UserSearchIndex(load_all, load_one, MmapBackend(path, slots=16, slot_size=256))
+    assert names(await worker_b.search("ece")) == ["Ece Tan"]
+
+    rows[2] = "Ecem Su"
+    del rows[1]
+    await worker_a.changed(2)
+    await worker_a.changed(1)
+
+    assert names(await worker_b.search("ece")) == ["Ecem Su"]
+
+    await worker_a.backend.close()
+    await worker_b.backend.close()
@@ -0,0 +1,85 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from models import User
+from write_behind import UserWriteBuffer, clear_expired_bans, flush_user_writes
+
+T0 = datetime(2025, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+
+async def test_girisler_birlesir_ve_tek_turda_yazilir():
+    batches = []
+
+    async def flush(logins):
+        batches.append(dict(logins))
+
+    buffer = UserWriteBuffer(flush, interval=60)
+    buffer.touch_login(1, T0)
+    buffer.touch_login(1, T0 + timedelta(seconds=5))
+    buffer.touch_login(1, T0 + timedelta(seconds=2))  # geç gelen eski değer
+    buffer.touch_login(2, T0)
+
+    assert await buffer.flush() == 2
+    assert batches == [{1: T0 + timedelta(seconds=5), 2: T0}]
+    assert await buffer.flush() == 0
+
+
+async def test_hata_olursa_kayitlar_geri_konur():
+    calls = []
+
+    async def flush(logins):
+        calls.append(dict(logins))
+        if len(calls) == 1:
+            raise ConnectionError("db yok")
+
+    buffer = UserWriteBuffer(flush, interval=60)
+    buffer.touch_login(1, T0)
+    assert await buffer.flush() == 0
+    buffer.touch_login(1, T0 - timedelta(seconds=1))
+    assert await buffer.flush() == 1
+    assert calls[-1] == {1: T0}
+    assert buffer.stats()["errors"] == 1
+
+
+async def test_kapanista_bekleyenler_yazilir():
+    written = []
+
+    async def flush(logins):
+        await asyncio.sleep(0)
+        written.extend(logins)
+
+    buffer = UserWriteBuffer(flush, interval=0.01)
+    buffer.start()
+    buffer.touch_login(1, T0)
+    await asyncio.sleep(0.05)
+    buffer.touch_login(2, T0)
+    await buffer.stop()
+    assert sorted(written) == [1, 2]
+
+
+async def test_toplu_update_giris_zamanlarini_yazar_ve_suresi_dolmus_banlari_kaldirir(db):
+    now = datetime.now(timezone.utc)
+    naive = now.replace(tzinfo=None)
+    # Ham SQL: modelin önbelleğe aldığı INSERT sorgusu başka testin (MySQL) ayarından kalmış olabilir
+    for user_id, is_banned, ban_until in [
+        (1, False, None),
+        (2, True, naive - timedelta(hours=1)),
+        (3, True, naive + timedelta(days=1)),
+        (4, True, None),  # Kalıcı ban
+    ]:
+        await db.execute_query(
+            "INSERT INTO users (user_id, email, password, role, is_active, is_admin, is_banned, ban_until, created_at)"
+            " VALUES (?, ?, '-', 'user', 1, 0, ?, ?, ?)",
+            [user_id, f"{user_id}@x.com", is_banned, ban_until, naive],
+        )
+
+    await flush_user_writes(db, {1: T0, 2: T0 + timedelta(minutes=1)})
+    assert await clear_expired_bans(db, now) == 1
+    assert await clear_expired_bans(db, now) == 0
+
+    users = {u.user_id: u for u in await User.all()}
+    assert users[1].last_login == T0
+    assert users[2].last_login == T0 + timedelta(minutes=1)
+    assert not users[2].is_banned and users[2].ban_until is None
+    assert users[3].is_banned and users[3].ban_until is not None
+    assert users[4].is_banned
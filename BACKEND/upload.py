@@ -0,0 +1,241 @@
+"""
+Akış (streaming) ile dosya yükleme.
+
+multipart/form-data gövdesi belleğe toplanmadan parça parça okunur:
+dosya kısmı geçici bir dosyaya yazılır ve yazılırken SHA-256 özeti
+hesaplanır. Boyut sınırı aşılırsa veya dosyanın ilk byte'ları bir resme
+ait değilse gövdenin geri kalanı okunmadan istek reddedilir.
+"""
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+
+from media_store import sniff_image_type
+
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+UPLOAD_MAX_PER_USER = int(os.getenv("UPLOAD_MAX_PER_USER", 2))
+UPLOAD_MAX_CONCURRENT = int(os.getenv("UPLOAD_MAX_CONCURRENT", 16))
+
+# Dosya dışındaki form alanları ve başlıklar için üst sınır
+MAX_PART_HEADER_BYTES = 16 * 1024
+MAX_OTHER_FIELDS_BYTES = 64 * 1024
+# Resim türünü anlamak için gereken byte sayısı (WebP: 12)
+SNIFF_BYTES = 12
+
+_BOUNDARY_RE = re.compile(r'boundary="?([^";]+)"?', re.IGNORECASE)
+_DISPOSITION_RE = re.compile(r'(\w+)="([^"]*)"')
+
+
+class UploadRejected(Exception):
+    def __init__(self, status, mesaj):
+        super().__init__(mesaj)
+        self.status = status
+        self.mesaj = mesaj
+
+
+class ReceivedUpload:
+    """Geçici dosyaya yazılmış yükleme"""
+
+    def __init__(self, path, size, sha256, content_type, filename):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.content_type = content_type
+        self.filename = filename
+
+    def cleanup(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class UploadLimiter:
+    """Kullanıcı başına ve toplamda eş zamanlı yükleme sınırı"""
+
+    def __init__(self, per_user=UPLOAD_MAX_PER_USER, total=UPLOAD_MAX_CONCURRENT):
+        self.per_user = per_user
+        self.total = total
+        self.active = {}
+        self.active_total = 0
+
+    def try_acquire(self, user_id):
+        if self.active_total >= self.total or self.active.get(user_id, 0) >= self.per_user:
+            return False
+        self.active[user_id] = self.active.get(user_id, 0) + 1
+        self.active_total += 1
+        return True
+
+    def release(self, user_id):
+        remaining = self.active.get(user_id, 0) - 1
+        if remaining > 0:
+            self.active[user_id] = remaining
+        else:
+            self.active.pop(user_id, None)
+        self.active_total -= 1
+
+
+def parse_boundary(content_type):
+    if not content_type or not content_type.lower().startswith("multipart/form-data"):
+        return None
+    match = _BOUNDARY_RE.search(content_type)
+    return match.group(1).encode("latin-1") if match else None
+
+
+def _parse_part_headers(raw):
+    headers = {}
+    for line in raw.decode("utf-8", "replace").split("\r\n"):
+        name, sep, value = line.partition(":")
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    disposition = dict(_DISPOSITION_RE.findall(headers.get("content-disposition", "")))
+    return disposition.get("name"), disposition.get("filename"), headers.get("content-type")
+
+
+class _FileSink:
+    """Dosya kısmını geçici dosyaya yazarken özetini ve boyutunu tutar"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hasher = hashlib.sha256()
+        self.head = b""
+        fd, self.path = tempfile.mkstemp(dir=UPLOAD_TMP_DIR, prefix="upload-")
+        self.file = os.fdopen(fd, "wb")
+
+    async def write(self, data):
+        if not data:
+            return
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadRejected(413, f"Dosya en fazla {self.max_bytes // (1024 * 1024)} MB olabilir.")
+
+        # İlk byte'lar gelir gelmez resim mi diye bak, değilse hemen reddet
+        if len(self.head) < SNIFF_BYTES:
+            self.head += data[:SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= SNIFF_BYTES and not sniff_image_type(self.head):
+                raise UploadRejected(415, "Sadece JPG, PNG, WebP veya GIF yükleyebilirsiniz.")
+
+        self.hasher.update(data)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.file.write, data)
+
+    def close(self):
+        self.file.close()
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+async def receive_upload(request, field_name="file", max_bytes=UPLOAD_MAX_BYTES):
+    """Akış halindeki multipart gövdeden `field_name` dosyasını geçici dosyaya al.
+
+    Route `stream=True` ile tanımlanmış olmalıdır. Hata durumunda UploadRejected fırlatır.
+    """
+    boundary = parse_boundary(request.headers.get("Content-Type"))
+    if not boundary:
+        raise UploadRejected(400, "Dosya multipart/form-data olarak gönderilmelidir.")
+
+    # Content-Length biliniyorsa gövdeyi hiç okumadan reddet
+    content_length = request.headers.get("Content-Length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes + MAX_OTHER_FIELDS_BYTES:
+        raise UploadRejected(413, f"Dosya en fazla {max_bytes // (1024 * 1024)} MB olabilir.")
+
+    first_delimiter = b"--" + boundary
+    delimiter = b"\r\n--" + boundary
+
+    buffer = b""
+    state = "preamble"
+    sink = None
+    result = None
+    other_bytes = 0
+    current_is_file = False
+
+    try:
+        while True:
+            chunk = await request.stream.read()
+            if chunk is None:
+                break
+            buffer += chunk
+
+            while True:
+                if state == "preamble":
+                    idx = buffer.find(first_delimiter)
+                    if idx < 0:
+                        if len(buffer) > MAX_OTHER_FIELDS_BYTES:
+                            raise UploadRejected(400, "Geçersiz form verisi.")
+                        break
+                    buffer = buffer[idx + len(first_delimiter):]
+                    state = "after_delimiter"
+
+                elif state == "after_delimiter":
+                    if len(buffer) < 2:
+                        break
+                    if buffer[:2] == b"--":
+                        state = "done"
+                        break
+                    buffer = buffer[2:]  # \r\n
+                    state = "headers"
+
+                elif state == "headers":
+                    idx = buffer.find(b"\r\n\r\n")
+                    if idx < 0:
+                        if len(buffer) > MAX_PART_HEADER_BYTES:
+                            raise UploadRejected(400, "Geçersiz form verisi.")
+                        break
+                    name, filename, content_type = _parse_part_headers(buffer[:idx])
+                    buffer = buffer[idx + 4:]
+                    current_is_file = name == field_name and filename is not None and result is None
+                    if current_is_file:
+                        sink = _FileSink(max_bytes)
+                    state = "body"
+
+                elif state == "body":
+                    idx = buffer.find(delimiter)
+                    # Sınırlayıcı henüz gelmediyse, yarım gelmiş olabileceği kadarını tut
+                    end = idx if idx >= 0 else max(0, len(buffer) - len(delimiter) + 1)
+                    data, buffer = buffer[:end], buffer[end:]
+                    if current_is_file:
+                        await sink.write(data)
+                    else:
+                        other_bytes += len(data)
+                        if other_bytes > MAX_OTHER_FIELDS_BYTES:
+                            raise UploadRejected(413, "Form verisi çok büyük.")
+                    if idx < 0:
+                        break
+
+                    buffer = buffer[len(delimiter):]
+                    if current_is_file:
+                        sink.close()
+                        if len(sink.head) < SNIFF_BYTES and not sniff_image_type(sink.head):
+                            raise UploadRejected(415, "Sadece JPG, PNG, WebP veya GIF yükleyebilirsiniz.")
+                        result = ReceivedUpload(
+                            sink.path, sink.size, sink.hasher.hexdigest(), content_type, filename
+                        )
+                        sink = None
+                    state = "after_delimiter"
+
+                else:  # done: kapanıştan sonraki epilog yok sayılır
+                    buffer = b""
+                    break
+    except BaseException:
+        if sink is not None:
+            sink.discard()
+        if result is not None:
+            result.cleanup()
+        raise
+
+    if sink is not None:
+        # Gövde dosya kısmının ortasında bitti
+        sink.discard()
+        raise UploadRejected(400, "Dosya eksik gönderildi.")
+    if result is None:
+        raise UploadRejected(400, "Dosya seçilmedi.")
+    return result
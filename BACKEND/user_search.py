@@ -0,0 +1,197 @@
+"""
+Kullanıcı arama (typeahead): isimler üzerinde trigram + önek index'i.
+
+`full_name__icontains` her tuşta tüm profilleri `LIKE '%...%'` ile tarıyordu.
+Burada isimler Türkçe kurallarıyla katlanır (search_index.turkish_fold) ve
+bellekte tutulur:
+
+  * 2 harflik sorgular sıralı kelime listesinde önek olarak aranır,
+  * 3+ harflik sorgularda adaylar trigram kesişiminden gelir ve doğrulanır,
+  * hiç tam eşleşme yoksa (yazım hatası) trigram benzerliğine düşülür.
+
+Sonuçlar eşleşme kalitesine göre sıralanır: tam isim > ismin başı >
+kelime başı > isim içinde > benzer isim.
+"""
+from bisect import bisect_left
+
+from search_index import SyncedIndex, turkish_fold
+
+USER_SEARCH_CHANNEL_PREFIX = "search:user:"
+# Benzer isim önerisi için en düşük trigram benzerliği (Jaccard)
+MIN_SIMILARITY = 0.3
+# Kısa öneklerde taranacak en fazla kelime (sorgu süresi sabit kalsın)
+MAX_PREFIX_SCAN = 500
+
+TIER_EXACT, TIER_PREFIX, TIER_WORD_PREFIX, TIER_SUBSTRING, TIER_SIMILAR = range(5)
+
+
+def normalize_name(text):
+    return " ".join(turkish_fold(text).split())
+
+
+def trigrams(text):
+    """Kelime sınırları boşlukla işaretlenmiş trigramlar ("ali" -> "  a", " al", "ali", "li ")"""
+    result = set()
+    for word in text.split():
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def _jaccard(a, b):
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+def _inner_trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class UserCard:
+    """Arama sonucunda gösterilen alanlar (fotoğraf sadece referans olarak tutulur)"""
+
+    __slots__ = ("user_id", "full_name", "department", "grade", "photo", "name", "grams")
+
+    def __init__(self, user_id, full_name, department=None, grade=None, photo=None):
+        self.user_id = user_id
+        self.full_name = full_name
+        self.department = department
+        self.grade = grade
+        self.photo = photo
+        self.name = normalize_name(full_name)
+        self.grams = trigrams(self.name)
+
+
+class NameIndex:
+    def __init__(self):
+        self.cards = {}          # user_id -> UserCard
+        self.postings = {}       # trigram (kelime içi) -> {user_id}
+        self.boundaries = {}     # trigram (sınırlı) -> {user_id}, benzerlik için
+        self.words = []          # sıralı (kelime, user_id)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def upsert(self, user_id, card):
+        self.remove(user_id)
+        if not card.name:
+            return  # İsmi boş (yarım kalmış) profiller aramada çıkmaz
+        self.cards[user_id] = card
+        for word in set(card.name.split()):
+            self.words.insert(bisect_left(self.words, (word, user_id)), (word, user_id))
+            for gram in _inner_trigrams(word):
+                self.postings.setdefault(gram, set()).add(user_id)
+        for gram in card.grams:
+            self.boundaries.setdefault(gram, set()).add(user_id)
+
+    def remove(self, user_id):
+        card = self.cards.pop(user_id, None)
+        if card is None:
+            return False
+        for word in set(card.name.split()):
+            del self.words[bisect_left(self.words, (word, user_id))]
+            for gram in _inner_trigrams(word):
+                self._discard(self.postings, gram, user_id)
+        for gram in card.grams:
+            self._discard(self.boundaries, gram, user_id)
+        return True
+
+    @staticmethod
+    def _discard(table, gram, user_id):
+        ids = table[gram]
+        ids.discard(user_id)
+        if not ids:
+            del table[gram]
+
+    def _word_candidates(self, word):
+        """İsminde `word` geçen (3+ harf) veya `word` ile başlayan kelimesi olan kullanıcılar"""
+        if len(word) >= 3:
+            sets = [self.postings.get(gram) for gram in _inner_trigrams(word)]
+            if not all(sets):
+                return set()
+            return set.intersection(*sorted(sets, key=len))
+        start = bisect_left(self.words, (word,))
+        result = set()
+        for found, user_id in self.words[start:start + MAX_PREFIX_SCAN]:
+            if not found.startswith(word):
+                break
+            result.add(user_id)
+        return result
+
+    @staticmethod
+    def _tier(name, query, query_words):
+        if name == query:
+            return TIER_EXACT
+        if name.startswith(query):
+            return TIER_PREFIX
+        name_words = name.split()
+        if all(any(n.startswith(w) for n in name_words) for w in query_words):
+            return TIER_WORD_PREFIX
+        if all(w in name for w in query_words):
+            return TIER_SUBSTRING
+        return None
+
+    def search(self, query, limit=5):
+        """[(UserCard, kademe)] — en iyi eşleşme önce"""
+        query = normalize_name(query)
+        query_words = query.split()
+        if not query_words:
+            return []
+
+        candidates = None
+        for word in sorted(query_words, key=len, reverse=True):
+            found = self._word_candidates(word)
+            candidates = found if candidates is None else candidates & found
+            if not candidates:
+                break
+
+        ranked = []
+        for user_id in candidates or ():
+            card = self.cards[user_id]
+            tier = self._tier(card.name, query, query_words)
+            if tier is not None:
+                ranked.append(((tier, len(card.name), user_id), card, tier))
+
+        if len(ranked) < limit and len(query) >= 3:
+            ranked.extend(self._similar(query, {r[1].user_id for r in ranked}))
+
+        ranked.sort(key=lambda r: r[0])
+        return [(card, tier) for _, card, tier in ranked[:limit]]
+
+    def _similar(self, query, exclude):
+        """Yazım hatalarına karşı trigram benzerliği yeterli olan isimler"""
+        query_grams = trigrams(query)
+        shared = {}
+        for gram in query_grams:
+            for user_id in self.boundaries.get(gram, ()):
+                shared[user_id] = shared.get(user_id, 0) + 1
+        single_word = " " not in query
+        for user_id, count in shared.items():
+            if user_id in exclude:
+                continue
+            card = self.cards[user_id]
+            if single_word:
+                # Tek kelimelik sorgu, ismin en çok benzeyen kelimesiyle karşılaştırılır
+                similarity = max(_jaccard(query_grams, trigrams(word)) for word in card.name.split())
+            else:
+                similarity = count / (len(query_grams) + len(card.grams) - count)
+            if similarity >= MIN_SIMILARITY:
+                yield (TIER_SIMILAR, -similarity, len(card.name), user_id), card, TIER_SIMILAR
+
+
+class UserSearchIndex(SyncedIndex):
+    """Kullanıcı index'i. Doküman: UserCard; silinmiş kullanıcı için None."""
+
+    channel_prefix = USER_SEARCH_CHANNEL_PREFIX
+
+    def new_index(self):
+        return NameIndex()
+
+    async def search(self, query, limit=5):
+        index = await self.ready()
+        return index.search(query, limit)
+
+    def stats(self):
+        if self.index is None:
+            return {"ready": False}
+        return {"ready": True, "users": len(self.index), "trigrams": len(self.index.postings)}
@@ -0,0 +1,143 @@
+"""
+Kullanıcı tablosu için geciktirilmiş toplu yazma (write-behind).
+
+Her başarılı girişte `last_login` için ayrı bir UPDATE çalışıyordu. Bu
+yazmalar burada toplanır ve birkaç saniyede bir tek (parçalı) UPDATE ile
+veritabanına yazılır. Aynı kullanıcının aradaki girişleri birleşir; sadece en
+son zaman yazılır. Sunucu kapanırken bekleyen yazmalar boşaltılır.
+
+Süresi dolmuş banlar istek yolunda temizlenmez; zamanlanmış iş
+(clear_expired_bans) hepsini tek bir UPDATE ile kaldırır.
+
+Yazma başarısız olursa kayıtlar bir sonraki tura geri konur (daha yeni bir
+değer gelmişse o korunur).
+"""
+import asyncio
+import os
+from datetime import timezone
+
+from migrations import placeholder
+
+WRITE_BEHIND_INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL", 5))
+# Bu kadar kayıt birikirse süreyi beklemeden yaz
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", 5000))
+# Tek UPDATE içindeki en fazla kullanıcı
+BATCH_SIZE = 500
+
+
+def _utc_naive(dt):
+    """DB UTC tutar; ham SQL parametresi naive UTC olmalı"""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+async def flush_user_writes(conn, logins):
+    """logins: {user_id: son_giriş}"""
+    p = placeholder(conn)
+    items = sorted(logins.items())
+    for start in range(0, len(items), BATCH_SIZE):
+        chunk = items[start:start + BATCH_SIZE]
+        cases = " ".join(f"WHEN {p} THEN {p}" for _ in chunk)
+        params = [value for user_id, when in chunk for value in (user_id, _utc_naive(when))]
+        params.extend(user_id for user_id, _ in chunk)
+        await conn.execute_query(
+            f"UPDATE users SET last_login = CASE user_id {cases} END "
+            f"WHERE user_id IN ({', '.join([p] * len(chunk))})",
+            params,
+        )
+
+
+async def clear_expired_bans(conn, now):
+    """Süresi dolmuş tüm banları tek UPDATE ile kaldır; kaldırılan sayısını döndür.
+
+    (is_banned, ban_until) index'i sayesinde sadece banlı satırlar taranır.
+    Kalıcı banlar (ban_until NULL) dokunulmadan kalır.
+    """
+    p = placeholder(conn)
+    count, _ = await conn.execute_query(
+        f"UPDATE users SET is_banned = {p}, ban_reason = NULL, ban_until = NULL "
+        f"WHERE is_banned = {p} AND ban_until IS NOT NULL AND ban_until <= {p}",
+        [False, True, _utc_naive(now)],
+    )
+    return count
+
+
+class UserWriteBuffer:
+    """flush(logins) -> awaitable; biriken yazmaları DB'ye uygular"""
+
+    def __init__(self, flush, interval=WRITE_BEHIND_INTERVAL, max_pending=WRITE_BEHIND_MAX_PENDING):
+        self._flush = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        self.logins = {}
+        self.flushes = 0
+        self.rows_written = 0
+        self.errors = 0
+        self._task = None
+        self._flushing = None
+        # Turlar sırayla yazılır: eski bir tur yeni değerin üzerine yazamaz
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self.logins)
+
+    def touch_login(self, user_id, when):
+        current = self.logins.get(user_id)
+        if current is None or when > current:
+            self.logins[user_id] = when
+        if len(self) >= self.max_pending and (self._flushing is None or self._flushing.done()):
+            self._flushing = asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        async with self._lock:
+            return await self._flush_pending()
+
+    async def _flush_pending(self):
+        if not self.logins:
+            return 0
+        logins, self.logins = self.logins, {}
+        try:
+            await self._flush(logins)
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Toplu kullanıcı yazması başarısız, tekrar denenecek: {e!r}")
+            for user_id, when in logins.items():
+                current = self.logins.get(user_id)
+                if current is None or when > current:
+                    self.logins[user_id] = when
+            return 0
+        self.flushes += 1
+        self.rows_written += len(logins)
+        return len(logins)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            # Kapanışta iptal edilse bile başlamış tur yarıda kalmaz
+            await asyncio.shield(self.flush())
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Zamanlayıcıyı durdur ve bekleyenleri yaz (sunucu kapanışı)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None and not self._flushing.done():
+            await self._flushing
+        return await self.flush()
+
+    def stats(self):
+        return {
+            "pending_logins": len(self.logins),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "errors": self.errors,
+        }